@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import inspect
+import weakref
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, List, Optional
+from invoice import DraftInvoice
+from paging import Page
+
+# Use Case (Service) Objects for asyncio applications.
+# The repositories can be the regular in memory ones, async backends whose methods are coroutines,
+# or blocking backends wrapped in ExecutorRepository.
+
+async def _resolve(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+class ExecutorRepository:
+    """
+    Wraps a blocking repository (e.g. a SQLite one) so that each method call runs in an executor
+    and returns an awaitable, keeping the event loop free while the database works.
+    """
+    def __init__(self, repository: Any, executor: Optional[Executor] = None):
+        self._repository = repository
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._repository, name)
+        if not callable(method):
+            return method
+
+        def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+        return call
+
+class _TaskLocks:
+    """
+    One asyncio lock per task ID, dropped once nobody holds or waits for it.
+    """
+    def __init__(self):
+        self._locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __call__(self, task_id: Optional[int]) -> asyncio.Lock:
+        lock = self._locks.get(task_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[task_id] = lock
+        return lock
+
+class AsyncInvoiceManagementService:
+    """
+    Business logic for managing submitted invoices, for asyncio applications.
+    Submissions for different tasks run concurrently, submissions for the same task are serialized
+    so the duplicate check and the save cannot interleave.
+    """
+    def __init__(self, task_repository, contractor_repository, draft_repository, invoice_repository):
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+        self.invoice_repository = invoice_repository
+        self.draft_repository = draft_repository
+        self._task_locks = _TaskLocks()
+
+    async def submit_invoice(self, draft_invoice_id: int):
+        # submit what the user last saved, even if it is still buffered
+        await _resolve(self.draft_repository.flush(draft_invoice_id))
+        draft = await _resolve(self.draft_repository.get(draft_invoice_id))
+        if draft is None:
+            raise ValueError("Draft does not exist")
+
+        async with self._task_locks(draft.task.id):
+            # Prevent duplicate invoice submission.
+            existing_invoice = await _resolve(self.invoice_repository.get_by_task(draft.task))
+            if existing_invoice is not None:
+                raise ValueError("Invoice already exists for this task")
+
+            draft.id = None # because we want to insert a new invoice we get rid of the old ID
+            invoice = await _resolve(self.invoice_repository.save(draft))
+
+        # we no longer need the draft after we submitted the invoice
+        await _resolve(self.draft_repository.delete(draft_invoice_id))
+
+        return invoice.id
+
+class AsyncDraftInvoiceService:
+    """
+    Business logic for managing draft invoices, for asyncio applications.
+    """
+    def __init__(self, task_repository, contractor_repository, draft_invoice_repository):
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+        self.draft_invoice_repository = draft_invoice_repository
+
+    async def save_draft_invoice(self,
+                contractor_id: int,
+                task_id: int,
+                start_time: datetime,
+                end_time: datetime,
+                signature: str):
+        contractor, task = await asyncio.gather(
+            _resolve(self.contractor_repository.find_by_id(contractor_id)),
+            _resolve(self.task_repository.get(task_id)))
+        if contractor is None:
+            raise ValueError("Contractor does not exist")
+        if task is None:
+            raise ValueError("Task does not exist")
+
+        # Create and save the DraftInvoice.
+        draft_invoice = DraftInvoice(contractor, task, start_time, end_time, signature)
+        await _resolve(self.draft_invoice_repository.save(draft_invoice))
+        return draft_invoice.id
+
+    async def update(self,
+                draft_invoice_id: int,
+                contractor_id: Optional[int],
+                task_id: Optional[int],
+                start_time: Optional[datetime],
+                end_time: Optional[datetime],
+                signature: Optional[str]):
+        draft = await _resolve(self.draft_invoice_repository.get(draft_invoice_id))
+        if draft is None:
+            raise ValueError("Draft does not exist")
+
+        if contractor_id is not None:
+            contractor = await _resolve(self.contractor_repository.find_by_id(contractor_id))
+            if contractor is None:
+                raise ValueError("Contractor does not exist")
+            draft.contractor = contractor
+
+        if task_id is not None:
+            task = await _resolve(self.task_repository.get(task_id))
+            if task is None:
+                raise ValueError("Task does not exist")
+            draft.task = task
+
+        if start_time is not None:
+            draft.start_time = start_time
+
+        if end_time is not None:
+            draft.end_time = end_time
+
+        if signature is not None:
+            draft.signature = signature
+
+        draft.update_last_saved()
+        await _resolve(self.draft_invoice_repository.save(draft))
+
+    async def list(self, contractor_id: int) -> List[DraftInvoice]:
+        contractor = await _resolve(self.contractor_repository.find_by_id(contractor_id))
+        if contractor is None:
+            raise ValueError("Contractor does not exist")
+        return await _resolve(self.draft_invoice_repository.list_by_contractor(contractor))
+
+    async def list_page(self, contractor_id: int, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        contractor = await _resolve(self.contractor_repository.find_by_id(contractor_id))
+        if contractor is None:
+            raise ValueError("Contractor does not exist")
+        return await _resolve(self.draft_invoice_repository.list_by_contractor_page(contractor, limit, token))
+
+    async def delete(self, draft_invoice_id: int):
+        await _resolve(self.draft_invoice_repository.delete(draft_invoice_id))
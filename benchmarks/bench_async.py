@@ -0,0 +1,61 @@
+"""
+Load test for the async services: many concurrent submissions spread over a number of tasks,
+several competing drafts per task, over a backend that yields to the event loop on every call.
+Reports throughput and checks that no task ends up with more than one invoice.
+
+Usage: python benchmarks/bench_async.py [tasks] [drafts per task]
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from async_service import AsyncInvoiceManagementService
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoice, DraftInvoiceRepository, InvoiceRepository
+from task import Task, TaskRepository
+
+class YieldingRepository:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def __getattr__(self, name):
+        method = getattr(self.repository, name)
+
+        async def call(*args):
+            await asyncio.sleep(0)
+            return method(*args)
+        return call
+
+async def run(tasks: int, drafts_per_task: int):
+    contractor_repo = ContractorRepository()
+    contractor_repo.add(Contractor(None, "Alice"))
+    contractor = contractor_repo.find_by_id(0)
+    task_repo = TaskRepository()
+    draft_repo = DraftInvoiceRepository()
+    invoice_repo = InvoiceRepository()
+    base = datetime(2025, 1, 1)
+    task_repo.add_many(Task(None, "Office", "English", "Spanish", base + timedelta(hours=i)) for i in range(tasks))
+    for _ in range(drafts_per_task):
+        draft_repo.save_many(DraftInvoice(contractor, task, task.start_time, task.start_time + timedelta(hours=1), "sig")
+                             for task in task_repo.tasks.values())
+
+    service = AsyncInvoiceManagementService(*(YieldingRepository(r) for r in (task_repo, contractor_repo, draft_repo, invoice_repo)))
+    draft_ids = list(draft_repo.draft_invoices)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(service.submit_invoice(d) for d in draft_ids), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    rejected = sum(isinstance(r, ValueError) for r in results)
+    duplicates = sum(1 for count in Counter(i.task.id for i in invoice_repo.invoices.values()).values() if count > 1)
+    print(f"{len(draft_ids)} concurrent submissions over {tasks} tasks: {len(draft_ids) / elapsed:.0f} submissions/s")
+    print(f"invoices {len(invoice_repo.invoices)}, rejected duplicates {rejected}, tasks with duplicate invoices {duplicates}")
+    assert duplicates == 0 and len(invoice_repo.invoices) == tasks
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+                    int(sys.argv[2]) if len(sys.argv) > 2 else 4))
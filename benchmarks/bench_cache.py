@@ -0,0 +1,54 @@
+"""
+Replays a dispatch screen workload (the same few queries over and over, with occasional task inserts)
+against the in memory and SQLite task repositories, with and without CachingTaskRepository.
+
+Usage: python benchmarks/bench_cache.py [tasks] [queries]
+"""
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bench_task_lookup import LANGUAGES, LOCATIONS
+from cache import CachingTaskRepository
+from sqlite_repository import ConnectionPool, SqliteTaskRepository
+from task import Task, TaskRepository
+
+BASE = datetime(2025, 1, 1)
+
+def random_task(rng: random.Random, tasks: int) -> Task:
+    return Task(None, rng.choice(LOCATIONS), rng.choice(LANGUAGES), rng.choice(LANGUAGES),
+                BASE + timedelta(minutes=rng.randrange(tasks)))
+
+def run(repository: TaskRepository, tasks: int, queries: int) -> float:
+    rng = random.Random(3)
+    repository.add_many(random_task(rng, tasks) for _ in range(tasks))
+    # a screen shows a handful of queries, refreshed many times between inserts
+    screen = [(rng.choice(LOCATIONS), rng.choice(LANGUAGES), rng.choice(LANGUAGES), BASE + timedelta(minutes=rng.randrange(tasks)))
+              for _ in range(8)]
+    started = time.perf_counter()
+    for i in range(queries):
+        location, source, target, start = screen[i % len(screen)]
+        repository.find_by_attributes(location, source, target)
+        repository.find_by_location_time_range(location, start, start + timedelta(hours=8))
+        if i % 50 == 0:
+            repository.add(random_task(rng, tasks))
+    return time.perf_counter() - started
+
+def main(tasks: int, queries: int):
+    print(f"{tasks} tasks, {queries} query pairs")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, make in (("memory", TaskRepository),
+                           ("sqlite", lambda: SqliteTaskRepository(ConnectionPool(str(Path(directory) / f"{time.time_ns()}.db"))))):
+            plain = run(make(), tasks, queries)
+            cached = CachingTaskRepository(make())
+            elapsed = run(cached, tasks, queries)
+            print(f"{name:>7}: uncached {plain:.2f}s, cached {elapsed:.2f}s "
+                  f"({cached.hits} hits, {cached.misses} misses, {cached.invalidations} invalidations)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000, int(sys.argv[2]) if len(sys.argv) > 2 else 10_000)
@@ -0,0 +1,41 @@
+"""
+Exports invoices to CSV and JSON lines and reports the time taken and the peak memory
+allocated during the export, which should not grow with the number of invoices.
+
+Usage: python benchmarks/bench_export.py [invoices ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from export import select, write_csv, write_jsonl
+from invoice import Invoice, InvoiceRepository
+from generator import Dataset
+
+def main(sizes):
+    print(f"{'invoices':>10} {'format':>6} {'seconds':>8} {'peak KiB':>9}")
+    for size in sizes:
+        data = Dataset(42, tasks=size, contractors=1000, drafts=0)
+        repository = InvoiceRepository()
+        contractors = list(data.contractor_repo.contractors.values())
+        for task in data.task_repo.tasks.values():
+            repository.save(Invoice(contractors[task.id % len(contractors)], task, task.start_time,
+                                    task.start_time + timedelta(hours=1), "signature"))
+
+        for label, write in (("csv", write_csv), ("jsonl", write_jsonl)):
+            with open(os.devnull, "w", encoding="utf-8") as output:
+                tracemalloc.start()
+                started = time.perf_counter()
+                write(select(repository), output)
+                elapsed = time.perf_counter() - started
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{size:>10} {label:>6} {elapsed:>8.2f} {peak / 1024:>9.0f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,28 @@
+"""
+Measures the cost of instrumentation on a cheap repository call:
+unwrapped, wrapped with metrics disabled and wrapped with metrics enabled.
+
+Usage: python benchmarks/bench_instrumentation.py [calls]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor, ContractorRepository
+from instrumentation import Metrics, instrument
+
+def main(calls: int):
+    repository = ContractorRepository()
+    repository.add(Contractor(None, "Alice"))
+    disabled = instrument(repository, Metrics(enabled=False), "contractor_repository")
+    enabled = instrument(repository, Metrics(), "contractor_repository")
+
+    print(f"{'find_by_name':>24} {'ns/call':>8}")
+    for label, target in (("plain", repository), ("instrumented, disabled", disabled), ("instrumented, enabled", enabled)):
+        seconds = timeit.timeit(lambda target=target: target.find_by_name("alice"), number=calls)
+        print(f"{label:>24} {seconds / calls * 1e9:>8.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,51 @@
+"""
+Measures save throughput and the slowest save of the journaled invoice repository,
+and its recovery time, with and without a snapshot.
+
+Usage: python benchmarks/bench_journal.py [invoices]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice
+from journal import JournaledInvoiceRepository
+from task import Task, TaskRepository
+
+def main(size):
+    contractor_repo = ContractorRepository()
+    contractor_repo.add(Contractor(None, "Alice"))
+    contractor = contractor_repo.find_by_id(0)
+    task_repo = TaskRepository()
+    base = datetime(2025, 1, 1)
+    task_repo.add_many(Task(None, "Office", "English", "Spanish", base + timedelta(hours=i)) for i in range(size))
+
+    print(f"{size} invoices")
+    for snapshot_every in (size + 1, max(1, size // 10)):
+        with tempfile.TemporaryDirectory() as directory:
+            repository = JournaledInvoiceRepository(directory, task_repo, contractor_repo, snapshot_every=snapshot_every)
+            started = time.perf_counter()
+            slowest = 0.0
+            for task in task_repo.tasks.values():
+                saving = time.perf_counter()
+                repository.save(Invoice(contractor, task, task.start_time, task.start_time + timedelta(hours=1), "sig"))
+                slowest = max(slowest, time.perf_counter() - saving)
+            repository.close()
+            elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            recovered = JournaledInvoiceRepository(directory, task_repo, contractor_repo)
+            recovery = time.perf_counter() - started
+            assert len(recovered.invoices) == size
+            recovered.close()
+
+        label = "journal only" if snapshot_every > size else f"snapshot every {snapshot_every}"
+        print(f"{label:>24}: {size / elapsed:>10.0f} saves/s, slowest save {slowest * 1000:.1f}ms, recovery {recovery:.3f}s")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,73 @@
+"""
+Compares the memory held by invoices stored as plain objects with a __dict__,
+as the current slotted domain objects and in the columnar repository.
+
+Usage: python benchmarks/bench_memory.py [invoices]
+"""
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from columnar import ColumnarInvoiceRepository
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice, InvoiceRepository
+from task import Task, TaskRepository
+
+class DictInvoice:
+    """
+    The invoice layout before __slots__, for comparison
+    """
+    def __init__(self, contractor, task, start_time, end_time, signature, id=None):
+        self.id = id
+        self.contractor = contractor
+        self.task = task
+        self.start_time = start_time
+        self.end_time = end_time
+        self.signature = signature
+
+def measure(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+def main(size):
+    contractor_repo = ContractorRepository()
+    contractor_repo.add(Contractor(None, "Alice"))
+    contractor = contractor_repo.find_by_id(0)
+    task_repo = TaskRepository()
+    task_repo.add(Task(None, "Office", "English", "Spanish", datetime(2025, 1, 1)))
+    task = task_repo.get(0)
+    base = datetime(2025, 1, 1)
+    signature = "signature"
+
+    def objects(cls):
+        def build():
+            repository = InvoiceRepository()
+            for i in range(size):
+                start_time = base + timedelta(minutes=i)
+                invoice = cls(contractor, task, start_time, start_time + timedelta(hours=1), signature)
+                invoice.id = i
+                repository.invoices[i] = invoice
+            return repository
+        return build
+
+    def columnar():
+        repository = ColumnarInvoiceRepository(task_repo, contractor_repo)
+        for i in range(size):
+            start_time = base + timedelta(minutes=i)
+            repository.save(Invoice(contractor, task, start_time, start_time + timedelta(hours=1), signature))
+        return repository
+
+    print(f"{size} invoices")
+    for label, build in (("__dict__ objects", objects(DictInvoice)), ("__slots__ objects", objects(Invoice)), ("columnar", columnar)):
+        used = measure(build)
+        print(f"{label:>18}: {used / 2**20:>8.1f} MiB, {used / size:>6.0f} B/invoice")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
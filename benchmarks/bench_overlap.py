@@ -0,0 +1,44 @@
+"""
+Compares overlap checks through BillingIntervals with a scan over the contractor's drafts,
+for a contractor with many non overlapping drafts.
+
+Usage: python benchmarks/bench_overlap.py [drafts per contractor] [checks]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from overlap import BillingIntervals
+
+def main(drafts: int, checks: int):
+    base = datetime(2025, 1, 1)
+    intervals = [(base + timedelta(hours=2 * i), base + timedelta(hours=2 * i + 1)) for i in range(drafts)]
+    billing = BillingIntervals(reject=False)
+    started = time.perf_counter()
+    for key, (start, end) in enumerate(intervals):
+        billing.add(0, start, end, ("draft", key))
+    print(f"{drafts} drafts indexed in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(1)
+    queries = []
+    for _ in range(checks):
+        start = base + timedelta(minutes=rng.randrange(drafts * 120))
+        queries.append((start, start + timedelta(minutes=90)))
+
+    started = time.perf_counter()
+    found = sum(len(billing.check(0, start, end)) for start, end in queries)
+    indexed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scanned = sum(sum(1 for s, e in intervals if s < end and e > start) for start, end in queries)
+    scan = time.perf_counter() - started
+
+    assert found == scanned
+    print(f"{checks} checks: interval tree {indexed * 1e6 / checks:.1f}us, scan {scan * 1e6 / checks:.1f}us per check")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,45 @@
+"""
+Times the billing report over a columnar invoice repository with millions of invoices:
+the first refresh (copying the columns) and each grouped query.
+
+Usage: python benchmarks/bench_reporting.py [invoices]
+"""
+import sys
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from columnar import ColumnarInvoiceRepository
+from reporting import BillingReport
+from generator import Dataset
+
+def main(size: int):
+    data = Dataset(42, tasks=100_000, contractors=10_000, drafts=0)
+    repository = ColumnarInvoiceRepository(data.task_repo, data.contractor_repo)
+
+    # fill the columns directly, saving millions of Invoice objects one by one would dominate the run
+    rng = np.random.default_rng(42)
+    start_times = rng.integers(1_735_689_600_000_000, 1_767_225_600_000_000, size, dtype=np.int64)
+    repository.contractor_ids = array("q", rng.integers(0, 10_000, size, dtype=np.int64).tobytes())
+    repository.task_ids = array("q", rng.integers(0, 100_000, size, dtype=np.int64).tobytes())
+    repository.start_times = array("q", start_times.tobytes())
+    repository.end_times = array("q", (start_times + rng.integers(1_800_000_000, 28_800_000_000, size, dtype=np.int64)).tobytes())
+    repository.signatures = ["signature"] * size
+
+    print(f"{size} invoices")
+    report = BillingReport(repository)
+    started = time.perf_counter()
+    report.refresh()
+    print(f"{'refresh':>28}: {time.perf_counter() - started:.3f}s")
+    for dimensions in (("contractor",), ("language_pair",), ("location",), ("month",), ("contractor", "month"),
+                       ("location", "language_pair", "month")):
+        started = time.perf_counter()
+        groups = report.hours_by(*dimensions)
+        print(f"{' x '.join(dimensions):>28}: {time.perf_counter() - started:.3f}s, {len(groups)} groups")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
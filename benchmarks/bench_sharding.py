@@ -0,0 +1,71 @@
+"""
+Month-end report: sums billed hours by contractor and month over a SQLite database, sequentially and
+sharded by contractor across 1, 4, 8 and 16 worker processes that each read their own shard.
+Sequential runs read through SqliteInvoiceRepository, and with the same query as a worker in this process.
+Pool start-up is not timed, a month-end job would keep its pool.
+
+Usage: python benchmarks/bench_sharding.py [invoices] [workers ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from generator import Dataset
+from service import InvoiceManagementService
+from sharding import _hours_by_shard, hours_by
+from sqlite_repository import ConnectionPool, SqliteContractorRepository, SqliteInvoiceRepository, SqliteTaskRepository
+
+def store(data: Dataset, pool: ConnectionPool):
+    SqliteContractorRepository(pool).add_many(data.contractor_repo.contractors.values())
+    SqliteTaskRepository(pool).add_many(data.task_repo.tasks.values())
+    with pool.connection() as connection:
+        connection.executemany("INSERT INTO invoices VALUES (?, ?, ?, ?, ?, ?)", (
+            (invoice.id, invoice.contractor.id, invoice.task.id,
+             invoice.start_time.isoformat(), invoice.end_time.isoformat(), invoice.signature)
+            for invoice in data.invoice_repo.iter_after()))
+
+def sequential(pool: ConnectionPool) -> float:
+    started = time.perf_counter()
+    task_repo = SqliteTaskRepository(pool)
+    hours = {}
+    for invoice in SqliteInvoiceRepository(pool, task_repo, SqliteContractorRepository(pool)).iter_after():
+        key = (invoice.contractor.id, f"{invoice.start_time.year:04d}-{invoice.start_time.month:02d}")
+        hours[key] = hours.get(key, 0.0) + (invoice.end_time - invoice.start_time).total_seconds() / 3600
+    return time.perf_counter() - started
+
+def in_process(database: str) -> float:
+    started = time.perf_counter()
+    _hours_by_shard(database, ("contractor", "month"), 0, 1)
+    return time.perf_counter() - started
+
+def sharded(database: str, workers: int) -> float:
+    with ProcessPoolExecutor(workers) as executor:
+        # start every worker before timing
+        list(executor.map(abs, range(workers * 4)))
+        started = time.perf_counter()
+        hours_by(database, "contractor", "month", workers=workers, executor=executor)
+        return time.perf_counter() - started
+
+def main(invoices: int, workers):
+    data = Dataset(7, tasks=invoices * 2, contractors=max(invoices // 100, 1), drafts=invoices)
+    InvoiceManagementService(data.task_repo, data.contractor_repo, data.draft_repo,
+                             data.invoice_repo).submit_invoices(list(data.draft_repo.draft_invoices))
+    with tempfile.TemporaryDirectory() as directory:
+        database = str(Path(directory) / "invoices.db")
+        pool = ConnectionPool(database)
+        store(data, pool)
+        print(f"{len(data.invoice_repo.invoices)} invoices, {os.cpu_count()} CPUs")
+        print(f"{'workers':>12} {'report s':>10}")
+        print(f"{'repository':>12} {sequential(pool):>10.2f}")
+        print(f"{'in process':>12} {in_process(database):>10.2f}")
+        for count in workers:
+            print(f"{count:>12} {sharded(database, count):>10.2f}")
+        pool.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000, [int(arg) for arg in sys.argv[2:]] or [1, 4, 8, 16])
@@ -0,0 +1,60 @@
+"""
+Compares start-up by rebuilding the repositories record by record with opening a snapshot,
+then times a first submission, which looks up a draft, its task's invoice and saves.
+
+Usage: python benchmarks/bench_snapshot.py [records]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import snapshot
+from contractor import Contractor, ContractorRepository
+from generator import Dataset
+from invoice import DraftInvoice, DraftInvoiceRepository, InvoiceRepository
+from service import InvoiceManagementService
+from task import Task, TaskRepository
+
+def rebuild(data: Dataset):
+    """Rebuilds the repositories from plain records, the way main.py builds them"""
+    contractor_repo = ContractorRepository()
+    contractor_repo.add_many(Contractor(c.id, c.name) for c in data.contractor_repo.contractors.values())
+    task_repo = TaskRepository()
+    task_repo.add_many(Task(t.id, t.location, t.source_language, t.target_language, t.start_time)
+                       for t in data.task_repo.tasks.values())
+    draft_repo = DraftInvoiceRepository()
+    draft_repo.save_many(DraftInvoice(contractor_repo.find_by_id(d.contractor.id), task_repo.get(d.task.id),
+                                      d.start_time, d.end_time, d.signature, d.id)
+                         for d in data.draft_repo.draft_invoices.values())
+    return task_repo, contractor_repo, draft_repo, InvoiceRepository()
+
+def main(records: int):
+    data = Dataset(11, tasks=records, contractors=max(records // 100, 1), drafts=records)
+    draft_id = next(iter(data.draft_repo.draft_invoices))
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "repositories.snapshot")
+        started = time.perf_counter()
+        snapshot.write(path, data.task_repo, data.contractor_repo, data.draft_repo, data.invoice_repo)
+        print(f"{records} tasks and drafts, snapshot written in {time.perf_counter() - started:.2f}s, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+
+        started = time.perf_counter()
+        repositories = rebuild(data)
+        print(f"rebuild:       {time.perf_counter() - started:.3f}s")
+
+        started = time.perf_counter()
+        loaded = snapshot.Snapshot(path)
+        opened = time.perf_counter() - started
+        service = InvoiceManagementService(loaded.task_repository, loaded.contractor_repository,
+                                           loaded.draft_repository, loaded.invoice_repository)
+        service.submit_invoice(draft_id)
+        print(f"snapshot open: {opened:.3f}s, first submission {time.perf_counter() - started - opened:.4f}s")
+        loaded.close()
+        del repositories
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
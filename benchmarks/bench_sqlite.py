@@ -0,0 +1,74 @@
+"""
+Compares the SQLite repositories with the in memory repositories
+on bulk loading, task queries and the draft to invoice workflow.
+
+Usage: python benchmarks/bench_sqlite.py [tasks]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoiceRepository, InvoiceRepository
+from service import DraftInvoiceService, InvoiceManagementService
+from sqlite_repository import (ConnectionPool, SqliteContractorRepository, SqliteDraftInvoiceRepository,
+                               SqliteInvoiceRepository, SqliteTaskRepository)
+from task import Task, TaskRepository
+from bench_task_lookup import LANGUAGES, LOCATIONS
+
+def in_memory(_):
+    task_repo = TaskRepository()
+    contractor_repo = ContractorRepository()
+    return task_repo, contractor_repo, DraftInvoiceRepository(), InvoiceRepository()
+
+def sqlite(directory):
+    pool = ConnectionPool(str(Path(directory) / "bench.db"))
+    task_repo = SqliteTaskRepository(pool)
+    contractor_repo = SqliteContractorRepository(pool)
+    return (task_repo, contractor_repo,
+            SqliteDraftInvoiceRepository(pool, task_repo, contractor_repo),
+            SqliteInvoiceRepository(pool, task_repo, contractor_repo))
+
+def run(factory, size):
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        task_repo, contractor_repo, draft_repo, invoice_repo = factory(directory)
+        base = datetime(2025, 1, 1)
+        tasks = [Task(None, LOCATIONS[i % len(LOCATIONS)], LANGUAGES[i % 7], LANGUAGES[i % 5], base + timedelta(minutes=i))
+                 for i in range(size)]
+
+        started = time.perf_counter()
+        contractor_repo.add_many(Contractor(None, f"Contractor {i}") for i in range(100))
+        task_repo.add_many(tasks)
+        timings["bulk load"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for location in LOCATIONS:
+            task_repo.find_by_attributes(location, "english", "spanish")
+            task_repo.find_by_location_time_range(location, base, base + timedelta(days=1))
+        timings["16 queries"] = time.perf_counter() - started
+
+        draft_service = DraftInvoiceService(task_repo, contractor_repo, draft_repo)
+        invoice_service = InvoiceManagementService(task_repo, contractor_repo, draft_repo, invoice_repo)
+        started = time.perf_counter()
+        for i in range(1000):
+            draft_id = draft_service.save_draft_invoice(i % 100, i, base, base + timedelta(hours=1), "sig")
+            draft_service.update(draft_id, None, None, None, None, "new-sig")
+            invoice_service.submit_invoice(draft_id)
+        timings["1000 workflows"] = time.perf_counter() - started
+    return timings
+
+def main(size):
+    print(f"{size} tasks")
+    print(f"{'operation':>16} {'memory s':>10} {'sqlite s':>10}")
+    memory_timings = run(in_memory, size)
+    sqlite_timings = run(sqlite, size)
+    for operation, elapsed in memory_timings.items():
+        print(f"{operation:>16} {elapsed:>10.4f} {sqlite_timings[operation]:>10.4f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
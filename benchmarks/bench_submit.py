@@ -0,0 +1,45 @@
+"""
+Measures InvoiceManagementService.submit_invoice throughput for a batch of drafts.
+
+Usage: python benchmarks/bench_submit.py [drafts ...]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoiceRepository, InvoiceRepository
+from service import DraftInvoiceService, InvoiceManagementService
+from task import Task, TaskRepository
+
+def main(sizes):
+    print(f"{'drafts':>10} {'seconds':>10} {'submits/s':>12}")
+    for size in sizes:
+        contractor_repo = ContractorRepository()
+        contractor_repo.add(Contractor(None, "Alice"))
+        task_repo = TaskRepository()
+        draft_repo = DraftInvoiceRepository()
+        invoice_repo = InvoiceRepository()
+        draft_service = DraftInvoiceService(task_repo, contractor_repo, draft_repo)
+        invoice_service = InvoiceManagementService(task_repo, contractor_repo, draft_repo, invoice_repo)
+
+        base = datetime(2025, 1, 1)
+        draft_ids = []
+        for i in range(size):
+            start_time = base + timedelta(hours=i)
+            task = Task(None, "Office", "English", "Spanish", start_time)
+            task_repo.add(task)
+            draft_ids.append(draft_service.save_draft_invoice(0, task.id, start_time, start_time + timedelta(minutes=30), "sig"))
+
+        started = time.perf_counter()
+        for draft_id in draft_ids:
+            invoice_service.submit_invoice(draft_id)
+        elapsed = time.perf_counter() - started
+        assert len(invoice_repo.invoices) == size
+        print(f"{size:>10} {elapsed:>10.3f} {size / elapsed:>12.0f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000])
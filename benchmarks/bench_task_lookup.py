@@ -0,0 +1,52 @@
+"""
+Compares the linear scan previously used by TaskRepository.find_by_attributes
+with the casefolded attribute index.
+
+Usage: python benchmarks/bench_task_lookup.py [size ...]
+"""
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from task import Task, TaskRepository
+
+LOCATIONS = ["Office", "Remote", "Court", "Hospital", "School", "Embassy", "Police", "Clinic"]
+LANGUAGES = ["English", "Spanish", "French", "German", "Italian", "Romanian", "Polish", "Arabic"]
+
+def build_repository(size: int) -> TaskRepository:
+    rnd = random.Random(42)
+    repository = TaskRepository()
+    base = datetime(2025, 1, 1)
+    for _ in range(size):
+        repository.add(Task(None,
+                            rnd.choice(LOCATIONS),
+                            rnd.choice(LANGUAGES),
+                            rnd.choice(LANGUAGES),
+                            base + timedelta(minutes=rnd.randrange(525600))))
+    return repository
+
+def scan(repository: TaskRepository, location: str, source_language: str, target_language: str):
+    return [
+        task for task in repository.tasks.values()
+        if task.location.lower() == location.lower() and
+            task.source_language.lower() == source_language.lower() and
+            task.target_language.lower() == target_language.lower()
+    ]
+
+def main(sizes):
+    print(f"{'tasks':>10} {'scan ms':>10} {'index ms':>10} {'speedup':>10}")
+    for size in sizes:
+        repository = build_repository(size)
+        query = ("office", "ENGLISH", "spanish")
+        assert len(scan(repository, *query)) == len(repository.find_by_attributes(*query))
+        runs = max(1, 100000 // size)
+        scan_ms = timeit.timeit(lambda: scan(repository, *query), number=runs) / runs * 1000
+        index_ms = timeit.timeit(lambda: repository.find_by_attributes(*query), number=runs) / runs * 1000
+        print(f"{size:>10} {scan_ms:>10.3f} {index_ms:>10.3f} {scan_ms / index_ms:>9.0f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
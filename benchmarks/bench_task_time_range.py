@@ -0,0 +1,37 @@
+"""
+Compares the linear scan previously used by TaskRepository.find_by_location_time_range
+with the per-location start time index.
+
+Usage: python benchmarks/bench_task_time_range.py [size ...]
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from task import TaskRepository
+from bench_task_lookup import build_repository
+
+def scan(repository: TaskRepository, location: str, start_time: datetime, end_time: datetime):
+    return [
+        task for task in repository.tasks.values()
+        if task.location.lower() == location.lower() and
+            task.start_time >= start_time and task.start_time <= end_time
+    ]
+
+def main(sizes):
+    print(f"{'tasks':>10} {'scan ms':>10} {'index ms':>10} {'speedup':>10}")
+    for size in sizes:
+        repository = build_repository(size)
+        start_time = datetime(2025, 3, 1)
+        query = ("office", start_time, start_time + timedelta(days=7))
+        assert len(scan(repository, *query)) == len(repository.find_by_location_time_range(*query))
+        runs = max(1, 100000 // size)
+        scan_ms = timeit.timeit(lambda: scan(repository, *query), number=runs) / runs * 1000
+        index_ms = timeit.timeit(lambda: repository.find_by_location_time_range(*query), number=runs) / runs * 1000
+        print(f"{size:>10} {scan_ms:>10.3f} {index_ms:>10.3f} {scan_ms / index_ms:>9.0f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,67 @@
+"""
+Measures how repository throughput changes with the number of threads,
+for the striped thread safe repositories and for a single lock around the in memory repositories.
+Each thread adds tasks and drafts and reads them back.
+
+Usage: python benchmarks/bench_threads.py [operations per thread]
+"""
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor
+from invoice import DraftInvoice, DraftInvoiceRepository
+from task import Task, TaskRepository
+from threadsafe import ThreadSafeDraftInvoiceRepository, ThreadSafeTaskRepository
+
+class GlobalLock:
+    """
+    Serializes every call to the wrapped repository with one lock
+    """
+    def __init__(self, repository):
+        self.repository = repository
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.repository, name)
+
+        def call(*args):
+            with self.lock:
+                return method(*args)
+        return call
+
+def run(tasks, drafts, threads: int, operations: int) -> float:
+    base = datetime(2025, 1, 1)
+
+    def work(worker: int):
+        contractor = Contractor(worker, f"Contractor {worker}")
+        location = f"Location {worker}"
+        for i in range(operations):
+            task = Task(None, location, "English", "Spanish", base + timedelta(minutes=i))
+            tasks.add(task)
+            drafts.save(DraftInvoice(contractor, task, task.start_time, task.start_time + timedelta(hours=1), "sig"))
+            if i % 10 == 0:
+                tasks.find_by_attributes(location, "english", "spanish")
+                drafts.list_by_contractor(contractor)
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * operations / (time.perf_counter() - started)
+
+def main(operations: int):
+    print(f"{'threads':>8} {'global lock ops/s':>18} {'striped ops/s':>14}")
+    for threads in (1, 2, 4, 8, 16):
+        global_lock = run(GlobalLock(TaskRepository()), GlobalLock(DraftInvoiceRepository()), threads, operations)
+        striped = run(ThreadSafeTaskRepository(), ThreadSafeDraftInvoiceRepository(), threads, operations)
+        print(f"{threads:>8} {global_lock:>18.0f} {striped:>14.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
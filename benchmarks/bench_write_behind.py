@@ -0,0 +1,55 @@
+"""
+Simulates editor autosave (one DraftInvoiceService.update per keystroke) over the SQLite draft repository,
+with and without write-behind, and reports the time taken and the number of backend writes.
+
+Usage: python benchmarks/bench_write_behind.py [drafts] [keystrokes per draft]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor
+from service import DraftInvoiceService, InvoiceManagementService
+from sqlite_repository import (ConnectionPool, SqliteContractorRepository, SqliteDraftInvoiceRepository,
+                               SqliteInvoiceRepository, SqliteTaskRepository)
+from task import Task
+from write_behind import WriteBehindDraftInvoiceRepository
+
+def run(drafts: int, keystrokes: int, write_behind: bool):
+    with tempfile.TemporaryDirectory() as directory:
+        pool = ConnectionPool(str(Path(directory) / "bench.db"))
+        task_repo = SqliteTaskRepository(pool)
+        contractor_repo = SqliteContractorRepository(pool)
+        draft_repo = SqliteDraftInvoiceRepository(pool, task_repo, contractor_repo)
+        if write_behind:
+            draft_repo = WriteBehindDraftInvoiceRepository(draft_repo)
+        invoice_repo = SqliteInvoiceRepository(pool, task_repo, contractor_repo)
+        contractor_repo.add(Contractor(None, "Alice"))
+        base = datetime(2025, 1, 1)
+        task_repo.add_many(Task(None, "Office", "English", "Spanish", base + timedelta(hours=i)) for i in range(drafts))
+        draft_service = DraftInvoiceService(task_repo, contractor_repo, draft_repo)
+        invoice_service = InvoiceManagementService(task_repo, contractor_repo, draft_repo, invoice_repo)
+
+        started = time.perf_counter()
+        for task_id in range(drafts):
+            draft_id = draft_service.save_draft_invoice(0, task_id, base, base + timedelta(hours=1), "s")
+            for i in range(keystrokes):
+                draft_service.update(draft_id, None, None, None, None, "signature"[:i % 9 + 1])
+            invoice_service.submit_invoice(draft_id)
+        elapsed = time.perf_counter() - started
+        pool.close()
+    return elapsed, getattr(draft_repo, "writes", None)
+
+def main(drafts: int, keystrokes: int):
+    print(f"{drafts} drafts x {keystrokes} keystrokes")
+    for write_behind in (False, True):
+        elapsed, writes = run(drafts, keystrokes, write_behind)
+        label = "write-behind" if write_behind else "write-through"
+        print(f"{label:>14}: {elapsed:.2f}s" + (f", {writes} backend writes" if writes is not None else ""))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100, int(sys.argv[2]) if len(sys.argv) > 2 else 50)
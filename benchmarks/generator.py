@@ -0,0 +1,61 @@
+"""
+Seeded generator of synthetic tasks, contractors and draft invoices.
+The same seed and sizes always produce the same data.
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoice, DraftInvoiceRepository, InvoiceRepository
+from task import Task, TaskRepository
+
+LOCATIONS = ["Office", "Remote", "Court", "Hospital", "School", "Embassy", "Police", "Clinic",
+             "Airport", "Prison", "Bank", "Notary", "Town Hall", "Factory", "Harbour", "University"]
+LANGUAGES = ["English", "Spanish", "French", "German", "Italian", "Romanian", "Polish", "Arabic",
+             "Russian", "Ukrainian", "Portuguese", "Dutch", "Turkish", "Chinese", "Japanese", "Hindi"]
+BASE_TIME = datetime(2025, 1, 1)
+MINUTES_PER_YEAR = 525_600
+
+class Generator:
+    def __init__(self, seed: int = 42):
+        self.random = random.Random(seed)
+
+    def contractors(self, count: int) -> Iterator[Contractor]:
+        for i in range(count):
+            yield Contractor(None, f"Contractor {i:07d}")
+
+    def tasks(self, count: int) -> Iterator[Task]:
+        rnd = self.random
+        for _ in range(count):
+            source, target = rnd.sample(LANGUAGES, 2)
+            yield Task(None, rnd.choice(LOCATIONS), source, target, BASE_TIME + timedelta(minutes=rnd.randrange(MINUTES_PER_YEAR)))
+
+    def drafts(self, count: int, contractors: ContractorRepository, tasks: TaskRepository) -> Iterator[DraftInvoice]:
+        rnd = self.random
+        contractor_ids = list(contractors.contractors)
+        task_ids = list(tasks.tasks)
+        for _ in range(count):
+            task = tasks.tasks[rnd.choice(task_ids)]
+            start_time = task.start_time + timedelta(minutes=rnd.randrange(-30, 30))
+            yield DraftInvoice(contractors.contractors[rnd.choice(contractor_ids)], task,
+                               start_time, start_time + timedelta(minutes=rnd.randrange(30, 480)), "signature")
+
+class Dataset:
+    """
+    Populated in memory repositories
+    """
+    def __init__(self, seed: int, tasks: int, contractors: int, drafts: int):
+        generator = Generator(seed)
+        self.contractor_repo = ContractorRepository()
+        self.contractor_repo.add_many(generator.contractors(contractors))
+        self.task_repo = TaskRepository()
+        self.task_repo.add_many(generator.tasks(tasks))
+        self.draft_repo = DraftInvoiceRepository()
+        self.draft_repo.save_many(generator.drafts(drafts, self.contractor_repo, self.task_repo))
+        self.invoice_repo = InvoiceRepository()
+        self.random = generator.random
@@ -0,0 +1,135 @@
+"""
+End to end benchmark suite: times every repository query and the service workflows from main.py
+on seeded synthetic data of several sizes and writes the results as JSON.
+Comparing with an earlier result file reports operations that got slower.
+
+Usage:
+    python benchmarks/suite.py --sizes 10000 100000 --output results.json
+    python benchmarks/suite.py --compare baseline.json --output results.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from service import DraftInvoiceService, InvoiceManagementService
+from generator import BASE_TIME, LANGUAGES, LOCATIONS, Dataset
+
+def measure(operation: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    """
+    Calls the operation repeat times (with the call number) and returns per call timings in seconds.
+    """
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        operation(i)
+        timings.append(time.perf_counter() - started)
+    return {
+        "calls": repeat,
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "p95": sorted(timings)[int(0.95 * (repeat - 1))],
+    }
+
+def run(size: int, seed: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    started = time.perf_counter()
+    data = Dataset(seed, tasks=size, contractors=max(1, size // 100), drafts=size)
+    results = {"generate": {"calls": 1, "mean": time.perf_counter() - started}}
+
+    rnd = data.random
+    contractors = list(data.contractor_repo.contractors.values())
+    tasks = list(data.task_repo.tasks.values())
+    draft_service = DraftInvoiceService(data.task_repo, data.contractor_repo, data.draft_repo)
+    invoice_service = InvoiceManagementService(data.task_repo, data.contractor_repo, data.draft_repo, data.invoice_repo)
+
+    def pick(items):
+        return items[rnd.randrange(len(items))]
+
+    repository_queries = {
+        "TaskRepository.get": lambda _: data.task_repo.get(pick(tasks).id),
+        "TaskRepository.find_by_attributes": lambda _: data.task_repo.find_by_attributes(
+            pick(LOCATIONS), pick(LANGUAGES), pick(LANGUAGES)),
+        "TaskRepository.find_by_location_time_range": lambda _: data.task_repo.find_by_location_time_range(
+            pick(LOCATIONS), BASE_TIME + timedelta(days=rnd.randrange(358)), BASE_TIME + timedelta(days=rnd.randrange(358, 365))),
+        "ContractorRepository.find_by_id": lambda _: data.contractor_repo.find_by_id(pick(contractors).id),
+        "ContractorRepository.find_by_name": lambda _: data.contractor_repo.find_by_name(pick(contractors).name.upper()),
+        "DraftInvoiceRepository.get": lambda _: data.draft_repo.get(rnd.randrange(size)),
+        "DraftInvoiceRepository.list_by_contractor": lambda _: data.draft_repo.list_by_contractor(pick(contractors)),
+        "TaskRepository.find_by_location_time_range_page": lambda _: data.task_repo.find_by_location_time_range_page(
+            pick(LOCATIONS), BASE_TIME + timedelta(days=rnd.randrange(358)), BASE_TIME + timedelta(days=rnd.randrange(358, 365)), 50),
+        "DraftInvoiceRepository.list_by_contractor_page": lambda _: data.draft_repo.list_by_contractor_page(pick(contractors), 50),
+    }
+    for name, operation in repository_queries.items():
+        results[name] = measure(operation, repeat)
+
+    # the workflow of main.py: save a draft, update it, list the contractor drafts, submit it, read the invoice back
+    draft_ids: List[int] = []
+    results["DraftInvoiceService.save_draft_invoice"] = measure(lambda i: draft_ids.append(draft_service.save_draft_invoice(
+        contractors[i % len(contractors)].id, tasks[i].id, tasks[i].start_time, tasks[i].start_time + timedelta(hours=1), "signature")), repeat)
+    results["DraftInvoiceService.update"] = measure(
+        lambda i: draft_service.update(draft_ids[i], None, None, None, None, "new-signature"), repeat)
+    results["DraftInvoiceService.list"] = measure(lambda i: draft_service.list(contractors[i % len(contractors)].id), repeat)
+    results["InvoiceManagementService.submit_invoice"] = measure(
+        lambda i: invoice_service.submit_invoice(draft_ids[i]), repeat)
+    results["InvoiceRepository.get_by_task"] = measure(lambda i: data.invoice_repo.get_by_task(tasks[i]), repeat)
+
+    batch = [(contractors[i % len(contractors)].id, tasks[i].id, tasks[i].start_time, tasks[i].start_time + timedelta(hours=1), "signature")
+             for i in range(repeat, min(size, repeat + 1000))]
+    saved = []
+    results["DraftInvoiceService.save_draft_invoices"] = measure(lambda _: saved.append(draft_service.save_draft_invoices(batch)), 1)
+    results["InvoiceManagementService.submit_invoices"] = measure(
+        lambda _: invoice_service.submit_invoices(id for id in saved[0].ids if id is not None), 1)
+    return results
+
+def compare(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for size, operations in current["results"].items():
+        for name, timing in operations.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if before is None or "median" not in timing:
+                continue
+            if timing["median"] > before["median"] * (1 + tolerance):
+                regressions.append(f"{size} {name}: {before['median'] * 1e6:.1f}us -> {timing['median'] * 1e6:.1f}us")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1000, help="calls per timed operation")
+    parser.add_argument("--output", default="-", help="JSON result file, - for stdout")
+    parser.add_argument("--compare", help="earlier JSON result file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before reporting a regression")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": {str(size): run(size, args.seed, min(args.repeat, size)) for size in args.sizes},
+    }
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = compare(json.load(baseline), report, args.tolerance)
+        for regression in regressions:
+            print("regression:", regression, file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
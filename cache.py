@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+from paging import Page
+from task import Task, TaskRepository, _attributes_key
+
+class CachingTaskRepository(TaskRepository):
+    """
+    Bounded LRU cache of find_by_attributes and find_by_location_time_range results
+    in front of another task repository (typically a persistent one).
+    Queries are keyed on their casefolded arguments. add drops only the cached results the new task
+    (or the task it replaces) could appear in: the result of its attributes, and the time ranges of
+    its location containing its start time. What the replaced task was cached under is recorded per
+    task ID, as a stored task may be changed in place before it is re-added.
+    hits, misses and evictions help size max_entries.
+    Tasks must be added through this repository for the cache to stay correct.
+    """
+    def __init__(self,  # pylint: disable=super-init-not-called
+                 backend: TaskRepository,
+                 max_entries: int = 1024):
+        self.backend = backend
+        self.max_entries = max_entries
+        self._results: "OrderedDict[Hashable, Tuple[Task, ...]]" = OrderedDict()
+        # casefolded location -> cached time range keys of that location
+        self._ranges: Dict[str, Set[Tuple[str, str, datetime, datetime]]] = {}
+        # task ID -> attributes key, casefolded location and start time of the task when added or cached
+        self._cached_as: Dict[int, Tuple[Tuple[str, str, str], str, datetime]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def add(self, task: Task):
+        self.backend.add(task)
+        self._invalidate(task)
+
+    def add_many(self, tasks: Iterable[Task]):
+        tasks = list(tasks)
+        self.backend.add_many(tasks)
+        for task in tasks:
+            self._invalidate(task)
+
+    def get(self, task_id: int) -> Optional[Task]:
+        return self.backend.get(task_id)
+
+    def find_by_attributes(self, location: str, source_language: str, target_language: str) -> List[Task]:
+        key = ("attributes",) + _attributes_key(location, source_language, target_language)
+        result = self._lookup(key)
+        if result is None:
+            result = tuple(self.backend.find_by_attributes(location, source_language, target_language))
+            self._store(key, result)
+        return list(result)
+
+    def find_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> List[Task]:
+        key = ("time range", location.casefold(), start_time, end_time)
+        result = self._lookup(key)
+        if result is None:
+            result = tuple(self.backend.find_by_location_time_range(location, start_time, end_time))
+            self._store(key, result)
+            self._ranges.setdefault(key[1], set()).add(key)
+        return list(result)
+
+    def iter_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> Iterator[Task]:
+        return self.backend.iter_by_location_time_range(location, start_time, end_time)
+
+    # pages are not cached, they are cheap and rarely requested twice
+    def find_by_attributes_page(self, location: str, source_language: str, target_language: str,
+                                limit: int, token: Optional[str] = None) -> Page[Task]:
+        return self.backend.find_by_attributes_page(location, source_language, target_language, limit, token)
+
+    def find_by_location_time_range_page(self, location: str, start_time: datetime, end_time: datetime,
+                                         limit: int, token: Optional[str] = None) -> Page[Task]:
+        return self.backend.find_by_location_time_range_page(location, start_time, end_time, limit, token)
+
+    def clear(self):
+        self._results.clear()
+        self._ranges.clear()
+        self._cached_as.clear()
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[Task, ...]]:
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def _store(self, key: Hashable, result: Tuple[Task, ...]):
+        self._results[key] = result
+        for task in result:
+            self._record(task)
+        if len(self._results) > self.max_entries:
+            evicted, _ = self._results.popitem(last=False)
+            self._forget(evicted)
+            self.evictions += 1
+
+    def _forget(self, key: Hashable):
+        if key[0] == "time range":
+            ranges = self._ranges[key[1]]
+            ranges.discard(key)
+            if not ranges:
+                del self._ranges[key[1]]
+
+    def _record(self, task: Task):
+        self._cached_as[task.id] = (_attributes_key(task.location, task.source_language, task.target_language),
+                                    task.location.casefold(), task.start_time)
+
+    def _invalidate(self, task: Task):
+        # drop the results of the task as it was recorded, and of the task as added now
+        previous = self._cached_as.get(task.id)
+        self._record(task)
+        current = self._cached_as[task.id]
+        for attributes, location, start_time in ([current] if previous in (None, current) else [previous, current]):
+            key = ("attributes",) + attributes
+            if self._results.pop(key, None) is not None:
+                self.invalidations += 1
+
+            stale = [key for key in self._ranges.get(location, ()) if key[2] <= start_time <= key[3]]
+            for key in stale:
+                del self._results[key]
+                self._forget(key)
+                self.invalidations += 1
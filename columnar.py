@@ -0,0 +1,103 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from task import Task, TaskRepository
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice, InvoiceRepository
+
+# Columnar storage for large numbers of submitted invoices.
+# Instead of one object per invoice, every field is a column: IDs and times live in typed arrays
+# (times as microseconds since 1970-01-01, for naive datetimes) and the row number is the invoice ID.
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+class InvoiceView:
+    """
+    A read only view of one invoice row, fields are read from the columns on access.
+    """
+    __slots__ = ("_store", "id")
+
+    def __init__(self, store: "ColumnarInvoiceRepository", id: int):
+        self._store = store
+        self.id = id
+
+    @property
+    def contractor_id(self) -> int:
+        return self._store.contractor_ids[self.id]
+
+    @property
+    def task_id(self) -> int:
+        return self._store.task_ids[self.id]
+
+    @property
+    def contractor(self) -> Optional[Contractor]:
+        return self._store.contractor_repository.find_by_id(self.contractor_id)
+
+    @property
+    def task(self) -> Optional[Task]:
+        return self._store.task_repository.get(self.task_id)
+
+    @property
+    def start_time(self) -> datetime:
+        return _EPOCH + self._store.start_times[self.id] * _MICROSECOND
+
+    @property
+    def end_time(self) -> datetime:
+        return _EPOCH + self._store.end_times[self.id] * _MICROSECOND
+
+    @property
+    def signature(self) -> str:
+        return self._store.signatures[self.id]
+
+class ColumnarInvoiceRepository(InvoiceRepository):
+    """
+    Repository for submitted invoices stored column by column.
+    Saved invoices are copied into the columns, reads return InvoiceView objects.
+    Once submitted, invoices become immutable (no editing or deletion).
+    """
+    def __init__(self, task_repository: TaskRepository, contractor_repository: ContractorRepository):  # pylint: disable=super-init-not-called
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+        self.contractor_ids = array("q")
+        self.task_ids = array("q")
+        self.start_times = array("q")
+        self.end_times = array("q")
+        self.signatures: List[str] = []
+        # secondary index: task ID -> invoice ID
+        self._by_task: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    def __iter__(self) -> Iterator[InvoiceView]:
+        return (InvoiceView(self, id) for id in range(len(self)))
+
+    def save(self, invoice: Invoice) -> Invoice:
+        if invoice.id is not None:
+            raise ValueError(f"Unexpected ID {invoice.id}")
+        if invoice.contractor.id is None or invoice.task.id is None:
+            raise ValueError("Invoice contractor and task must have IDs")
+
+        invoice.id = len(self)
+        self.contractor_ids.append(invoice.contractor.id)
+        self.task_ids.append(invoice.task.id)
+        self.start_times.append((invoice.start_time - _EPOCH) // _MICROSECOND)
+        self.end_times.append((invoice.end_time - _EPOCH) // _MICROSECOND)
+        self.signatures.append(invoice.signature)
+        self._by_task[invoice.task.id] = invoice.id
+        return invoice
+
+    def get(self, invoice_id: int) -> Optional[InvoiceView]:
+        if 0 <= invoice_id < len(self):
+            return InvoiceView(self, invoice_id)
+        return None
+
+    def iter_after(self, after_id: Optional[int] = None) -> Iterator[InvoiceView]:
+        start = 0 if after_id is None else after_id + 1
+        return (InvoiceView(self, id) for id in range(start, len(self)))
+
+    def get_by_task(self, task: Task) -> Optional[InvoiceView]:
+        if task.id is None or task.id not in self._by_task:
+            return None
+        return InvoiceView(self, self._by_task[task.id])
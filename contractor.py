@@ -1,9 +1,12 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional
+from sequence import IdSequence
 
 class Contractor:
     """
     The Contractor object
     """
+    __slots__ = ("id", "name")
+
     def __init__(self, id: Optional[int], name: str):
         self.id = id
         self.name = name
@@ -11,21 +14,55 @@ class Contractor:
 class ContractorRepository:
     def __init__(self):
         self.contractors: Dict[int, Contractor] = {}
+        self.ids = IdSequence()
+        # secondary index: casefolded name -> contractor
+        self._by_name: Dict[str, Contractor] = {}
+        # contractor ID -> casefolded name it is indexed under, a stored contractor may be renamed before it is re-added
+        self._name_of: Dict[int, str] = {}
 
     def add(self, contractor: Contractor):
-        if contractor.id is None:
-            contractor.id = len(self.contractors)
-
         if self.find_by_name(contractor.name):
             raise ValueError(f"Contractor with name '{contractor.name}' already exists.")
 
-        self.contractors[contractor.id] = contractor
+        self._insert(contractor)
+
+    def add_many(self, contractors: Iterable[Contractor]):
+        """
+        Adds all contractors or none of them: names are checked against
+        the repository and against each other before anything is inserted.
+        """
+        batch: List[Contractor] = []
+        names: Dict[str, Contractor] = {}
+        for contractor in contractors:
+            key = contractor.name.casefold()
+            if key in self._by_name or key in names:
+                raise ValueError(f"Contractor with name '{contractor.name}' already exists.")
+            names[key] = contractor
+            batch.append(contractor)
+
+        for contractor in batch:
+            self._insert(contractor)
 
     def find_by_id(self, contractor_id: int) -> Optional[Contractor]:
         return self.contractors.get(contractor_id)
 
     def find_by_name(self, name: str) -> Optional[Contractor]:
-        for contractor in self.contractors.values():
-            if contractor.name.lower() == name.lower():
-                return contractor
-        return None
+        return self._by_name.get(name.casefold())
+
+    def _insert(self, contractor: Contractor):
+        if contractor.id is None:
+            contractor.id = self.ids.next()
+        else:
+            self.ids.observe(contractor.id)
+
+        previous_name = self._name_of.get(contractor.id)
+        if previous_name is not None:
+            del self._by_name[previous_name]
+
+        self.contractors[contractor.id] = contractor
+        self._index(contractor)
+
+    def _index(self, contractor: Contractor):
+        name = contractor.name.casefold()
+        self._by_name[name] = contractor
+        self._name_of[contractor.id] = name
@@ -0,0 +1,49 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from invoice import DraftInvoice, DraftInvoiceRepository
+
+class ExpiringDraftInvoiceRepository(DraftInvoiceRepository):
+    """
+    Draft repository that evicts drafts not saved for longer than ttl.
+    Drafts are kept in a heap ordered by last_saved, so evict_expired only looks at the expired ones.
+    Saving a draft again (DraftInvoiceService.update refreshes last_saved) pushes a new heap entry
+    and leaves the old one behind, old entries are pushed back under the current last_saved when popped
+    and dropped when the heap is rebuilt.
+    """
+    def __init__(self, ttl: timedelta):
+        super().__init__()
+        self.ttl = ttl
+        self.evicted = 0
+        self._heap: List[Tuple[datetime, int]] = []
+
+    def save(self, draft_invoice: DraftInvoice):
+        super().save(draft_invoice)
+        heapq.heappush(self._heap, (draft_invoice.last_saved, draft_invoice.id))
+        # entries of refreshed or deleted drafts pile up under frequent saves, keep them below half the heap
+        if len(self._heap) > 2 * len(self.draft_invoices) + 64:
+            self._heap = [(d.last_saved, id) for id, d in self.draft_invoices.items()]
+            heapq.heapify(self._heap)
+
+    def evict_expired(self, now: Optional[datetime] = None) -> List[int]:
+        """
+        Deletes the drafts last saved before now - ttl and returns their IDs, oldest first,
+        e.g. to remove their ("draft", id) entries from BillingIntervals.
+        """
+        deadline = (now or datetime.now()) - self.ttl
+        evicted: List[int] = []
+        while self._heap and self._heap[0][0] < deadline:
+            last_saved, id = heapq.heappop(self._heap)
+            draft = self.draft_invoices.get(id)
+            # skip entries of drafts deleted since
+            if draft is None:
+                continue
+            # refreshed since, in place by update_last_saved the draft has no other entry,
+            # put it back under its current last_saved so it still expires
+            if draft.last_saved != last_saved:
+                heapq.heappush(self._heap, (draft.last_saved, id))
+                continue
+            self.delete(id)
+            evicted.append(id)
+        self.evicted += len(evicted)
+        return evicted
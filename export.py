@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+# Streaming export of invoices and drafts to CSV or JSON lines.
+#
+# Records are read one at a time through the repositories' iter_after and written in chunks,
+# so memory use does not depend on the number of invoices. Every export returns the ID of the last
+# record written, pass it back as after_id to resume an interrupted export.
+
+INVOICE_FIELDS = ("id", "contractor_id", "contractor_name", "task_id", "location",
+                  "source_language", "target_language", "start_time", "end_time", "signature")
+DRAFT_FIELDS = INVOICE_FIELDS + ("last_saved",)
+
+def select(repository,
+           after_id: Optional[int] = None,
+           contractor_id: Optional[int] = None,
+           start_time: Optional[datetime] = None,
+           end_time: Optional[datetime] = None,
+           location: Optional[str] = None) -> Iterator[Any]:
+    """
+    Yields the invoices or drafts of the repository in ID order, after after_id,
+    of the given contractor, starting within [start_time, end_time] and for tasks at the given location.
+    """
+    location_key = location.casefold() if location is not None else None
+    for invoice in repository.iter_after(after_id):
+        if contractor_id is not None and invoice.contractor.id != contractor_id:
+            continue
+        if start_time is not None and invoice.start_time < start_time:
+            continue
+        if end_time is not None and invoice.start_time > end_time:
+            continue
+        if location_key is not None and invoice.task.location.casefold() != location_key:
+            continue
+        yield invoice
+
+def as_record(invoice) -> Dict[str, Any]:
+    record = {
+        "id": invoice.id,
+        "contractor_id": invoice.contractor.id,
+        "contractor_name": invoice.contractor.name,
+        "task_id": invoice.task.id,
+        "location": invoice.task.location,
+        "source_language": invoice.task.source_language,
+        "target_language": invoice.task.target_language,
+        "start_time": invoice.start_time.isoformat(),
+        "end_time": invoice.end_time.isoformat(),
+        "signature": invoice.signature,
+    }
+    last_saved = getattr(invoice, "last_saved", None)
+    if last_saved is not None:
+        record["last_saved"] = last_saved.isoformat()
+    return record
+
+def write_jsonl(invoices: Iterable[Any], output: TextIO, chunk_size: int = 1000) -> Optional[int]:
+    """
+    Writes one JSON object per line and returns the ID of the last invoice written.
+    """
+    last_id = None
+    chunk = []
+    for invoice in invoices:
+        chunk.append(json.dumps(as_record(invoice), ensure_ascii=False))
+        last_id = invoice.id
+        if len(chunk) >= chunk_size:
+            output.write("\n".join(chunk) + "\n")
+            chunk.clear()
+    if chunk:
+        output.write("\n".join(chunk) + "\n")
+    return last_id
+
+def write_csv(invoices: Iterable[Any], output: TextIO, chunk_size: int = 1000,
+              fields=INVOICE_FIELDS, header: bool = True) -> Optional[int]:
+    """
+    Writes CSV rows with the given fields and returns the ID of the last invoice written.
+    Pass header=False when appending to the file of an interrupted export.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    last_id = None
+    rows = 0
+    for invoice in invoices:
+        writer.writerow(as_record(invoice))
+        last_id = invoice.id
+        rows += 1
+        if rows >= chunk_size:
+            output.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    output.write(buffer.getvalue())
+    return last_id
@@ -0,0 +1,192 @@
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional instrumentation of services and repositories.
+#
+#   metrics = Metrics()
+#   task_repo = instrument(TaskRepository(), metrics, "task_repository")
+#   service = instrument(DraftInvoiceService(task_repo, ...), metrics, "draft_service")
+#
+# Objects that are not wrapped pay nothing, wrapped ones only check a flag while metrics.enabled is False.
+
+# latency histogram bucket upper bounds in seconds
+BUCKETS = (0.000_001, 0.000_005, 0.000_01, 0.000_05, 0.000_1, 0.000_5, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class MethodStats:
+    """
+    Counters of one instrumented method.
+    """
+    __slots__ = ("calls", "errors", "seconds", "buckets", "result_size", "results_sized")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # the last bucket counts calls slower than every bound
+        self.result_size = 0
+        self.results_sized = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "seconds": self.seconds,
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.buckets)),
+            "result_size": self.result_size,
+            "results_sized": self.results_sized,
+        }
+
+class Metrics:
+    """
+    Registry of call counts, latency histograms and result sizes per instrumented method.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._stats: Dict[Tuple[str, str], MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, component: str, method: str, seconds: float, result: Any = None, error: bool = False):
+        with self._lock:
+            stats = self._stats.get((component, method))
+            if stats is None:
+                stats = self._stats[(component, method)] = MethodStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+            if error:
+                stats.errors += 1
+            elif hasattr(result, "__len__"):
+                stats.result_size += len(result)
+                stats.results_sized += 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Returns {component: {method: counters}} as plain data.
+        """
+        with self._lock:
+            snapshot: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (component, method), stats in sorted(self._stats.items()):
+                snapshot.setdefault(component, {})[method] = stats.as_dict()
+            return snapshot
+
+    def prometheus(self, prefix: str = "invoice_mgmt") -> str:
+        """
+        Returns the counters in the Prometheus text exposition format.
+        """
+        with self._lock:
+            items = sorted(self._stats.items())
+        lines: List[str] = [
+            f"# TYPE {prefix}_calls_total counter",
+            f"# TYPE {prefix}_errors_total counter",
+            f"# TYPE {prefix}_call_seconds histogram",
+            f"# TYPE {prefix}_result_size summary",
+        ]
+        for (component, method), stats in items:
+            labels = f'component="{component}",method="{method}"'
+            lines.append(f"{prefix}_calls_total{{{labels}}} {stats.calls}")
+            lines.append(f"{prefix}_errors_total{{{labels}}} {stats.errors}")
+            cumulative = 0
+            for bound, count in zip([*map(str, BUCKETS), "+Inf"], stats.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_call_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}_call_seconds_sum{{{labels}}} {stats.seconds}")
+            lines.append(f"{prefix}_call_seconds_count{{{labels}}} {stats.calls}")
+            lines.append(f"{prefix}_result_size_sum{{{labels}}} {stats.result_size}")
+            lines.append(f"{prefix}_result_size_count{{{labels}}} {stats.results_sized}")
+        return "\n".join(lines) + "\n"
+
+class Instrumented:
+    """
+    Proxy that records every public method call of the wrapped object in metrics.
+    Coroutine results are timed until they complete. Other attributes are passed through.
+    """
+    def __init__(self, target: Any, metrics: Metrics, component: str):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_metrics", metrics)
+        object.__setattr__(self, "_component", component)
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._target, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        wrapper = self._wrap(name, attribute)
+        # cache the wrapper so later lookups skip __getattr__
+        object.__setattr__(self, name, wrapper)
+        return wrapper
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._target, name, value)
+
+    def _wrap(self, name: str, method):
+        metrics = self._metrics
+        component = self._component
+
+        async def timed(awaitable, started: float):
+            try:
+                result = await awaitable
+            except Exception:
+                metrics.record(component, name, time.perf_counter() - started, error=True)
+                raise
+            metrics.record(component, name, time.perf_counter() - started, result)
+            return result
+
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            if not metrics.enabled:
+                return method(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                metrics.record(component, name, time.perf_counter() - started, error=True)
+                raise
+            if hasattr(result, "__await__"):
+                return timed(result, started)
+            metrics.record(component, name, time.perf_counter() - started, result)
+            return result
+        return call
+
+def instrument(target: Any, metrics: Optional[Metrics], component: str) -> Any:
+    """
+    Wraps target in an Instrumented proxy, or returns it unchanged when metrics is None.
+    """
+    if metrics is None:
+        return target
+    return Instrumented(target, metrics, component)
+
+def serve(metrics: Metrics, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+    """
+    Serves the metrics for a local scraper in a background thread:
+    /metrics in the Prometheus text format and /metrics.json as JSON.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            if self.path == "/metrics":
+                body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,7 +1,10 @@
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from task import Task
 from contractor import Contractor
+from paging import Page, check_limit, decode_id_token, page
+from sequence import IdSequence
 
 # Domain objects
 
@@ -10,6 +13,8 @@ class Invoice:
     The Invoice object represents a submitted invoice.
     Invariants and validations are enforced on creation.
     """
+    __slots__ = ("id", "contractor", "task", "start_time", "end_time", "signature")
+
     def __init__(self, contractor: Contractor, task: Task, start_time: datetime, end_time: datetime, signature: str, id: Optional[int] = None):
         self.id = id
         self.contractor = contractor
@@ -30,6 +35,8 @@ class DraftInvoice(Invoice):
     The Draft Invoice object inherits from Invoice
     but additionally keeps track of the last time it was updated
     """
+    __slots__ = ("last_saved",)
+
     def __init__(self,
                  contractor: Contractor,
                  task: Task,
@@ -53,19 +60,34 @@ class InvoiceRepository:
     """
     def __init__(self):
         self.invoices: Dict[int, Invoice] = {}  # in memory of now, replace with DB in the future
+        self.ids = IdSequence()
+        # secondary index: task ID -> invoice
+        self._by_task: Dict[int, Invoice] = {}
 
-    def save(self, invoice: Invoice):
+    def save(self, invoice: Invoice) -> Invoice:
         if invoice.id is not None:
             raise ValueError(f"Unexpected ID {invoice.id}")
 
-        invoice.id = len(self.invoices)
+        invoice.id = self.ids.next()
         self.invoices[invoice.id] = invoice
+        if invoice.task.id is not None:
+            self._by_task[invoice.task.id] = invoice
+        return invoice
 
     def get_by_task(self, task: Task) -> Optional[Invoice]:
-        for invoice in self.invoices.values():
-            if invoice.task == task:
-                return invoice
-        return None
+        if task.id is None:
+            return None
+        return self._by_task.get(task.id)
+
+    def iter_after(self, after_id: Optional[int] = None) -> Iterator[Invoice]:
+        """
+        Yields the invoices in ID order, starting after after_id, without copying the repository.
+        """
+        start = 0 if after_id is None else after_id + 1
+        for id in range(start, self.ids.peek()):
+            invoice = self.invoices.get(id)
+            if invoice is not None:
+                yield invoice
 
     def delete(self, invoice: Invoice):
         raise ValueError("Submitted invoices cannot be deleted")
@@ -81,6 +103,12 @@ class DraftInvoiceRepository:
     """
     def __init__(self):
         self.draft_invoices: dict[int, DraftInvoice] = {}
+        self.ids = IdSequence()
+        # secondary index: contractor ID -> drafts by ID, plus the contractor each draft is indexed under
+        self._by_contractor: Dict[Optional[int], Dict[int, DraftInvoice]] = {}
+        self._contractor_of: Dict[int, Optional[int]] = {}
+        # the same draft IDs, sorted for paging
+        self._contractor_ids: Dict[Optional[int], List[int]] = {}
 
     def get(self, draft_invoice_id: int) -> Optional[DraftInvoice]:
         return self.draft_invoices.get(draft_invoice_id)
@@ -88,14 +116,73 @@ class DraftInvoiceRepository:
     def save(self, draft_invoice: DraftInvoice):
         # If a draft invoice has an ID - update the draft, otherwise - insert.
         if draft_invoice.id is None:
-            draft_invoice.id = len(self.draft_invoices)
+            draft_invoice.id = self.ids.next()
+        else:
+            self.ids.observe(draft_invoice.id)
+
+        # the draft may have been reassigned to another contractor since it was last saved
+        if self._contractor_of.get(draft_invoice.id, draft_invoice.contractor.id) != draft_invoice.contractor.id:
+            self._unindex(draft_invoice.id)
 
         self.draft_invoices[draft_invoice.id] = draft_invoice
+        self._index(draft_invoice)
+
+    def save_many(self, draft_invoices: Iterable[DraftInvoice]):
+        for draft_invoice in draft_invoices:
+            self.save(draft_invoice)
 
     def list_by_contractor(self, contractor: Contractor) -> List[DraftInvoice]:
-        return [d for d in self.draft_invoices.values() if d.contractor.id == contractor.id]
+        return list(self._by_contractor.get(contractor.id, {}).values())
+
+    def list_by_contractor_page(self, contractor: Contractor, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        """
+        Returns up to limit drafts of the contractor ordered by ID, after the ones of the page that returned token.
+        """
+        check_limit(limit)
+        after = None if token is None else decode_id_token(token)
+        ids = self._contractor_ids.get(contractor.id)
+        if ids is None:
+            return Page([])
+        start = 0 if after is None else bisect_right(ids, after)
+        drafts = self._by_contractor[contractor.id]
+        return page([drafts[id] for id in ids[start:start + limit + 1]], limit, lambda draft: (draft.id,))
+
+    def iter_after(self, after_id: Optional[int] = None) -> Iterator[DraftInvoice]:
+        """
+        Yields the drafts in ID order, starting after after_id, without copying the repository.
+        """
+        start = 0 if after_id is None else after_id + 1
+        for id in range(start, self.ids.peek()):
+            draft_invoice = self.draft_invoices.get(id)
+            if draft_invoice is not None:
+                yield draft_invoice
+
+    def flush(self, draft_invoice_id: Optional[int] = None):
+        """
+        Writes buffered changes of one draft, or of all drafts, to storage.
+        Nothing is buffered here, see WriteBehindDraftInvoiceRepository.
+        """
 
     def delete(self, draft_invoice_id: int):
         if draft_invoice_id not in self.draft_invoices:
             raise ValueError("Draft invoice with ID {} not found.".format(draft_invoice_id))
         del self.draft_invoices[draft_invoice_id]
+        self._unindex(draft_invoice_id)
+
+    def _index(self, draft_invoice: DraftInvoice):
+        contractor_id = draft_invoice.contractor.id
+        drafts = self._by_contractor.setdefault(contractor_id, {})
+        if draft_invoice.id not in drafts:
+            insort(self._contractor_ids.setdefault(contractor_id, []), draft_invoice.id)
+        drafts[draft_invoice.id] = draft_invoice
+        self._contractor_of[draft_invoice.id] = contractor_id
+
+    def _unindex(self, draft_invoice_id: int):
+        contractor_id = self._contractor_of.pop(draft_invoice_id)
+        drafts = self._by_contractor[contractor_id]
+        del drafts[draft_invoice_id]
+        ids = self._contractor_ids[contractor_id]
+        del ids[bisect_left(ids, draft_invoice_id)]
+        if not drafts:
+            del self._by_contractor[contractor_id]
+            del self._contractor_ids[contractor_id]
@@ -0,0 +1,255 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Tuple
+from task import Task, TaskRepository
+from contractor import ContractorRepository
+from invoice import Invoice, InvoiceRepository
+from snapshot import Snapshot, is_snapshot, write_invoices
+
+# Append-only persistence for submitted invoices.
+#
+# Every saved invoice is appended to a journal file as a binary record:
+#   length (uint32) | crc32 (uint32) | id, contractor id, task id, start, end (int64) | signature (utf-8)
+# Times are stored as microseconds since 1970-01-01, for naive datetimes.
+#
+# Every snapshot_every invoices the journal is renamed to invoices.journal.previous and a new one is
+# started. A background thread then writes a new snapshot (see snapshot.py) from the previous snapshot
+# and journal files, without touching the repository, and removes the previous journal.
+# Recovery opens the snapshot through a memory map, invoices are decoded when first looked up,
+# and replays the previous journal, if the thread did not get to remove it, and the journal.
+# Snapshots written by earlier versions hold journal records and are replayed as well.
+
+_HEADER = struct.Struct("<II")
+_FIELDS = struct.Struct("<qqqqq")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def encode(invoice: Invoice) -> bytes:
+    payload = _FIELDS.pack(invoice.id, invoice.contractor.id, invoice.task.id,
+                           (invoice.start_time - _EPOCH) // _MICROSECOND,
+                           (invoice.end_time - _EPOCH) // _MICROSECOND) + invoice.signature.encode()
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+def decode(buffer, offset: int = 0) -> Iterator[Tuple[int, Tuple[int, int, int, datetime, datetime, str]]]:
+    """
+    Yields (end offset, fields) for every complete record in the buffer, stopping at the first torn or corrupt one.
+    """
+    for end, (id, contractor_id, task_id, start_us, end_us, signature) in _decode_raw(buffer, offset):
+        yield end, (id, contractor_id, task_id, _EPOCH + start_us * _MICROSECOND, _EPOCH + end_us * _MICROSECOND, signature)
+
+def _decode_raw(buffer, offset: int = 0) -> Iterator[Tuple[int, Tuple[int, int, int, int, int, str]]]:
+    # like decode, with the times left in microseconds as in snapshot rows
+    while offset + _HEADER.size <= len(buffer):
+        length, crc = _HEADER.unpack_from(buffer, offset)
+        start = offset + _HEADER.size
+        end = start + length
+        if length < _FIELDS.size or end > len(buffer) or zlib.crc32(buffer[start:end]) != crc:
+            return
+        yield end, _FIELDS.unpack_from(buffer, start) + (bytes(buffer[start + _FIELDS.size:end]).decode(),)
+        offset = end
+
+def _journal_records(path: str) -> Iterator[tuple]:
+    """
+    Yields the records of a journal file as snapshot invoice rows.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for _, fields in _decode_raw(buffer):
+            yield fields
+
+def _in_order(records: Iterable[tuple], next_id: int) -> Iterator[tuple]:
+    """
+    Yields the records with IDs below next_id once each, records left in a journal
+    by a crash before it was removed repeat the ones of the snapshot.
+    """
+    expected = 0
+    for fields in records:
+        if expected == next_id:
+            return
+        if fields[0] < expected:
+            continue
+        if fields[0] != expected:
+            raise ValueError(f"Unexpected invoice ID {fields[0]}")
+        expected += 1
+        yield fields
+    if expected != next_id:
+        raise ValueError(f"Missing invoices from ID {expected}")
+
+class JournaledInvoiceRepository(InvoiceRepository):
+    """
+    Repository for submitted invoices that survives restarts.
+    Invoices are kept in memory and appended to a journal in a directory,
+    the journal is fsynced once per sync_every invoices or sync_interval seconds (group commit)
+    and folded into a snapshot every snapshot_every invoices, in a background thread.
+    Another thread fsyncs what is left every sync_interval, so the last invoices are made durable
+    even when saves stop. Call flush to make every saved invoice durable now, close when done.
+    """
+    def __init__(self,
+                 directory: str,
+                 task_repository: TaskRepository,
+                 contractor_repository: ContractorRepository,
+                 sync_every: int = 64,
+                 sync_interval: float = 0.05,
+                 snapshot_every: int = 100_000):
+        super().__init__()
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, "invoices.snapshot")
+        self.journal_path = os.path.join(directory, "invoices.journal")
+        self.previous_journal_path = os.path.join(directory, "invoices.journal.previous")
+
+        self._snapshot: Optional[Snapshot] = None
+        if is_snapshot(self.snapshot_path):
+            self._snapshot = Snapshot(self.snapshot_path, task_repository, contractor_repository)
+            recovered = self._snapshot.invoice_repository
+            self.invoices, self.ids, self._by_task = recovered.invoices, recovered.ids, recovered._by_task  # type: ignore[assignment]
+        else:
+            self._recover(self.snapshot_path)
+        self._recover(self.previous_journal_path)
+        # invoices in the snapshot and the previous journal, and when the last snapshot was started
+        self._previous_end = self._snapshot_size = len(self.invoices)
+        journal_end = self._recover(self.journal_path)
+        self._journal = open(self.journal_path, "ab")  # pylint: disable=consider-using-with
+        # drop a torn record left by a crash so new records are appended after the last good one
+        self._journal.truncate(journal_end)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # guards the journal file against the sync thread
+        self._lock = threading.RLock()
+
+        self._folding: Optional[threading.Thread] = None
+        self._fold_error: Optional[Exception] = None
+        if os.path.exists(self.previous_journal_path):
+            self._fold(self._previous_end)
+
+        self._closed = threading.Event()
+        self._syncing = threading.Thread(target=self._sync_periodically, name="invoice-journal-sync", daemon=True)
+        self._syncing.start()
+
+    def save(self, invoice: Invoice) -> Invoice:
+        with self._lock:
+            super().save(invoice)
+            self._journal.write(encode(invoice))
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.flush()
+            if len(self.invoices) - self._snapshot_size >= self.snapshot_every and not self._is_folding():
+                self._rotate()
+        return invoice
+
+    def get_by_task(self, task: Task) -> Optional[Invoice]:
+        if self._snapshot is not None:
+            return self._snapshot.invoice_repository.get_by_task(task)
+        return super().get_by_task(task)
+
+    def flush(self):
+        with self._lock:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def snapshot(self):
+        """
+        Folds the journal into the snapshot and waits until it is written.
+        """
+        self.wait_for_snapshot()
+        with self._lock:
+            self._rotate()
+        self.wait_for_snapshot()
+
+    def wait_for_snapshot(self):
+        """
+        Waits for a snapshot being written in the background, raising the error it failed with.
+        """
+        if self._folding is not None:
+            self._folding.join()
+            self._folding = None
+        error, self._fold_error = self._fold_error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        self._closed.set()
+        self._syncing.join()
+        try:
+            self.flush()
+            self._journal.close()
+            self.wait_for_snapshot()
+        finally:
+            if self._snapshot is not None:
+                self._snapshot.close()
+
+    def _sync_periodically(self):
+        while not self._closed.wait(self.sync_interval):
+            with self._lock:
+                if self._unsynced:
+                    self.flush()
+
+    def _is_folding(self) -> bool:
+        return self._folding is not None and self._folding.is_alive()
+
+    def _rotate(self):
+        """
+        Moves the journal aside and folds it into the snapshot in the background.
+        If the previous journal is still there, folding it failed, it is folded again instead.
+        """
+        if not os.path.exists(self.previous_journal_path):
+            self.flush()
+            self._journal.close()
+            os.replace(self.journal_path, self.previous_journal_path)
+            self._journal = open(self.journal_path, "ab")  # pylint: disable=consider-using-with
+            self._previous_end = len(self.invoices)
+        self._snapshot_size = len(self.invoices)
+        self._fold(self._previous_end)
+
+    def _fold(self, next_id: int):
+        def run():
+            try:
+                base = Snapshot(self.snapshot_path) if is_snapshot(self.snapshot_path) else None
+                try:
+                    records = chain(_journal_records(self.snapshot_path) if base is None else base.invoice_records(),
+                                    _journal_records(self.previous_journal_path))
+                    write_invoices(self.snapshot_path, _in_order(records, next_id), next_id)
+                finally:
+                    if base is not None:
+                        base.close()
+                os.remove(self.previous_journal_path)
+            except Exception as e:  # pylint: disable=broad-except
+                self._fold_error = e
+
+        self._folding = threading.Thread(target=run, name="invoice-snapshot", daemon=True)
+        self._folding.start()
+
+    def _recover(self, path: str) -> int:
+        """
+        Loads the records of a snapshot or journal file and returns the offset after the last good record.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return 0
+
+        offset = 0
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for offset, (id, contractor_id, task_id, start_time, end_time, signature) in decode(buffer):
+                if id < len(self.invoices):
+                    continue
+                if id != len(self.invoices):
+                    raise ValueError(f"Unexpected invoice ID {id} in {path}")
+                contractor = self.contractor_repository.find_by_id(contractor_id)
+                task = self.task_repository.get(task_id)
+                if contractor is None or task is None:
+                    raise ValueError(f"Invoice {id} references a missing contractor {contractor_id} or task {task_id}")
+                super().save(Invoice(contractor, task, start_time, end_time, signature))
+        return offset
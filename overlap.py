@@ -0,0 +1,188 @@
+import random
+from datetime import datetime
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+from invoice import DraftInvoiceRepository, InvoiceRepository
+
+# Detection of overlapping billed time per contractor.
+# Times are half open intervals [start_time, end_time): an invoice ending at 9:00 does not overlap one starting at 9:00.
+
+class _Node:
+    __slots__ = ("start", "end", "key", "priority", "left", "right", "max_end")
+
+    def __init__(self, start: datetime, end: datetime, key: Hashable):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.max_end = end
+
+    def update(self):
+        self.max_end = self.end
+        if self.left is not None and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+def _split(node: Optional[_Node], start: datetime) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # nodes starting before start go left, the others right
+    if node is None:
+        return None, None
+    if node.start < start:
+        node.right, right = _split(node.right, start)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, start)
+    node.update()
+    return left, node
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+class IntervalTree:
+    """
+    Intervals ordered by start, in a treap where every node also knows the latest end below it.
+    Insert and remove cost O(log n), finding the k intervals overlapping a range costs O(log n + k).
+    """
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, start: datetime, end: datetime, key: Hashable):
+        left, right = _split(self._root, start)
+        self._root = _merge(_merge(left, _Node(start, end, key)), right)
+        self._size += 1
+
+    def remove(self, start: datetime, key: Hashable):
+        self._root = self._remove(self._root, start, key)
+
+    def _remove(self, node: Optional[_Node], start: datetime, key: Hashable) -> Optional[_Node]:
+        if node is None:
+            return None
+        if node.start == start and node.key == key:
+            self._size -= 1
+            return _merge(node.left, node.right)
+        # intervals with the same start can be on both sides of each other
+        if start <= node.start:
+            node.left = self._remove(node.left, start, key)
+        if start >= node.start:
+            node.right = self._remove(node.right, start, key)
+        node.update()
+        return node
+
+    def overlapping(self, start: datetime, end: datetime) -> Iterator[Tuple[datetime, datetime, Hashable]]:
+        """
+        Yields (start, end, key) of the intervals overlapping [start, end), ordered by start.
+        """
+        stack: List[Tuple[_Node, bool]] = []
+        if self._root is not None:
+            stack.append((self._root, False))
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                if node.start < end and node.end > start:
+                    yield node.start, node.end, node.key
+                continue
+            # nothing below this node ends after start
+            if node.max_end <= start:
+                continue
+            # in order: left subtree, node, right subtree (only if it can start before end)
+            if node.right is not None and node.start < end:
+                stack.append((node.right, False))
+            stack.append((node, True))
+            if node.left is not None:
+                stack.append((node.left, False))
+
+class BillingIntervals:
+    """
+    Per contractor index of the time billed by drafts and submitted invoices,
+    keyed by ("draft", id) and ("invoice", id).
+    With reject set, check raises ValueError on overlaps; otherwise the overlaps are accepted
+    and kept in flagged, keyed like the entries.
+    """
+    def __init__(self, reject: bool = True):
+        self.reject = reject
+        self.flagged: Dict[Hashable, List[Hashable]] = {}
+        self._trees: Dict[Optional[int], IntervalTree] = {}
+        self._entries: Dict[Hashable, Tuple[Optional[int], datetime, datetime]] = {}
+
+    @classmethod
+    def from_repositories(cls,
+                          draft_repository: DraftInvoiceRepository,
+                          invoice_repository: InvoiceRepository,
+                          reject: bool = True) -> "BillingIntervals":
+        """
+        Builds the index of the invoices and drafts already stored, read with iter_after.
+        Overlaps among them are not rejected but kept in flagged, drafts are flagged against invoices.
+        """
+        intervals = cls(reject)
+        for kind, repository in (("invoice", invoice_repository), ("draft", draft_repository)):
+            for record in repository.iter_after():
+                key = (kind, record.id)
+                overlaps = intervals._overlapping(record.contractor.id, record.start_time, record.end_time, key)
+                intervals.add(record.contractor.id, record.start_time, record.end_time, key, overlaps)
+        return intervals
+
+    def check(self, contractor_id: Optional[int], start: datetime, end: datetime,
+              key: Optional[Hashable] = None) -> List[Hashable]:
+        """
+        Returns the keys of the contractor's entries overlapping [start, end), other than key itself.
+        Raises ValueError instead when there are some and reject is set.
+        """
+        overlaps = self._overlapping(contractor_id, start, end, key)
+        if overlaps and self.reject:
+            raise ValueError(f"Billed time overlaps with {', '.join(f'{kind} {id}' for kind, id in overlaps)}")
+        return overlaps
+
+    def add(self, contractor_id: Optional[int], start: datetime, end: datetime, key: Hashable,
+            overlaps: Optional[List[Hashable]] = None):
+        """
+        Adds an entry, replacing the previous interval of the same key.
+        The overlaps returned by check are kept in flagged under the key.
+        """
+        self.remove(key)
+        self._trees.setdefault(contractor_id, IntervalTree()).insert(start, end, key)
+        self._entries[key] = (contractor_id, start, end)
+        if overlaps:
+            self.flagged[key] = overlaps
+
+    def remove(self, key: Hashable):
+        self.flagged.pop(key, None)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        contractor_id, start, _ = entry
+        tree = self._trees[contractor_id]
+        tree.remove(start, key)
+        if not tree:
+            del self._trees[contractor_id]
+
+    def _overlapping(self, contractor_id: Optional[int], start: datetime, end: datetime,
+                     key: Optional[Hashable]) -> List[Hashable]:
+        tree = self._trees.get(contractor_id)
+        if tree is None:
+            return []
+        return [other for _, _, other in tree.overlapping(start, end) if other != key]
+
+    def billed_between(self, contractor_id: int, start: datetime, end: datetime) -> List[Tuple[Hashable, datetime, datetime]]:
+        """
+        Returns (key, start, end) of the drafts and invoices of the contractor overlapping [start, end), by start time.
+        """
+        tree = self._trees.get(contractor_id)
+        if tree is None:
+            return []
+        return [(key, entry_start, entry_end) for entry_start, entry_end, key in tree.overlapping(start, end)]
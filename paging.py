@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+# Keyset pagination.
+#
+# A page ends with a token holding the sort key of its last item, e.g. (id,) or (start_time, id).
+# The next page starts right after that key, so it costs the same however deep it is, and items
+# inserted or deleted meanwhile do not shift the pages. Tokens only contain the key, so any repository
+# sorting by the same key (in memory or in a database) can continue a listing.
+
+T = TypeVar("T")
+
+class Page(Generic[T]):
+    """
+    One page of a listing. next_token fetches the following page, it is None on the last one.
+    """
+    def __init__(self, items: List[T], next_token: Optional[str] = None):
+        self.items = items
+        self.next_token = next_token
+
+def check_limit(limit: int):
+    if limit < 1:
+        raise ValueError("Page limit must be positive")
+
+def encode_token(key: tuple) -> str:
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_id_token(token: str) -> int:
+    (id,) = _decode(token, 1)
+    if not isinstance(id, int):
+        raise ValueError("Invalid page token")
+    return id
+
+def decode_time_token(token: str) -> Tuple[datetime, int]:
+    time, id = _decode(token, 2)
+    if not isinstance(id, int):
+        raise ValueError("Invalid page token")
+    try:
+        return datetime.fromisoformat(time), id
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid page token") from e
+
+def _decode(token: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError as e:
+        raise ValueError("Invalid page token") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid page token")
+    return values
+
+def page(items: List[T], limit: int, key: Callable[[T], tuple]) -> Page[T]:
+    """
+    Makes a page from up to limit + 1 items in key order, the extra item only tells there are more.
+    """
+    if len(items) > limit:
+        items = items[:limit]
+        return Page(items, encode_token(key(items[-1])))
+    return Page(items)
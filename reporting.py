@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple, Union
+import numpy as np
+from task import Task
+from columnar import ColumnarInvoiceRepository
+from invoice import InvoiceRepository
+
+# Billing reports over submitted invoices, computed with NumPy.
+# Requires numpy, which the rest of the project does not need.
+#
+# The report keeps one NumPy column per invoice field (contractor ID, task ID, start, end) and
+# small per task tables (location and language pair codes), so every grouping is a few array operations.
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_HOUR = 3_600_000_000
+
+DIMENSIONS = ("contractor", "language_pair", "location", "month")
+
+class _Column:
+    """
+    A NumPy array that grows by doubling its capacity.
+    """
+    def __init__(self, dtype, fill=0):
+        self._data = np.full(1024, fill, dtype=dtype)
+        self._fill = fill
+        self.size = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        self.reserve(self.size + len(values))
+        self._data[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    def reserve(self, size: int):
+        if size > len(self._data):
+            data = np.full(max(size, 2 * len(self._data)), self._fill, dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+
+    def put(self, index: int, value):
+        self.reserve(index + 1)
+        self.size = max(self.size, index + 1)
+        self._data[index] = value
+
+class _Labels:
+    """
+    Assigns consecutive codes to labels, ignoring case.
+    """
+    def __init__(self):
+        self.codes: Dict[Tuple[str, ...], int] = {}
+        self.labels: List[Tuple[str, ...]] = []
+
+    def code(self, label: Tuple[str, ...]) -> int:
+        key = tuple(part.casefold() for part in label)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+class BillingReport:
+    """
+    Billed hours over the invoices of an InvoiceRepository (or any repository with iter_after,
+    such as SqliteInvoiceRepository) or a ColumnarInvoiceRepository,
+    grouped by contractor, language pair, location and month of the start time.
+    Invoices saved after the report was created are picked up by the next query,
+    only the new ones are read since submitted invoices never change.
+    """
+    def __init__(self, invoice_repository: Union[InvoiceRepository, ColumnarInvoiceRepository]):
+        self.invoice_repository = invoice_repository
+        self._contractor_ids = _Column(np.int64)
+        self._task_ids = _Column(np.int64)
+        self._start_times = _Column(np.int64)
+        self._end_times = _Column(np.int64)
+        self._months = _Column(np.int64)
+        # per task ID tables, -1 for tasks not seen yet
+        self._task_locations = _Column(np.int32, fill=-1)
+        self._task_language_pairs = _Column(np.int32, fill=-1)
+        self._locations = _Labels()
+        self._language_pairs = _Labels()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        self.refresh()
+        return self._task_ids.size
+
+    def refresh(self):
+        """
+        Reads the invoices saved since the last refresh.
+        """
+        repository = self.invoice_repository
+        if isinstance(repository, ColumnarInvoiceRepository):
+            start, end = self._next_id, len(repository)
+            if start == end:
+                return
+            task_ids = np.frombuffer(repository.task_ids, dtype=np.int64)[start:end]
+            self._contractor_ids.extend(np.frombuffer(repository.contractor_ids, dtype=np.int64)[start:end])
+            self._task_ids.extend(task_ids)
+            self._start_times.extend(np.frombuffer(repository.start_times, dtype=np.int64)[start:end])
+            self._end_times.extend(np.frombuffer(repository.end_times, dtype=np.int64)[start:end])
+            self._months.extend(_months(self._start_times.values[start:]))
+            for task_id in np.unique(task_ids).tolist():
+                if task_id >= self._task_locations.size or self._task_locations.values[task_id] < 0:
+                    task = repository.task_repository.get(task_id)
+                    if task is None:
+                        raise ValueError(f"Invoice references a missing task {task_id}")
+                    self._add_task(task)
+            self._next_id = end
+            return
+
+        # iter_after works the same over in memory, SQLite and journaled repositories
+        contractor_ids, task_ids, start_times, end_times = [], [], [], []
+        last_id = self._next_id - 1
+        for invoice in repository.iter_after(None if last_id < 0 else last_id):
+            last_id = invoice.id
+            contractor_ids.append(invoice.contractor.id)
+            task_ids.append(invoice.task.id)
+            start_times.append((invoice.start_time - _EPOCH) // _MICROSECOND)
+            end_times.append((invoice.end_time - _EPOCH) // _MICROSECOND)
+            if invoice.task.id >= self._task_locations.size or self._task_locations.values[invoice.task.id] < 0:
+                self._add_task(invoice.task)
+        self._contractor_ids.extend(contractor_ids)
+        self._task_ids.extend(task_ids)
+        self._start_times.extend(start_times)
+        self._end_times.extend(end_times)
+        self._months.extend(_months(np.asarray(start_times, dtype=np.int64)))
+        self._next_id = last_id + 1
+
+    def _add_task(self, task: Task):
+        self._task_locations.put(task.id, self._locations.code((task.location,)))
+        self._task_language_pairs.put(task.id, self._language_pairs.code((task.source_language, task.target_language)))
+
+    def hours(self) -> np.ndarray:
+        """
+        Billed hours of every invoice, in the order they were saved.
+        """
+        self.refresh()
+        return (self._end_times.values - self._start_times.values) / _MICROSECONDS_PER_HOUR
+
+    def total_hours(self) -> float:
+        return float(self.hours().sum())
+
+    def hours_by(self, *dimensions: str) -> Dict[tuple, float]:
+        """
+        Sums billed hours per combination of the given dimensions, e.g. hours_by("contractor", "month").
+        Keys are tuples of labels: contractor ID, (source, target) language pair, location and "YYYY-MM".
+        """
+        for dimension in dimensions:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension '{dimension}', expected one of {', '.join(DIMENSIONS)}")
+
+        hours = self.hours()
+        if not dimensions:
+            return {(): float(hours.sum())} if len(hours) else {}
+        if len(hours) == 0:
+            return {}
+
+        # combine the codes of all dimensions into one integer key (mixed radix), then sum the hours per key
+        key = np.zeros(len(hours), dtype=np.int64)
+        columns = []
+        for dimension in dimensions:
+            column, decode = self._dimension(dimension)
+            offset = int(column.min())
+            radix = int(column.max()) - offset + 1
+            key = key * radix + (column - offset)
+            columns.append((offset, radix, decode))
+
+        size = 1
+        for _, radix, _ in columns:
+            size *= radix
+        if size <= max(len(hours), 1 << 20):
+            # few possible keys: count them directly instead of sorting
+            sums = np.bincount(key, weights=hours, minlength=size)
+            keys = np.flatnonzero(np.bincount(key, minlength=size))
+            sums = sums[keys]
+        else:
+            keys, inverse = np.unique(key, return_inverse=True)
+            sums = np.bincount(inverse, weights=hours, minlength=len(keys))
+
+        result = {}
+        for combined, total in zip(keys.tolist(), sums.tolist()):
+            labels = []
+            for offset, radix, decode in reversed(columns):
+                combined, code = divmod(combined, radix)
+                labels.append(decode(code + offset))
+            result[tuple(reversed(labels))] = total
+        return result
+
+    def hours_by_contractor(self) -> Dict[int, float]:
+        return {key[0]: hours for key, hours in self.hours_by("contractor").items()}
+
+    def hours_by_language_pair(self) -> Dict[Tuple[str, str], float]:
+        return {key[0]: hours for key, hours in self.hours_by("language_pair").items()}
+
+    def hours_by_location(self) -> Dict[str, float]:
+        return {key[0]: hours for key, hours in self.hours_by("location").items()}
+
+    def hours_by_month(self) -> Dict[str, float]:
+        return {key[0]: hours for key, hours in self.hours_by("month").items()}
+
+    def _dimension(self, dimension: str):
+        task_ids = self._task_ids.values
+        if dimension == "contractor":
+            return self._contractor_ids.values, int
+        if dimension == "language_pair":
+            return self._task_language_pairs.values[task_ids], lambda code: self._language_pairs.labels[code]
+        if dimension == "location":
+            return self._task_locations.values[task_ids], lambda code: self._locations.labels[code][0]
+        return self._months.values, _month_label
+
+def _months(times: np.ndarray) -> np.ndarray:
+    # months since 1970-01, via NumPy datetime64
+    return times.astype("datetime64[us]").astype("datetime64[M]").astype(np.int64)
+
+def _month_label(month: int) -> str:
+    return f"{1970 + month // 12:04d}-{month % 12 + 1:02d}"
@@ -0,0 +1,27 @@
+import threading
+
+class IdSequence:
+    """
+    Hands out increasing IDs, safe to share between threads.
+    IDs are never reused, and IDs chosen by callers are skipped over once observed.
+    """
+    def __init__(self, start: int = 0):
+        self._next = start
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            id = self._next
+            self._next += 1
+            return id
+
+    def observe(self, id: int):
+        """
+        Records an explicitly assigned ID so that it is never handed out.
+        """
+        with self._lock:
+            if id >= self._next:
+                self._next = id + 1
+
+    def peek(self) -> int:
+        return self._next
@@ -1,11 +1,30 @@
 from datetime import datetime
-from typing import List,Optional
-from task import TaskRepository
-from contractor import ContractorRepository
-from invoice import  InvoiceRepository, DraftInvoiceRepository, DraftInvoice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from task import Task, TaskRepository
+from contractor import Contractor, ContractorRepository
+from invoice import  Invoice, InvoiceRepository, DraftInvoiceRepository, DraftInvoice
+from overlap import BillingIntervals
+from paging import Page
 
 # Use Case (Service) Objects
 
+class BatchResult:
+    """
+    Outcome of a batch operation, by position in the batch:
+    ids holds the ID produced for each item (None if the item failed)
+    and errors holds the error of each failed item.
+    """
+    def __init__(self, size: int):
+        self.ids: List[Optional[int]] = [None] * size
+        self.errors: Dict[int, ValueError] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+# (contractor_id, task_id, start_time, end_time, signature), as taken by DraftInvoiceService.save_draft_invoice
+DraftInvoiceRequest = Tuple[int, int, datetime, datetime, str]
+
 class InvoiceManagementService:
     """
     Business logic for managing submitted invoices.
@@ -14,13 +33,18 @@ class InvoiceManagementService:
                  task_repository: TaskRepository,
                  contractor_repository: ContractorRepository,
                  draft_repository: DraftInvoiceRepository,
-                 invoice_repository: InvoiceRepository):
+                 invoice_repository: InvoiceRepository,
+                 billing_intervals: Optional[BillingIntervals] = None):
         self.task_repository = task_repository
         self.contractor_repository = contractor_repository
         self.invoice_repository = invoice_repository
         self.draft_repository = draft_repository
+        # optional, shared with DraftInvoiceService to catch overlapping billed time
+        self.billing_intervals = billing_intervals
 
     def submit_invoice(self, draft_invoice_id: int):
+        # submit what the user last saved, even if it is still buffered
+        self.draft_repository.flush(draft_invoice_id)
         draft = self.draft_repository.get(draft_invoice_id)
         if draft is None:
             raise ValueError("Draft does not exist")
@@ -30,17 +54,101 @@ class InvoiceManagementService:
         if existing_invoice is not None:
             raise ValueError("Invoice already exists for this task")
 
-        draft.id = None # because we want to insert a new invoice we get rid of the old ID
-        self.invoice_repository.save(draft)
+        overlaps = None
+        if self.billing_intervals is not None:
+            overlaps = self.billing_intervals.check(draft.contractor.id, draft.start_time, draft.end_time, ("draft", draft_invoice_id))
 
-        invoice = self.invoice_repository.get_by_task(draft.task)
-        assert invoice is not None
+        invoice = self._save_invoice(draft)
 
         # we no longer need the draft after we submitted the invoice
         self.draft_repository.delete(draft_invoice_id)
+        self._billed(draft_invoice_id, invoice, overlaps)
 
         return invoice.id
 
+    def submit_invoices(self, draft_invoice_ids: Iterable[int], atomic: bool = False) -> BatchResult:
+        """
+        Submits several drafts at once. When atomic is set nothing is submitted
+        unless every draft is valid, otherwise the valid drafts are submitted
+        and the others are reported in the result errors.
+        A draft whose task gets an invoice from another thread meanwhile is reported
+        in the errors as well; an atomic batch is then not submitted at all, provided the
+        invoice repository can save a batch atomically (save_all_if_absent).
+        """
+        draft_invoice_ids = list(draft_invoice_ids)
+        result = BatchResult(len(draft_invoice_ids))
+        accepted: List[Tuple[int, int, DraftInvoice, Optional[List]]] = []
+        tasks_in_batch: Set[Optional[int]] = set()
+
+        self.draft_repository.flush()
+        for position, draft_invoice_id in enumerate(draft_invoice_ids):
+            try:
+                draft = self.draft_repository.get(draft_invoice_id)
+                if draft is None:
+                    raise ValueError("Draft does not exist")
+                if draft.task.id in tasks_in_batch or self.invoice_repository.get_by_task(draft.task) is not None:
+                    raise ValueError("Invoice already exists for this task")
+                draft.validate()
+                overlaps = None
+                if self.billing_intervals is not None:
+                    overlaps = self.billing_intervals.check(draft.contractor.id, draft.start_time, draft.end_time, ("draft", draft_invoice_id))
+            except ValueError as e:
+                result.errors[position] = e
+                continue
+            tasks_in_batch.add(draft.task.id)
+            accepted.append((position, draft_invoice_id, draft, overlaps))
+
+        if atomic and not result.ok:
+            return result
+
+        save_all_if_absent = getattr(self.invoice_repository, "save_all_if_absent", None)
+        if atomic and save_all_if_absent is not None:
+            try:
+                invoices = save_all_if_absent([_copy(draft) for _, _, draft, _ in accepted])
+            except ValueError as e:
+                # another thread billed some of the tasks meanwhile, nothing was saved
+                billed = [position for position, _, draft, _ in accepted
+                          if self.invoice_repository.get_by_task(draft.task) is not None]
+                for position in billed or [position for position, _, _, _ in accepted]:
+                    result.errors[position] = e
+                return result
+            for (position, draft_invoice_id, _, overlaps), invoice in zip(accepted, invoices):
+                result.ids[position] = invoice.id
+                self.draft_repository.delete(draft_invoice_id)
+                self._billed(draft_invoice_id, invoice, overlaps)
+            return result
+
+        for position, draft_invoice_id, draft, overlaps in accepted:
+            try:
+                invoice = self._save_invoice(draft)
+            except ValueError as e:
+                result.errors[position] = e
+                continue
+            result.ids[position] = invoice.id
+            self.draft_repository.delete(draft_invoice_id)
+            self._billed(draft_invoice_id, invoice, overlaps)
+
+        return result
+
+    def _save_invoice(self, draft: DraftInvoice) -> Invoice:
+        # repositories shared between threads check that the task has no invoice and save in one step,
+        # the draft is copied because another thread may be submitting the same draft object
+        save_if_absent = getattr(self.invoice_repository, "save_if_absent", None)
+        if save_if_absent is not None:
+            return save_if_absent(_copy(draft))
+        draft.id = None # because we want to insert a new invoice we get rid of the old ID
+        return self.invoice_repository.save(draft)
+
+    def _billed(self, draft_invoice_id: int, invoice: Invoice, overlaps: Optional[List]):
+        # the billed time now belongs to the invoice instead of the draft
+        if self.billing_intervals is not None:
+            self.billing_intervals.remove(("draft", draft_invoice_id))
+            self.billing_intervals.add(invoice.contractor.id, invoice.start_time, invoice.end_time,
+                                       ("invoice", invoice.id), overlaps)
+
+def _copy(draft: DraftInvoice) -> Invoice:
+    return Invoice(draft.contractor, draft.task, draft.start_time, draft.end_time, draft.signature)
+
 # Draft
 
 class DraftInvoiceService:
@@ -50,10 +158,13 @@ class DraftInvoiceService:
     def __init__(self,
                  task_repository: TaskRepository,
                  contractor_repository: ContractorRepository,
-                 draft_invoice_repository: DraftInvoiceRepository):
+                 draft_invoice_repository: DraftInvoiceRepository,
+                 billing_intervals: Optional[BillingIntervals] = None):
         self.task_repository = task_repository
         self.contractor_repository = contractor_repository
         self.draft_invoice_repository = draft_invoice_repository
+        # optional, shared with InvoiceManagementService to catch overlapping billed time
+        self.billing_intervals = billing_intervals
 
     def save_draft_invoice(self,
                 contractor_id: int,
@@ -71,9 +182,65 @@ class DraftInvoiceService:
 
         # Create and save the DraftInvoice.
         draft_invoice = DraftInvoice(contractor, task, start_time, end_time, signature)
+        overlaps = None
+        if self.billing_intervals is not None:
+            overlaps = self.billing_intervals.check(contractor.id, start_time, end_time)
         self.draft_invoice_repository.save(draft_invoice)
+        self._billed(draft_invoice, overlaps)
         return draft_invoice.id
 
+    def save_draft_invoices(self, batch: Iterable[DraftInvoiceRequest], atomic: bool = False) -> BatchResult:
+        """
+        Saves several drafts at once, looking up each referenced contractor and task only once.
+        When atomic is set nothing is saved unless every draft is valid.
+        """
+        batch = list(batch)
+        contractors: Dict[int, Optional[Contractor]] = {}
+        tasks: Dict[int, Optional[Task]] = {}
+        for contractor_id, task_id, _, _, _ in batch:
+            if contractor_id not in contractors:
+                contractors[contractor_id] = self.contractor_repository.find_by_id(contractor_id)
+            if task_id not in tasks:
+                tasks[task_id] = self.task_repository.get(task_id)
+
+        result = BatchResult(len(batch))
+        accepted: List[Tuple[int, DraftInvoice, Optional[List]]] = []
+        for position, (contractor_id, task_id, start_time, end_time, signature) in enumerate(batch):
+            contractor = contractors[contractor_id]
+            task = tasks[task_id]
+            try:
+                if contractor is None:
+                    raise ValueError("Contractor does not exist")
+                if task is None:
+                    raise ValueError("Task does not exist")
+                draft_invoice = DraftInvoice(contractor, task, start_time, end_time, signature)
+                overlaps = None
+                if self.billing_intervals is not None:
+                    # batch items are added under temporary keys so they are also checked against each other
+                    overlaps = self.billing_intervals.check(contractor.id, start_time, end_time)
+                    self.billing_intervals.add(contractor.id, start_time, end_time, ("batch item", position))
+                accepted.append((position, draft_invoice, overlaps))
+            except ValueError as e:
+                result.errors[position] = e
+
+        if self.billing_intervals is not None:
+            for position, _, _ in accepted:
+                self.billing_intervals.remove(("batch item", position))
+
+        if atomic and not result.ok:
+            return result
+
+        self.draft_invoice_repository.save_many(draft_invoice for _, draft_invoice, _ in accepted)
+        saved_as = {("batch item", position): ("draft", draft_invoice.id) for position, draft_invoice, _ in accepted}
+        for position, draft_invoice, overlaps in accepted:
+            result.ids[position] = draft_invoice.id
+            if overlaps:
+                # earlier batch items are flagged under their temporary keys, refer to the saved drafts instead
+                overlaps = [saved_as.get(other, other) for other in overlaps]
+            self._billed(draft_invoice, overlaps)
+
+        return result
+
     def update(self,
                 draft_invoice_id: int,
                 contractor_id: Optional[int],
@@ -89,13 +256,26 @@ class DraftInvoiceService:
             contractor = self.contractor_repository.find_by_id(contractor_id)
             if contractor is None:
                 raise ValueError("Contractor does not exist")
-            draft.contractor = contractor
+        else:
+            contractor = draft.contractor
 
         if task_id is not None:
             task = self.task_repository.get(task_id)
             if task is None:
                 raise ValueError("Task does not exist")
-            draft.task = task
+        else:
+            task = draft.task
+
+        # check before changing the draft, so a rejected update leaves it as it was
+        overlaps = None
+        if self.billing_intervals is not None:
+            overlaps = self.billing_intervals.check(contractor.id,
+                                                    start_time if start_time is not None else draft.start_time,
+                                                    end_time if end_time is not None else draft.end_time,
+                                                    ("draft", draft_invoice_id))
+
+        draft.contractor = contractor
+        draft.task = task
 
         if start_time is not None:
             draft.start_time = start_time
@@ -108,6 +288,7 @@ class DraftInvoiceService:
 
         draft.update_last_saved()
         self.draft_invoice_repository.save(draft)
+        self._billed(draft, overlaps)
 
     def list(self, contractor_id: int) -> List[DraftInvoice]:
         contractor = self.contractor_repository.find_by_id(contractor_id)
@@ -115,5 +296,21 @@ class DraftInvoiceService:
             raise ValueError("Contractor does not exist")
         return self.draft_invoice_repository.list_by_contractor(contractor)
 
+    def list_page(self, contractor_id: int, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        """
+        Returns one page of the contractor's drafts ordered by ID, pass the page's next_token to get the next one.
+        """
+        contractor = self.contractor_repository.find_by_id(contractor_id)
+        if contractor is None:
+            raise ValueError("Contractor does not exist")
+        return self.draft_invoice_repository.list_by_contractor_page(contractor, limit, token)
+
     def delete(self, draft_invoice_id: int):
         self.draft_invoice_repository.delete(draft_invoice_id)
+        if self.billing_intervals is not None:
+            self.billing_intervals.remove(("draft", draft_invoice_id))
+
+    def _billed(self, draft_invoice: DraftInvoice, overlaps: Optional[List]):
+        if self.billing_intervals is not None:
+            self.billing_intervals.add(draft_invoice.contractor.id, draft_invoice.start_time, draft_invoice.end_time,
+                                       ("draft", draft_invoice.id), overlaps)
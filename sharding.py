@@ -0,0 +1,88 @@
+import sqlite3
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Hours reporting split by contractor across a process pool.
+#
+# Each worker opens the SQLite database itself and reads only its shard of contractors
+# (contractor ID modulo the number of workers), so the parent sends no invoices and only merges
+# the partial sums the workers send back.
+
+_DIMENSIONS = ("contractor", "language_pair", "location", "month")
+
+_SHARD = """
+SELECT i.id, i.contractor_id, t.location, t.source_language, t.target_language, i.start_time, i.end_time
+FROM invoices i JOIN tasks t ON t.id = i.task_id
+WHERE i.contractor_id % ? = ?
+ORDER BY i.id
+"""
+
+# casefolded label -> (ID of the first invoice it was seen on, label as first seen)
+_Labels = Dict[object, Tuple[int, object]]
+
+def _hours_by_shard(database: str, dimensions: Tuple[str, ...],
+                    shard: int, workers: int) -> Tuple[Dict[tuple, float], _Labels]:
+    hours: Dict[tuple, float] = {}
+    labels: _Labels = {}
+    connection = sqlite3.connect(database)
+    try:
+        for id, contractor_id, location, source_language, target_language, start_time, end_time in \
+                connection.execute(_SHARD, (workers, shard)):
+            key = []
+            for dimension in dimensions:
+                if dimension == "contractor":
+                    key.append(contractor_id)
+                elif dimension == "language_pair":
+                    language_pair = (source_language.casefold(), target_language.casefold())
+                    if language_pair not in labels:
+                        labels[language_pair] = (id, (source_language, target_language))
+                    key.append(language_pair)
+                elif dimension == "location":
+                    folded = location.casefold()
+                    if folded not in labels:
+                        labels[folded] = (id, location)
+                    key.append(folded)
+                else:
+                    # stored as ISO 8601, the first seven characters are "YYYY-MM"
+                    key.append(start_time[:7])
+            key = tuple(key)
+            billed = datetime.fromisoformat(end_time) - datetime.fromisoformat(start_time)
+            hours[key] = hours.get(key, 0.0) + billed.total_seconds() / 3600
+    finally:
+        connection.close()
+    return hours, labels
+
+def hours_by(database: str, *dimensions: str,
+             workers: int = 4, executor: Optional[Executor] = None) -> Dict[tuple, float]:
+    """
+    Sums billed hours per combination of the given dimensions over the invoices of a SQLite database,
+    sharding them by contractor across a process pool. Keys are the same as BillingReport.hours_by's,
+    which does not need a pool but needs numpy and the invoices in memory.
+    """
+    for dimension in dimensions:
+        if dimension not in _DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}', expected one of {', '.join(_DIMENSIONS)}")
+
+    owned = executor is None
+    if owned:
+        executor = ProcessPoolExecutor(workers)
+    try:
+        futures = [executor.submit(_hours_by_shard, database, dimensions, shard, workers) for shard in range(workers)]
+        folded: Dict[tuple, float] = {}
+        labels: _Labels = {}
+        for future in futures:
+            hours, shard_labels = future.result()
+            for key, total in hours.items():
+                folded[key] = folded.get(key, 0.0) + total
+            # labels as first seen across all shards, grouping ignores case
+            for label, first in shard_labels.items():
+                if label not in labels or first < labels[label]:
+                    labels[label] = first
+    finally:
+        if owned:
+            executor.shutdown()
+
+    relabel = [dimension in ("language_pair", "location") for dimension in dimensions]
+    return {tuple(labels[label][1] if casefolded else label for label, casefolded in zip(key, relabel)): total
+            for key, total in folded.items()}
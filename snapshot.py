@@ -0,0 +1,419 @@
+import mmap
+import os
+import struct
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from task import Task, TaskRepository
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoice, DraftInvoiceRepository, Invoice, InvoiceRepository
+from paging import Page
+from sequence import IdSequence
+
+# Binary snapshot of the task, contractor, draft and invoice repositories, for fast start-up.
+#
+# Layout (little endian):
+#   header: magic | (offset, count) of every section | next ID of every repository
+#   tasks:       id, start | location, source language, target language (string numbers)
+#   contractors: id | name
+#   drafts:      id, contractor id, task id, start, end, last saved | signature
+#   invoices:    id, contractor id, task id, start, end | signature
+#   by task:     task id, invoice id, ordered by task id
+#   strings:     count + 1 offsets | utf-8 text, every distinct string stored once
+# Rows are fixed size and ordered by ID, invoices and drafts refer to tasks and contractors by ID.
+# Times are stored as microseconds since 1970-01-01, for naive datetimes.
+#
+# Snapshot opens the file through a memory map and decodes a row into a domain object when it is
+# first looked up by ID, so start-up does not depend on the number of records. Queries that need
+# a secondary index (find_by_attributes, find_by_name, list_by_contractor, ...) decode the whole
+# repository once on first use. get_by_task uses the by task section instead.
+
+_MAGIC = b"TRSNAP01"
+_SECTIONS = ("tasks", "contractors", "drafts", "invoices", "by_task", "strings")
+_HEADER = struct.Struct("<8s" + "qq" * len(_SECTIONS) + "qqqq")
+_TASK = struct.Struct("<qqIII")
+_CONTRACTOR = struct.Struct("<qI")
+_DRAFT = struct.Struct("<qqqqqqI")
+_INVOICE = struct.Struct("<qqqqqI")
+_BY_TASK = struct.Struct("<qq")
+_OFFSET = struct.Struct("<Q")
+_ID = struct.Struct("<q")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def _microseconds(time: datetime) -> int:
+    return (time - _EPOCH) // _MICROSECOND
+
+def _time(microseconds: int) -> datetime:
+    return _EPOCH + microseconds * _MICROSECOND
+
+def write(path: str,
+          task_repository: TaskRepository,
+          contractor_repository: ContractorRepository,
+          draft_repository: DraftInvoiceRepository,
+          invoice_repository: InvoiceRepository):
+    """
+    Writes the four in memory repositories to a snapshot file, replacing it atomically.
+    """
+    _write(path,
+           ((t.id, _microseconds(t.start_time), t.location, t.source_language, t.target_language)
+            for t in sorted(task_repository.tasks.values(), key=lambda t: t.id)),
+           ((c.id, c.name) for c in sorted(contractor_repository.contractors.values(), key=lambda c: c.id)),
+           ((d.id, d.contractor.id, d.task.id, _microseconds(d.start_time), _microseconds(d.end_time),
+             _microseconds(d.last_saved), d.signature) for d in draft_repository.iter_after()),
+           ((i.id, i.contractor.id, i.task.id, _microseconds(i.start_time), _microseconds(i.end_time), i.signature)
+            for i in invoice_repository.iter_after()),
+           (task_repository.ids.peek(), contractor_repository.ids.peek(),
+            draft_repository.ids.peek(), invoice_repository.ids.peek()))
+
+def write_invoices(path: str, invoices: Iterable[tuple], next_id: int):
+    """
+    Writes a snapshot holding only invoices, given as field tuples ordered by ID:
+    id, contractor id, task id, start, end (microseconds since 1970-01-01), signature.
+    Open it with Snapshot(path, task_repository, contractor_repository) to resolve the references elsewhere.
+    """
+    _write(path, (), (), (), invoices, (0, 0, 0, next_id))
+
+def is_snapshot(path: str) -> bool:
+    """
+    Tells whether path is a snapshot file, rather than missing or in another format.
+    """
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as file:
+        return file.read(len(_MAGIC)) == _MAGIC
+
+def _write(path: str,
+           tasks: Iterable[tuple],
+           contractors: Iterable[tuple],
+           drafts: Iterable[tuple],
+           invoices: Iterable[tuple],
+           next_ids: Tuple[int, int, int, int]):
+    """
+    Writes rows given as field tuples ordered by ID, with the fields of the row layouts above
+    but strings in place of string numbers.
+    """
+    strings: Dict[str, int] = {}
+
+    def string(value: str) -> int:
+        number = strings.get(value)
+        if number is None:
+            number = strings[value] = len(strings)
+        return number
+
+    temporary_path = path + ".tmp"
+    sections: List[Tuple[int, int]] = []
+    with open(temporary_path, "wb") as file:
+        file.write(bytes(_HEADER.size))
+
+        def section(rows: Iterator[bytes]):
+            offset, count = file.tell(), 0
+            for row in rows:
+                file.write(row)
+                count += 1
+            sections.append((offset, count))
+
+        section(_TASK.pack(id, start_time, string(location), string(source_language), string(target_language))
+                for id, start_time, location, source_language, target_language in tasks)
+        section(_CONTRACTOR.pack(id, string(name)) for id, name in contractors)
+        section(_DRAFT.pack(*fields[:6], string(fields[6])) for fields in drafts)
+        by_task = []
+
+        def invoice_rows() -> Iterator[bytes]:
+            for fields in invoices:
+                by_task.append((fields[2], fields[0]))
+                yield _INVOICE.pack(*fields[:5], string(fields[5]))
+
+        section(invoice_rows())
+        by_task.sort()
+        section(_BY_TASK.pack(task_id, id) for task_id, id in by_task)
+
+        encoded = [value.encode() for value in strings]
+        offset = 0
+        offsets = [0]
+        for value in encoded:
+            offset += len(value)
+            offsets.append(offset)
+        sections.append((file.tell(), len(encoded)))
+        file.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        file.write(b"".join(encoded))
+
+        file.seek(0)
+        file.write(_HEADER.pack(_MAGIC, *(value for section in sections for value in section), *next_ids))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+class _Table:
+    """
+    Fixed size rows of a section, ordered by the int64 key at their start.
+    """
+    def __init__(self, buffer, offset: int, count: int, row: struct.Struct):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+        self.row = row
+        self.first = self.key(0) if count else 0
+
+    def key(self, row: int) -> int:
+        return _ID.unpack_from(self.buffer, self.offset + row * self.row.size)[0]
+
+    def unpack(self, row: int) -> tuple:
+        return self.row.unpack_from(self.buffer, self.offset + row * self.row.size)
+
+    def find(self, key: int) -> Optional[int]:
+        # IDs are usually dense, try the row the key would have without gaps first
+        row = key - self.first
+        if 0 <= row < self.count and self.key(row) == key:
+            return row
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.key(low) == key:
+            return low
+        return None
+
+class _Strings:
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer = buffer
+        self.offsets = offset
+        self.text = offset + (count + 1) * _OFFSET.size
+        self._decoded: Dict[int, str] = {}
+
+    def __getitem__(self, number: int) -> str:
+        value = self._decoded.get(number)
+        if value is None:
+            start, end = struct.unpack_from("<QQ", self.buffer, self.offsets + number * _OFFSET.size)
+            value = self._decoded[number] = bytes(self.buffer[self.text + start:self.text + end]).decode()
+        return value
+
+class _LazyRecords(MutableMapping):
+    """
+    The ID -> object dictionary of a repository, backed by a table of snapshot rows.
+    A row is turned into an object by load when its ID is first looked up; rows replaced or deleted
+    since the snapshot are never loaded.
+    """
+    def __init__(self, table: _Table, load: Callable[[tuple], Any]):
+        self._table = table
+        self._load = load
+        self._objects: Dict[int, Any] = {}
+        self._seen = bytearray(table.count)
+        self._unseen = table.count
+
+    def _row(self, id: int) -> Optional[int]:
+        if not self._unseen:
+            return None
+        row = self._table.find(id)
+        if row is None or self._seen[row]:
+            return None
+        self._seen[row] = 1
+        self._unseen -= 1
+        return row
+
+    def get(self, id, default=None):
+        value = self._objects.get(id)
+        if value is None:
+            row = self._row(id)
+            if row is None:
+                return default
+            value = self._objects[id] = self._load(self._table.unpack(row))
+        return value
+
+    def __getitem__(self, id):
+        value = self.get(id)
+        if value is None:
+            raise KeyError(id)
+        return value
+
+    def __setitem__(self, id, value):
+        self._row(id)
+        self._objects[id] = value
+
+    def __delitem__(self, id):
+        self[id]  # pylint: disable=pointless-statement
+        del self._objects[id]
+
+    def __contains__(self, id) -> bool:
+        return self.get(id) is not None
+
+    def __len__(self) -> int:
+        return len(self._objects) + self._unseen
+
+    def __iter__(self) -> Iterator[int]:
+        self.load_all()
+        return iter(self._objects)
+
+    def load_all(self):
+        if not self._unseen:
+            return
+        for row in range(self._table.count):
+            if not self._seen[row]:
+                fields = self._table.unpack(row)
+                self._seen[row] = 1
+                self._objects[fields[0]] = self._load(fields)
+        self._unseen = 0
+
+class SnapshotTaskRepository(TaskRepository):
+    def __init__(self, table: _Table, strings: _Strings, next_id: int):
+        super().__init__()
+        self.ids = IdSequence(next_id)
+        self._strings = strings
+        self.tasks = _LazyRecords(table, self._load)  # type: ignore[assignment]
+
+    def _load(self, fields: tuple) -> Task:
+        id, start_time, location, source_language, target_language = fields
+        task = Task(id, self._strings[location], self._strings[source_language], self._strings[target_language],
+                    _time(start_time))
+        self._index(task)
+        return task
+
+    def find_by_attributes(self, location: str, source_language: str, target_language: str) -> List[Task]:
+        self.tasks.load_all()
+        return super().find_by_attributes(location, source_language, target_language)
+
+    def find_by_attributes_page(self, location: str, source_language: str, target_language: str,
+                                limit: int, token: Optional[str] = None) -> Page[Task]:
+        self.tasks.load_all()
+        return super().find_by_attributes_page(location, source_language, target_language, limit, token)
+
+    def iter_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> Iterator[Task]:
+        self.tasks.load_all()
+        return super().iter_by_location_time_range(location, start_time, end_time)
+
+    def find_by_location_time_range_page(self, location: str, start_time: datetime, end_time: datetime,
+                                         limit: int, token: Optional[str] = None) -> Page[Task]:
+        self.tasks.load_all()
+        return super().find_by_location_time_range_page(location, start_time, end_time, limit, token)
+
+class SnapshotContractorRepository(ContractorRepository):
+    def __init__(self, table: _Table, strings: _Strings, next_id: int):
+        super().__init__()
+        self.ids = IdSequence(next_id)
+        self._strings = strings
+        self.contractors = _LazyRecords(table, self._load)  # type: ignore[assignment]
+
+    def _load(self, fields: tuple) -> Contractor:
+        id, name = fields
+        contractor = Contractor(id, self._strings[name])
+        self._index(contractor)
+        return contractor
+
+    def add_many(self, contractors):
+        self.contractors.load_all()
+        super().add_many(contractors)
+
+    def find_by_name(self, name: str) -> Optional[Contractor]:
+        self.contractors.load_all()
+        return super().find_by_name(name)
+
+class SnapshotDraftInvoiceRepository(DraftInvoiceRepository):
+    def __init__(self, table: _Table, strings: _Strings, next_id: int,
+                 task_repository: TaskRepository, contractor_repository: ContractorRepository):
+        super().__init__()
+        self.ids = IdSequence(next_id)
+        self._strings = strings
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+        self.draft_invoices = _LazyRecords(table, self._load)  # type: ignore[assignment]
+
+    def _load(self, fields: tuple) -> DraftInvoice:
+        id, contractor_id, task_id, start_time, end_time, last_saved, signature = fields
+        contractor, task = _references(self.contractor_repository, self.task_repository, id, contractor_id, task_id)
+        draft_invoice = DraftInvoice(contractor, task, _time(start_time), _time(end_time), self._strings[signature], id)
+        draft_invoice.last_saved = _time(last_saved)
+        self._index(draft_invoice)
+        return draft_invoice
+
+    def list_by_contractor(self, contractor: Contractor) -> List[DraftInvoice]:
+        self.draft_invoices.load_all()
+        return super().list_by_contractor(contractor)
+
+    def list_by_contractor_page(self, contractor: Contractor, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        self.draft_invoices.load_all()
+        return super().list_by_contractor_page(contractor, limit, token)
+
+class SnapshotInvoiceRepository(InvoiceRepository):
+    def __init__(self, table: _Table, by_task: _Table, strings: _Strings, next_id: int,
+                 task_repository: TaskRepository, contractor_repository: ContractorRepository):
+        super().__init__()
+        self.ids = IdSequence(next_id)
+        self._strings = strings
+        self._by_task_rows = by_task
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+        self.invoices = _LazyRecords(table, self._load)  # type: ignore[assignment]
+
+    def _load(self, fields: tuple) -> Invoice:
+        id, contractor_id, task_id, start_time, end_time, signature = fields
+        contractor, task = _references(self.contractor_repository, self.task_repository, id, contractor_id, task_id)
+        invoice = Invoice(contractor, task, _time(start_time), _time(end_time), self._strings[signature], id)
+        self._by_task[task_id] = invoice
+        return invoice
+
+    def get_by_task(self, task: Task) -> Optional[Invoice]:
+        invoice = super().get_by_task(task)
+        if invoice is None and task.id is not None:
+            row = self._by_task_rows.find(task.id)
+            if row is not None:
+                invoice = self.invoices.get(self._by_task_rows.unpack(row)[1])
+        return invoice
+
+def _references(contractor_repository: ContractorRepository, task_repository: TaskRepository,
+                id: int, contractor_id: int, task_id: int) -> Tuple[Contractor, Task]:
+    contractor = contractor_repository.find_by_id(contractor_id)
+    task = task_repository.get(task_id)
+    if contractor is None or task is None:
+        raise ValueError(f"Record {id} references a missing contractor {contractor_id} or task {task_id}")
+    return contractor, task
+
+class Snapshot:
+    """
+    The four repositories of a snapshot file, decoded lazily from a memory map.
+    They are ordinary repositories: records can be added, saved and deleted, and write
+    stores them back. Call close once the repositories are no longer used.
+    Drafts and invoices are resolved in task_repository and contractor_repository when given,
+    for snapshots that hold only invoices.
+    """
+    def __init__(self, path: str,
+                 task_repository: Optional[TaskRepository] = None,
+                 contractor_repository: Optional[ContractorRepository] = None):
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._buffer, 0)
+        if header[0] != _MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        sections = dict(zip(_SECTIONS, zip(header[1::2], header[2::2])))
+        next_task_id, next_contractor_id, next_draft_id, next_invoice_id = header[-4:]
+
+        self._strings = strings = _Strings(self._buffer, *sections["strings"])
+        self._invoices = _Table(self._buffer, *sections["invoices"], _INVOICE)
+        self.task_repository = SnapshotTaskRepository(
+            _Table(self._buffer, *sections["tasks"], _TASK), strings, next_task_id)
+        self.contractor_repository = SnapshotContractorRepository(
+            _Table(self._buffer, *sections["contractors"], _CONTRACTOR), strings, next_contractor_id)
+        if task_repository is None:
+            task_repository = self.task_repository
+        if contractor_repository is None:
+            contractor_repository = self.contractor_repository
+        self.draft_repository = SnapshotDraftInvoiceRepository(
+            _Table(self._buffer, *sections["drafts"], _DRAFT), strings, next_draft_id,
+            task_repository, contractor_repository)
+        self.invoice_repository = SnapshotInvoiceRepository(
+            self._invoices, _Table(self._buffer, *sections["by_task"], _BY_TASK),
+            strings, next_invoice_id, task_repository, contractor_repository)
+
+    def invoice_records(self) -> Iterator[tuple]:
+        """
+        Yields the invoice rows of the file as field tuples, see write_invoices, without decoding them into invoices.
+        """
+        for row in range(self._invoices.count):
+            fields = self._invoices.unpack(row)
+            yield fields[:5] + (self._strings[fields[5]],)
+
+    def close(self):
+        self._buffer.close()
+        self._file.close()
@@ -0,0 +1,365 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from task import Task, TaskRepository
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice, DraftInvoice, InvoiceRepository, DraftInvoiceRepository
+from paging import Page, check_limit, decode_id_token, decode_time_token, page
+
+# SQLite backed repositories.
+# They expose the same methods as the in memory repositories and can be passed to the services as is.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    next INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sequences VALUES ('tasks', 0), ('contractors', 0), ('draft_invoices', 0), ('invoices', 0);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    location TEXT NOT NULL,
+    source_language TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    location_key TEXT NOT NULL,
+    source_language_key TEXT NOT NULL,
+    target_language_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_by_attributes ON tasks (location_key, source_language_key, target_language_key);
+CREATE INDEX IF NOT EXISTS tasks_by_location_time ON tasks (location_key, start_time);
+
+CREATE TABLE IF NOT EXISTS contractors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS draft_invoices (
+    id INTEGER PRIMARY KEY,
+    contractor_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    last_saved TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS draft_invoices_by_contractor ON draft_invoices (contractor_id);
+
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY,
+    contractor_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    signature TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invoices_by_task ON invoices (task_id);
+"""
+
+class ConnectionPool:
+    """
+    A small pool of connections to one SQLite database file, shared by the repositories.
+    The database is switched to WAL mode so readers do not block the writer.
+    """
+    def __init__(self, path: str, size: int = 4):
+        if path in ("", ":memory:"):
+            raise ValueError("ConnectionPool needs a database file, every connection would open its own temporary database")
+        self._connections: queue.Queue = queue.Queue()
+        for _ in range(size):
+            connection = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connections.put(connection)
+
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a connection for the duration of a transaction,
+        committing on success and rolling back on error.
+        """
+        connection = self._connections.get()
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get().close()
+
+def _assign_id(connection: sqlite3.Connection, table: str, id: Optional[int]) -> int:
+    """
+    Takes the next ID of the table sequence, or moves the sequence past an explicitly chosen ID.
+    Like in the in memory repositories IDs start at 0 and are never reused, even after a delete.
+    """
+    if id is None:
+        return connection.execute("UPDATE sequences SET next = next + 1 WHERE name = ? RETURNING next - 1", (table,)).fetchone()[0]
+    connection.execute("UPDATE sequences SET next = MAX(next, ? + 1) WHERE name = ?", (id, table))
+    return id
+
+class SqliteTaskRepository(TaskRepository):
+    def __init__(self, pool: ConnectionPool):  # pylint: disable=super-init-not-called
+        self.pool = pool
+
+    def add(self, task: Task):
+        self.add_many([task])
+
+    def add_many(self, tasks: Iterable[Task]):
+        with self.pool.connection() as connection:
+            for task in tasks:
+                task.id = _assign_id(connection, "tasks", task.id)
+                connection.execute(
+                    "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (task.id, task.location, task.source_language, task.target_language, task.start_time.isoformat(),
+                     task.location.casefold(), task.source_language.casefold(), task.target_language.casefold()))
+
+    def get(self, task_id: int) -> Optional[Task]:
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                "SELECT id, location, source_language, target_language, start_time FROM tasks WHERE id = ?",
+                (task_id,)).fetchone()
+        return None if row is None else _task(row)
+
+    def find_by_attributes(self, location: str, source_language: str, target_language: str) -> List[Task]:
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT id, location, source_language, target_language, start_time FROM tasks "
+                "WHERE location_key = ? AND source_language_key = ? AND target_language_key = ? ORDER BY id",
+                (location.casefold(), source_language.casefold(), target_language.casefold())).fetchall()
+        return [_task(row) for row in rows]
+
+    def find_by_attributes_page(self, location: str, source_language: str, target_language: str,
+                                limit: int, token: Optional[str] = None) -> Page[Task]:
+        check_limit(limit)
+        after = -1 if token is None else decode_id_token(token)
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT id, location, source_language, target_language, start_time FROM tasks "
+                "WHERE location_key = ? AND source_language_key = ? AND target_language_key = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (location.casefold(), source_language.casefold(), target_language.casefold(), after, limit + 1)).fetchall()
+        return page([_task(row) for row in rows], limit, lambda task: (task.id,))
+
+    def find_by_location_time_range_page(self, location: str, start_time: datetime, end_time: datetime,
+                                         limit: int, token: Optional[str] = None) -> Page[Task]:
+        check_limit(limit)
+        after_time, after_id = (start_time, -1) if token is None else decode_time_token(token)
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT id, location, source_language, target_language, start_time FROM tasks "
+                "WHERE location_key = ? AND start_time BETWEEN ? AND ? AND (start_time, id) > (?, ?) "
+                "ORDER BY start_time, id LIMIT ?",
+                (location.casefold(), start_time.isoformat(), end_time.isoformat(),
+                 after_time.isoformat(), after_id, limit + 1)).fetchall()
+        return page([_task(row) for row in rows], limit, lambda task: (task.start_time, task.id))
+
+    def iter_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> Iterator[Task]:
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT id, location, source_language, target_language, start_time FROM tasks "
+                "WHERE location_key = ? AND start_time BETWEEN ? AND ? ORDER BY start_time, id",
+                (location.casefold(), start_time.isoformat(), end_time.isoformat())).fetchall()
+        return (_task(row) for row in rows)
+
+def _task(row) -> Task:
+    return Task(row[0], row[1], row[2], row[3], datetime.fromisoformat(row[4]))
+
+class SqliteContractorRepository(ContractorRepository):
+    def __init__(self, pool: ConnectionPool):  # pylint: disable=super-init-not-called
+        self.pool = pool
+
+    def add(self, contractor: Contractor):
+        self.add_many([contractor])
+
+    def add_many(self, contractors: Iterable[Contractor]):
+        """
+        Adds all contractors or none of them, the unique name index rejects duplicates.
+        """
+        contractors = list(contractors)
+        assigned = [c for c in contractors if c.id is None]
+        try:
+            with self.pool.connection() as connection:
+                for contractor in contractors:
+                    contractor.id = _assign_id(connection, "contractors", contractor.id)
+                    try:
+                        connection.execute(
+                            "INSERT INTO contractors VALUES (?, ?, ?) "
+                            "ON CONFLICT (id) DO UPDATE SET name = excluded.name, name_key = excluded.name_key",
+                            (contractor.id, contractor.name, contractor.name.casefold()))
+                    except sqlite3.IntegrityError as e:
+                        raise ValueError(f"Contractor with name '{contractor.name}' already exists.") from e
+        except ValueError:
+            for contractor in assigned:
+                contractor.id = None
+            raise
+
+    def find_by_id(self, contractor_id: int) -> Optional[Contractor]:
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT id, name FROM contractors WHERE id = ?", (contractor_id,)).fetchone()
+        return None if row is None else Contractor(row[0], row[1])
+
+    def find_by_name(self, name: str) -> Optional[Contractor]:
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT id, name FROM contractors WHERE name_key = ?", (name.casefold(),)).fetchone()
+        return None if row is None else Contractor(row[0], row[1])
+
+# Invoice and draft rows are read together with the contractor and task they reference, in the same query,
+# so listing n of them costs one query instead of 2n + 1. The columns after the record's own are
+# contractor name, task location, source language, target language and start time.
+_INVOICES = (
+    "SELECT i.id, i.contractor_id, i.task_id, i.start_time, i.end_time, i.signature, "
+    "c.name, t.location, t.source_language, t.target_language, t.start_time "
+    "FROM invoices i LEFT JOIN contractors c ON c.id = i.contractor_id LEFT JOIN tasks t ON t.id = i.task_id ")
+_DRAFT_INVOICES = (
+    "SELECT d.id, d.contractor_id, d.task_id, d.start_time, d.end_time, d.signature, d.last_saved, "
+    "c.name, t.location, t.source_language, t.target_language, t.start_time "
+    "FROM draft_invoices d LEFT JOIN contractors c ON c.id = d.contractor_id LEFT JOIN tasks t ON t.id = d.task_id ")
+
+def _references(row, offset: int):
+    contractor_id, task_id = row[1], row[2]
+    name, location, source_language, target_language, start_time = row[offset:offset + 5]
+    if name is None or location is None:
+        raise ValueError(f"Invoice references a missing contractor {contractor_id} or task {task_id}")
+    return Contractor(contractor_id, name), Task(task_id, location, source_language, target_language,
+                                                 datetime.fromisoformat(start_time))
+
+class SqliteInvoiceRepository(InvoiceRepository):
+    """
+    Repository for submitted invoices stored in SQLite.
+    Once submitted, invoices become immutable (no editing or deletion).
+    task_repository and contractor_repository must be stored in the same database,
+    invoices are read joined with their tasks and contractors.
+    """
+    def __init__(self,  # pylint: disable=super-init-not-called
+                 pool: ConnectionPool,
+                 task_repository: TaskRepository,
+                 contractor_repository: ContractorRepository):
+        self.pool = pool
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+
+    def save(self, invoice: Invoice) -> Invoice:
+        if invoice.id is not None:
+            raise ValueError(f"Unexpected ID {invoice.id}")
+
+        with self.pool.connection() as connection:
+            invoice.id = _assign_id(connection, "invoices", None)
+            connection.execute(
+                "INSERT INTO invoices VALUES (?, ?, ?, ?, ?, ?)",
+                (invoice.id, invoice.contractor.id, invoice.task.id,
+                 invoice.start_time.isoformat(), invoice.end_time.isoformat(), invoice.signature))
+        return invoice
+
+    def get_by_task(self, task: Task) -> Optional[Invoice]:
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                _INVOICES + "WHERE i.task_id = ? ORDER BY i.id DESC LIMIT 1",
+                (task.id,)).fetchone()
+        if row is None:
+            return None
+        return self._invoice(row)
+
+    def iter_after(self, after_id: Optional[int] = None, chunk_size: int = 1000) -> Iterator[Invoice]:
+        """
+        Yields the invoices in ID order, starting after after_id, reading chunk_size rows at a time.
+        """
+        last_id = -1 if after_id is None else after_id
+        while True:
+            with self.pool.connection() as connection:
+                rows = connection.execute(
+                    _INVOICES + "WHERE i.id > ? ORDER BY i.id LIMIT ?",
+                    (last_id, chunk_size)).fetchall()
+            for row in rows:
+                yield self._invoice(row)
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    def _invoice(self, row) -> Invoice:
+        contractor, task = _references(row, 6)
+        return Invoice(contractor, task, datetime.fromisoformat(row[3]), datetime.fromisoformat(row[4]), row[5], row[0])
+
+class SqliteDraftInvoiceRepository(DraftInvoiceRepository):
+    """
+    Repository for draft invoices stored in SQLite.
+    task_repository and contractor_repository must be stored in the same database,
+    drafts are read joined with their tasks and contractors.
+    """
+    def __init__(self,  # pylint: disable=super-init-not-called
+                 pool: ConnectionPool,
+                 task_repository: TaskRepository,
+                 contractor_repository: ContractorRepository):
+        self.pool = pool
+        self.task_repository = task_repository
+        self.contractor_repository = contractor_repository
+
+    def get(self, draft_invoice_id: int) -> Optional[DraftInvoice]:
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                _DRAFT_INVOICES + "WHERE d.id = ?",
+                (draft_invoice_id,)).fetchone()
+        return None if row is None else self._draft(row)
+
+    def save(self, draft_invoice: DraftInvoice):
+        self.save_many([draft_invoice])
+
+    def save_many(self, draft_invoices: Iterable[DraftInvoice]):
+        with self.pool.connection() as connection:
+            for draft_invoice in draft_invoices:
+                draft_invoice.id = _assign_id(connection, "draft_invoices", draft_invoice.id)
+                connection.execute(
+                    "INSERT OR REPLACE INTO draft_invoices VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (draft_invoice.id, draft_invoice.contractor.id, draft_invoice.task.id,
+                     draft_invoice.start_time.isoformat(), draft_invoice.end_time.isoformat(),
+                     draft_invoice.signature, draft_invoice.last_saved.isoformat()))
+
+    def list_by_contractor(self, contractor: Contractor) -> List[DraftInvoice]:
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                _DRAFT_INVOICES + "WHERE d.contractor_id = ? ORDER BY d.id",
+                (contractor.id,)).fetchall()
+        return [self._draft(row) for row in rows]
+
+    def list_by_contractor_page(self, contractor: Contractor, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        check_limit(limit)
+        after = -1 if token is None else decode_id_token(token)
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                _DRAFT_INVOICES + "WHERE d.contractor_id = ? AND d.id > ? ORDER BY d.id LIMIT ?",
+                (contractor.id, after, limit + 1)).fetchall()
+        return page([self._draft(row) for row in rows], limit, lambda draft: (draft.id,))
+
+    def iter_after(self, after_id: Optional[int] = None, chunk_size: int = 1000) -> Iterator[DraftInvoice]:
+        """
+        Yields the drafts in ID order, starting after after_id, reading chunk_size rows at a time.
+        """
+        last_id = -1 if after_id is None else after_id
+        while True:
+            with self.pool.connection() as connection:
+                rows = connection.execute(
+                    _DRAFT_INVOICES + "WHERE d.id > ? ORDER BY d.id LIMIT ?",
+                    (last_id, chunk_size)).fetchall()
+            for row in rows:
+                yield self._draft(row)
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    def delete(self, draft_invoice_id: int):
+        with self.pool.connection() as connection:
+            deleted = connection.execute("DELETE FROM draft_invoices WHERE id = ?", (draft_invoice_id,)).rowcount
+        if deleted == 0:
+            raise ValueError("Draft invoice with ID {} not found.".format(draft_invoice_id))
+
+    def _draft(self, row) -> DraftInvoice:
+        contractor, task = _references(row, 7)
+        draft = DraftInvoice(contractor, task, datetime.fromisoformat(row[3]), datetime.fromisoformat(row[4]), row[5], row[0])
+        draft.last_saved = datetime.fromisoformat(row[6])
+        return draft
@@ -1,10 +1,15 @@
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from paging import Page, check_limit, decode_id_token, decode_time_token, page
+from sequence import IdSequence
 
 class Task:
     """
     The Task object
     """
+    __slots__ = ("id", "location", "source_language", "target_language", "start_time")
+
     def __init__(self, id: Optional[int], location: str, source_language: str, target_language: str, start_time: datetime):
         self.id = id
         self.location = location
@@ -12,30 +17,141 @@ class Task:
         self.target_language = target_language
         self.start_time = start_time
 
+def _attributes_key(location: str, source_language: str, target_language: str) -> Tuple[str, str, str]:
+    return (location.casefold(), source_language.casefold(), target_language.casefold())
+
+class _TimeIndex:
+    """
+    Tasks of a single location kept ordered by (start_time, id).
+    """
+    def __init__(self):
+        self.keys: List[Tuple[datetime, int]] = []
+        self.tasks: List[Task] = []
+
+    def insert(self, task: Task):
+        key = (task.start_time, task.id)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.tasks.insert(position, task)
+
+    def remove(self, start_time: datetime, task_id: int):
+        key = (start_time, task_id)
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+            del self.tasks[position]
+
+    def between(self, start_time: datetime, end_time: datetime) -> Iterator[Task]:
+        # (start_time,) sorts before any (start_time, id) and (end_time, inf) after any (end_time, id)
+        low = bisect_left(self.keys, (start_time,))
+        high = bisect_right(self.keys, (end_time, float("inf")))
+        for position in range(low, high):
+            yield self.tasks[position]
+
+    def page(self, start_time: datetime, end_time: datetime, after: Optional[Tuple[datetime, int]], count: int) -> List[Task]:
+        low = bisect_left(self.keys, (start_time,))
+        if after is not None:
+            low = max(low, bisect_right(self.keys, after))
+        high = min(bisect_right(self.keys, (end_time, float("inf"))), low + count)
+        return self.tasks[low:high]
+
 class TaskRepository:
     def __init__(self):
         self.tasks: Dict[int, Task] = {}
+        self.ids = IdSequence()
+        # secondary index: casefolded (location, source, target) -> tasks by ID
+        self._by_attributes: Dict[Tuple[str, str, str], Dict[int, Task]] = {}
+        # the same task IDs, sorted for paging
+        self._attribute_ids: Dict[Tuple[str, str, str], List[int]] = {}
+        # secondary index: casefolded location -> tasks ordered by start time
+        self._by_location: Dict[str, _TimeIndex] = {}
+        # task ID -> attributes key and start time it is indexed under, a stored task may be changed before it is re-added
+        self._indexed: Dict[int, Tuple[Tuple[str, str, str], datetime]] = {}
 
     def add(self, task: Task):
         if task.id is None:
-            task.id = len(self.tasks)
+            task.id = self.ids.next()
+        else:
+            self.ids.observe(task.id)
+
+        if task.id in self._indexed:
+            self._unindex(task.id)
 
         self.tasks[task.id] = task
+        self._index(task)
+
+    def add_many(self, tasks: Iterable[Task]):
+        for task in tasks:
+            self.add(task)
 
     def get(self, task_id: int) -> Optional[Task]:
         return self.tasks.get(task_id)
 
     def find_by_attributes(self, location: str, source_language: str, target_language: str) -> List[Task]:
-        return [
-            task for task in self.tasks.values()
-            if task.location.lower() == location.lower() and
-                task.source_language.lower() == source_language.lower() and
-                task.target_language.lower() == target_language.lower()
-        ]
+        matches = self._by_attributes.get(_attributes_key(location, source_language, target_language))
+        if matches is None:
+            return []
+        return list(matches.values())
 
     def find_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> List[Task]:
-        return [
-            task for task in self.tasks.values()
-            if task.location.lower() == location.lower() and
-                task.start_time >= start_time and task.start_time <= end_time
-        ]
+        return list(self.iter_by_location_time_range(location, start_time, end_time))
+
+    def find_by_attributes_page(self, location: str, source_language: str, target_language: str,
+                                limit: int, token: Optional[str] = None) -> Page[Task]:
+        """
+        Returns up to limit matching tasks ordered by ID, after the ones of the page that returned token.
+        """
+        check_limit(limit)
+        after = None if token is None else decode_id_token(token)
+        key = _attributes_key(location, source_language, target_language)
+        ids = self._attribute_ids.get(key)
+        if ids is None:
+            return Page([])
+        start = 0 if after is None else bisect_right(ids, after)
+        matches = self._by_attributes[key]
+        return page([matches[id] for id in ids[start:start + limit + 1]], limit, lambda task: (task.id,))
+
+    def find_by_location_time_range_page(self, location: str, start_time: datetime, end_time: datetime,
+                                         limit: int, token: Optional[str] = None) -> Page[Task]:
+        """
+        Returns up to limit tasks of a location starting within [start_time, end_time], ordered by start time and ID,
+        after the ones of the page that returned token.
+        """
+        check_limit(limit)
+        after = None if token is None else decode_time_token(token)
+        index = self._by_location.get(location.casefold())
+        if index is None:
+            return Page([])
+        return page(index.page(start_time, end_time, after, limit + 1), limit, lambda task: (task.start_time, task.id))
+
+    def iter_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> Iterator[Task]:
+        """
+        Yields the tasks of a location starting within [start_time, end_time], ordered by start time.
+        The repository must not be modified while the iterator is being consumed.
+        """
+        index = self._by_location.get(location.casefold())
+        if index is None:
+            return iter(())
+        return index.between(start_time, end_time)
+
+    def _index(self, task: Task):
+        key = _attributes_key(task.location, task.source_language, task.target_language)
+        self._by_attributes.setdefault(key, {})[task.id] = task
+        insort(self._attribute_ids.setdefault(key, []), task.id)
+        self._by_location.setdefault(key[0], _TimeIndex()).insert(task)
+        self._indexed[task.id] = (key, task.start_time)
+
+    def _unindex(self, task_id: int):
+        key, start_time = self._indexed.pop(task_id)
+        matches = self._by_attributes[key]
+        del matches[task_id]
+        ids = self._attribute_ids[key]
+        del ids[bisect_left(ids, task_id)]
+        if not matches:
+            del self._by_attributes[key]
+            del self._attribute_ids[key]
+
+        index = self._by_location[key[0]]
+        index.remove(start_time, task_id)
+        if not index.keys:
+            del self._by_location[key[0]]
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from async_service import AsyncDraftInvoiceService, AsyncInvoiceManagementService, ExecutorRepository
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoiceRepository, InvoiceRepository
+from task import Task, TaskRepository
+
+class YieldingRepository:
+    """
+    An async backend that yields to the event loop before every call, so concurrent coroutines interleave
+    """
+    def __init__(self, repository):
+        self.repository = repository
+
+    def __getattr__(self, name):
+        method = getattr(self.repository, name)
+
+        async def call(*args):
+            await asyncio.sleep(0)
+            return method(*args)
+        return call
+
+class TestAsyncServices(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Set up async services over yielding repositories with two contractors and two tasks"""
+        contractor_repo = ContractorRepository()
+        contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Bob")])
+        task_repo = TaskRepository()
+        task_repo.add_many([Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)),
+                            Task(None, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0))])
+        self.invoice_repo = InvoiceRepository()
+        repositories = [YieldingRepository(r) for r in (task_repo, contractor_repo, DraftInvoiceRepository())]
+        self.draft_service = AsyncDraftInvoiceService(*repositories)
+        self.invoice_service = AsyncInvoiceManagementService(*repositories, YieldingRepository(self.invoice_repo))
+
+    async def save_draft(self, contractor_id: int, task_id: int) -> int:
+        return await self.draft_service.save_draft_invoice(
+            contractor_id, task_id, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature")
+
+    async def test_workflow(self):
+        """Test save, update, list and submit through the async services"""
+        draft_id = await self.save_draft(0, 0)
+        await self.draft_service.update(draft_id, 1, None, None, None, "new-signature")
+        self.assertEqual(await self.draft_service.list(0), [])
+        self.assertEqual([d.signature for d in await self.draft_service.list(1)], ["new-signature"])
+        self.assertEqual(await self.invoice_service.submit_invoice(draft_id), 0)
+        self.assertEqual(await self.draft_service.list(1), [])
+
+    async def test_concurrent_submissions_for_one_task(self):
+        """Test that concurrent submissions for the same task produce a single invoice"""
+        draft_ids = [await self.save_draft(i % 2, 0) for i in range(10)] + [await self.save_draft(0, 1)]
+        results = await asyncio.gather(*(self.invoice_service.submit_invoice(d) for d in draft_ids), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, ValueError)]
+        self.assertEqual(len(errors), 9)
+        self.assertEqual(sorted(i.task.id for i in self.invoice_repo.invoices.values()), [0, 1])
+
+    async def test_executor_repository(self):
+        """Test that a blocking repository wrapped in an executor returns awaitables"""
+        repository = ExecutorRepository(ContractorRepository())
+        await repository.add(Contractor(None, "Carol"))
+        contractor = await repository.find_by_name("carol")
+        self.assertEqual(contractor.id, 0)
+
+if __name__ == '__main__':
+    unittest.main()
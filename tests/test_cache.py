@@ -0,0 +1,68 @@
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from cache import CachingTaskRepository
+from task import Task, TaskRepository
+
+class TestCachingTaskRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a cache of two entries in front of a repository with two tasks"""
+        self.repository = CachingTaskRepository(TaskRepository(), max_entries=2)
+        self.repository.add(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)))
+        self.repository.add(Task(None, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0)))
+
+    def test_repeated_query_hits(self):
+        """Test that a repeated query with differently cased arguments is served from the cache"""
+        first = self.repository.find_by_attributes("Office", "English", "Spanish")
+        second = self.repository.find_by_attributes("OFFICE", "english", "spanish")
+        self.assertEqual([t.id for t in second], [t.id for t in first])
+        self.assertEqual((self.repository.hits, self.repository.misses), (1, 1))
+
+    def test_add_invalidates_only_touched_entries(self):
+        """Test that adding a task drops the results it belongs to and keeps the others"""
+        march = (datetime(2025, 3, 1), datetime(2025, 3, 31))
+        self.repository.find_by_location_time_range("Office", *march)
+        self.repository.find_by_attributes("Remote", "French", "English")
+        self.repository.add(Task(None, "office", "German", "English", datetime(2025, 3, 5, 9, 0)))
+        self.assertEqual(self.repository.invalidations, 1)
+
+        self.assertEqual([t.id for t in self.repository.find_by_location_time_range("Office", *march)], [0, 2])
+        self.repository.find_by_attributes("Remote", "French", "English")
+        self.assertEqual((self.repository.hits, self.repository.misses), (1, 3))
+
+    def test_replacing_task_invalidates_previous_attributes(self):
+        """Test that moving a task to other attributes drops the result it was in"""
+        self.assertEqual(len(self.repository.find_by_attributes("Office", "English", "Spanish")), 1)
+        self.repository.add(Task(0, "Remote", "French", "English", datetime(2025, 3, 1, 9, 0)))
+        self.assertEqual(self.repository.find_by_attributes("Office", "English", "Spanish"), [])
+
+    def test_task_changed_in_place_invalidates_previous_entries(self):
+        """Test that re-adding a stored task changed in place drops the results it was cached in"""
+        march = (datetime(2025, 3, 1), datetime(2025, 3, 5))
+        self.assertEqual(len(self.repository.find_by_attributes("Office", "English", "Spanish")), 1)
+        self.assertEqual(len(self.repository.find_by_location_time_range("Office", *march)), 1)
+        task = self.repository.get(0)
+        task.location = "Remote"
+        task.start_time = datetime(2025, 3, 20, 9, 0)
+        self.repository.add(task)
+        self.assertEqual(self.repository.find_by_attributes("Office", "English", "Spanish"), [])
+        self.assertEqual(self.repository.find_by_location_time_range("Office", *march), [])
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache keeps max_entries results, evicting the least recently used"""
+        self.repository.find_by_attributes("Office", "English", "Spanish")
+        self.repository.find_by_attributes("Remote", "French", "English")
+        self.repository.find_by_attributes("Office", "English", "Spanish")
+        self.repository.find_by_location_time_range("Remote", datetime(2025, 3, 1), datetime(2025, 3, 31))
+        self.assertEqual((len(self.repository), self.repository.evictions), (2, 1))
+        self.repository.find_by_attributes("Office", "English", "Spanish")
+        self.assertEqual(self.repository.hits, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from columnar import ColumnarInvoiceRepository
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoiceRepository, Invoice
+from service import DraftInvoiceService, InvoiceManagementService
+from task import Task, TaskRepository
+
+class TestColumnarInvoiceRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a columnar repository with one contractor and two tasks"""
+        self.contractor_repo = ContractorRepository()
+        self.contractor_repo.add(Contractor(None, "Alice"))
+        self.task_repo = TaskRepository()
+        self.task_repo.add(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)))
+        self.task_repo.add(Task(None, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0)))
+        self.repository = ColumnarInvoiceRepository(self.task_repo, self.contractor_repo)
+
+    def test_save_and_view(self):
+        """Test that a saved invoice reads back through a view"""
+        contractor = self.contractor_repo.find_by_id(0)
+        task = self.task_repo.get(1)
+        assert contractor is not None and task is not None
+        invoice = self.repository.save(Invoice(contractor, task, datetime(2025, 3, 10, 8, 0, 0, 7), datetime(2025, 3, 10, 9, 0), "sig"))
+        self.assertEqual(invoice.id, 0)
+
+        view = self.repository.get_by_task(task)
+        assert view is not None
+        self.assertEqual((view.id, view.contractor_id, view.task_id, view.signature), (0, 0, 1, "sig"))
+        self.assertEqual(view.start_time, datetime(2025, 3, 10, 8, 0, 0, 7))
+        self.assertIs(view.task, task)
+        self.assertIsNone(self.repository.get(1))
+        self.assertEqual([v.id for v in self.repository], [0])
+
+    def test_submit_through_service(self):
+        """Test that the columnar repository can back InvoiceManagementService"""
+        draft_repo = DraftInvoiceRepository()
+        draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, draft_repo)
+        invoice_service = InvoiceManagementService(self.task_repo, self.contractor_repo, draft_repo, self.repository)
+        draft_id = draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+        self.assertEqual(invoice_service.submit_invoice(draft_id), 0)
+        second = draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 11, 8, 0), datetime(2025, 3, 11, 9, 0), "sig")
+        with self.assertRaises(ValueError):
+            invoice_service.submit_invoice(second)
+
+if __name__ == '__main__':
+    unittest.main()
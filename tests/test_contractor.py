@@ -148,5 +148,42 @@ class TestContractorRepository(unittest.TestCase):
             self.empty_repository.add(contractor)
             self.assertEqual(contractor.id, i)
 
+    def test_add_many(self):
+        """Test adding a batch of contractors"""
+        contractors = [Contractor(None, "First"), Contractor(None, "Second")]
+        self.empty_repository.add_many(contractors)
+        self.assertEqual([c.id for c in contractors], [0, 1])
+        self.assertIs(self.empty_repository.find_by_name("second"), contractors[1])
+
+    def test_add_many_duplicate_within_batch(self):
+        """Test that a duplicate name inside the batch rejects the whole batch"""
+        with self.assertRaises(ValueError):
+            self.empty_repository.add_many([Contractor(None, "John Doe"), Contractor(None, "JOHN DOE")])
+        self.assertEqual(len(self.empty_repository.contractors), 0)
+
+    def test_add_many_duplicate_of_existing(self):
+        """Test that a name already in the repository rejects the whole batch"""
+        with self.assertRaises(ValueError):
+            self.populated_repository.add_many([Contractor(None, "New Person"), Contractor(None, "bob jones")])
+        self.assertEqual(len(self.populated_repository.contractors), 3)
+        self.assertIsNone(self.populated_repository.find_by_name("New Person"))
+
+    def test_add_with_existing_id_replaces_name(self):
+        """Test that replacing a contractor by ID frees its old name"""
+        self.populated_repository.add(Contractor(0, "Alice Jones"))
+        self.assertIsNone(self.populated_repository.find_by_name("Alice Smith"))
+        self.assertIsNotNone(self.populated_repository.find_by_name("alice jones"))
+
+    def test_re_add_renamed_contractor(self):
+        """Test that a stored contractor renamed in place and re-added is indexed under its new name only"""
+        contractor = self.populated_repository.find_by_id(0)
+        assert contractor is not None
+        contractor.name = "Alicia Smith"
+        self.populated_repository.add(contractor)
+        self.assertIs(self.populated_repository.find_by_name("alicia smith"), contractor)
+        self.assertIsNone(self.populated_repository.find_by_name("Alice Smith"))
+        self.populated_repository.add(Contractor(None, "Alice Smith"))
+        self.assertEqual(len(self.populated_repository.contractors), 4)
+
 if __name__ == '__main__':
     unittest.main()
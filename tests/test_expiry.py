@@ -0,0 +1,66 @@
+import unittest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor
+from expiry import ExpiringDraftInvoiceRepository
+from invoice import DraftInvoice
+from task import Task
+
+class TestExpiringDraftInvoiceRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a repository with a one hour TTL and three drafts saved an hour apart"""
+        self.repository = ExpiringDraftInvoiceRepository(timedelta(hours=1))
+        self.contractor = Contractor(0, "Alice")
+        task = Task(0, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0))
+        self.drafts = []
+        for hour in range(3):
+            draft = DraftInvoice(self.contractor, task, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+            draft.last_saved = datetime(2025, 3, 10, 10 + hour)
+            self.repository.save(draft)
+            self.drafts.append(draft)
+
+    def test_evicts_only_expired(self):
+        """Test that drafts older than the TTL are evicted, returned and counted"""
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 10, 11, 30)), [0])
+        self.assertEqual(sorted(self.repository.draft_invoices), [1, 2])
+        self.assertEqual(self.repository.list_by_contractor(self.contractor), self.drafts[1:])
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 10, 11, 30)), [])
+        self.assertEqual(self.repository.evicted, 1)
+
+    def test_refreshed_draft_is_kept(self):
+        """Test that saving a draft again with a newer last_saved postpones its expiry"""
+        self.drafts[0].last_saved = datetime(2025, 3, 10, 12, 30)
+        self.repository.save(self.drafts[0])
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 10, 13, 15)), [1, 2])
+        self.assertEqual(sorted(self.repository.draft_invoices), [0])
+
+    def test_draft_refreshed_in_place_expires(self):
+        """Test that a draft refreshed in place without saving it again is kept, then expires later"""
+        self.drafts[0].last_saved = datetime(2025, 3, 10, 12, 30)
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 10, 12, 15)), [1])
+        self.assertEqual(sorted(self.repository.draft_invoices), [0, 2])
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 10, 13, 45)), [2, 0])
+        self.assertEqual(self.repository.draft_invoices, {})
+
+    def test_deleted_draft_is_skipped(self):
+        """Test that a draft deleted before it expires is not counted"""
+        self.repository.delete(0)
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 11)), [1, 2])
+        self.assertEqual(self.repository.draft_invoices, {})
+
+    def test_heap_is_compacted(self):
+        """Test that repeated saves do not grow the heap without bound"""
+        for minute in range(500):
+            self.drafts[2].last_saved = datetime(2025, 3, 10, 13, 0) + timedelta(minutes=minute)
+            self.repository.save(self.drafts[2])
+        self.assertLessEqual(len(self.repository._heap), 2 * 3 + 64)  # pylint: disable=protected-access
+        self.assertEqual(self.repository.evict_expired(datetime(2025, 3, 10, 14, 0)), [0, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor, ContractorRepository
+from export import DRAFT_FIELDS, select, write_csv, write_jsonl
+from invoice import DraftInvoice, DraftInvoiceRepository, Invoice, InvoiceRepository
+from task import Task, TaskRepository
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        """Set up ten invoices alternating between two contractors and two locations"""
+        self.contractor_repo = ContractorRepository()
+        self.contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Bob")])
+        self.task_repo = TaskRepository()
+        self.task_repo.add_many(Task(None, ["Office", "Remote"][i % 2], "English", "Spanish", datetime(2025, 3, i + 1, 9, 0))
+                                for i in range(10))
+        self.invoice_repo = InvoiceRepository()
+        self.draft_repo = DraftInvoiceRepository()
+        for task in self.task_repo.tasks.values():
+            contractor = self.contractor_repo.contractors[task.id % 2]
+            self.invoice_repo.save(Invoice(contractor, task, task.start_time, task.start_time.replace(hour=10), "sig"))
+            self.draft_repo.save(DraftInvoice(contractor, task, task.start_time, task.start_time.replace(hour=10), "sig"))
+
+    def test_filters(self):
+        """Test filtering by contractor, date range and location"""
+        self.assertEqual([i.id for i in select(self.invoice_repo, contractor_id=1)], [1, 3, 5, 7, 9])
+        found = select(self.invoice_repo, start_time=datetime(2025, 3, 3), end_time=datetime(2025, 3, 5, 9, 0))
+        self.assertEqual([i.id for i in found], [2, 3, 4])
+        self.assertEqual([i.id for i in select(self.invoice_repo, location="OFFICE", after_id=5)], [6, 8])
+
+    def test_jsonl_resume(self):
+        """Test that an export resumed from the last exported ID covers every invoice once"""
+        first, second = io.StringIO(), io.StringIO()
+        invoices = select(self.invoice_repo)
+        last_id = write_jsonl((next(invoices) for _ in range(4)), first, chunk_size=3)
+        self.assertEqual(last_id, 3)
+        self.assertEqual(write_jsonl(select(self.invoice_repo, after_id=last_id), second, chunk_size=3), 9)
+
+        records = [json.loads(line) for line in (first.getvalue() + second.getvalue()).splitlines()]
+        self.assertEqual([r["id"] for r in records], list(range(10)))
+        self.assertEqual(records[1]["contractor_name"], "Bob")
+
+    def test_csv_drafts(self):
+        """Test exporting drafts to CSV with the last saved time"""
+        output = io.StringIO()
+        self.draft_repo.delete(4)
+        self.assertEqual(write_csv(select(self.draft_repo), output, chunk_size=4, fields=DRAFT_FIELDS), 9)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual([int(r["id"]) for r in rows], [0, 1, 2, 3, 5, 6, 7, 8, 9])
+        self.assertEqual(rows[0]["start_time"], "2025-03-01T09:00:00")
+        self.assertTrue(rows[0]["last_saved"])
+
+    def test_empty_export(self):
+        """Test that exporting nothing writes only the header and returns no ID"""
+        output = io.StringIO()
+        self.assertIsNone(write_csv(select(InvoiceRepository()), output))
+        self.assertEqual(output.getvalue().strip(), ",".join(("id", "contractor_id", "contractor_name", "task_id", "location",
+                                                               "source_language", "target_language", "start_time",
+                                                               "end_time", "signature")))
+
+if __name__ == '__main__':
+    unittest.main()
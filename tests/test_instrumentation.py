@@ -0,0 +1,92 @@
+import asyncio
+import json
+import unittest
+import sys
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor, ContractorRepository
+from instrumentation import Metrics, instrument, serve
+from invoice import DraftInvoiceRepository
+from service import DraftInvoiceService
+from task import Task, TaskRepository
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        """Set up an instrumented draft service over instrumented repositories"""
+        self.metrics = Metrics()
+        contractor_repo = ContractorRepository()
+        contractor_repo.add(Contractor(None, "Alice"))
+        task_repo = TaskRepository()
+        task_repo.add(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)))
+        self.contractor_repo = instrument(contractor_repo, self.metrics, "contractor_repository")
+        self.task_repo = instrument(task_repo, self.metrics, "task_repository")
+        self.draft_repo = instrument(DraftInvoiceRepository(), self.metrics, "draft_repository")
+        self.service = instrument(DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo), self.metrics, "draft_service")
+
+    def save_draft(self):
+        return self.service.save_draft_invoice(0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+
+    def test_counts_calls_errors_and_result_sizes(self):
+        """Test that calls, errors and result sizes are recorded per component and method"""
+        self.save_draft()
+        self.save_draft()
+        self.assertEqual(len(self.service.list(0)), 2)
+        with self.assertRaises(ValueError):
+            self.service.list(5)
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["draft_service"]["save_draft_invoice"]["calls"], 2)
+        self.assertEqual(snapshot["draft_service"]["list"]["errors"], 1)
+        self.assertEqual(snapshot["draft_repository"]["list_by_contractor"]["result_size"], 2)
+        self.assertEqual(snapshot["contractor_repository"]["find_by_id"]["calls"], 4)
+        self.assertEqual(sum(snapshot["draft_repository"]["save"]["buckets"].values()), 2)
+        json.dumps(snapshot)
+
+    def test_disabled(self):
+        """Test that nothing is recorded while metrics are disabled"""
+        self.metrics.enabled = False
+        self.save_draft()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_prometheus_export(self):
+        """Test the Prometheus text format"""
+        self.save_draft()
+        text = self.metrics.prometheus()
+        self.assertIn('invoice_mgmt_calls_total{component="task_repository",method="get"} 1', text)
+        self.assertIn('invoice_mgmt_call_seconds_bucket{component="task_repository",method="get",le="+Inf"} 1', text)
+
+    def test_coroutines_are_timed_until_complete(self):
+        """Test that async methods are recorded when awaited"""
+        class Slow:
+            async def wait(self):
+                await asyncio.sleep(0.01)
+                return [1, 2, 3]
+
+        slow = instrument(Slow(), self.metrics, "slow")
+        self.assertEqual(asyncio.run(slow.wait()), [1, 2, 3])
+        stats = self.metrics.snapshot()["slow"]["wait"]
+        self.assertGreaterEqual(stats["seconds"], 0.01)
+        self.assertEqual(stats["result_size"], 3)
+
+    def test_serve(self):
+        """Test that the metrics are served over HTTP"""
+        self.save_draft()
+        server = serve(self.metrics, port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(url + "/metrics.json") as response:
+                self.assertIn("draft_service", json.load(response))
+            with urllib.request.urlopen(url + "/metrics") as response:
+                self.assertIn(b"invoice_mgmt_calls_total", response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
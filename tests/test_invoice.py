@@ -0,0 +1,99 @@
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor
+from invoice import DraftInvoice, DraftInvoiceRepository, Invoice, InvoiceRepository
+from task import Task
+
+class TestInvoiceRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a repository and a few domain objects"""
+        self.repository = InvoiceRepository()
+        self.contractor = Contractor(0, "Alice")
+        self.task1 = Task(0, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0))
+        self.task2 = Task(1, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0))
+
+    def make_invoice(self, task: Task) -> Invoice:
+        return Invoice(self.contractor, task, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature")
+
+    def test_save_assigns_id_and_returns_invoice(self):
+        """Test that save assigns sequential IDs and returns the saved invoice"""
+        first = self.repository.save(self.make_invoice(self.task1))
+        second = self.repository.save(self.make_invoice(self.task2))
+        self.assertEqual((first.id, second.id), (0, 1))
+        self.assertIs(self.repository.invoices[1], second)
+
+    def test_save_with_id_raises(self):
+        """Test that saving an invoice that already has an ID raises ValueError"""
+        invoice = self.make_invoice(self.task1)
+        invoice.id = 3
+        with self.assertRaises(ValueError):
+            self.repository.save(invoice)
+
+    def test_get_by_task(self):
+        """Test that invoices are found by task"""
+        invoice = self.repository.save(self.make_invoice(self.task1))
+        self.assertIs(self.repository.get_by_task(self.task1), invoice)
+        self.assertIsNone(self.repository.get_by_task(self.task2))
+
+    def test_immutable(self):
+        """Test that submitted invoices cannot be edited or deleted"""
+        invoice = self.repository.save(self.make_invoice(self.task1))
+        with self.assertRaises(ValueError):
+            self.repository.update(invoice)
+        with self.assertRaises(ValueError):
+            self.repository.delete(invoice)
+class TestDraftInvoiceRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a repository with drafts for two contractors"""
+        self.repository = DraftInvoiceRepository()
+        self.alice = Contractor(0, "Alice")
+        self.bob = Contractor(1, "Bob")
+        self.task = Task(0, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0))
+        self.drafts = [self.make_draft(self.alice), self.make_draft(self.bob), self.make_draft(self.alice)]
+        for draft in self.drafts:
+            self.repository.save(draft)
+
+    def make_draft(self, contractor: Contractor) -> DraftInvoice:
+        return DraftInvoice(contractor, self.task, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature")
+
+    def test_list_by_contractor(self):
+        """Test listing drafts per contractor"""
+        self.assertEqual([d.id for d in self.repository.list_by_contractor(self.alice)], [0, 2])
+        self.assertEqual([d.id for d in self.repository.list_by_contractor(self.bob)], [1])
+        self.assertEqual(self.repository.list_by_contractor(Contractor(7, "Nobody")), [])
+
+    def test_list_by_contractor_after_reassignment(self):
+        """Test that saving a draft with a new contractor moves it between lists"""
+        draft = self.drafts[0]
+        draft.contractor = self.bob
+        self.repository.save(draft)
+        self.assertEqual([d.id for d in self.repository.list_by_contractor(self.alice)], [2])
+        self.assertEqual([d.id for d in self.repository.list_by_contractor(self.bob)], [1, 0])
+
+    def test_list_by_contractor_after_delete(self):
+        """Test that deleted drafts are no longer listed"""
+        self.repository.delete(1)
+        self.assertEqual(self.repository.list_by_contractor(self.bob), [])
+        with self.assertRaises(ValueError):
+            self.repository.delete(1)
+
+    def test_list_by_contractor_page(self):
+        """Test that pages list the contractor's drafts by ID, also after a reassignment"""
+        draft = self.drafts[0]
+        draft.contractor = self.bob
+        self.repository.save(draft)
+        first = self.repository.list_by_contractor_page(self.bob, 1)
+        second = self.repository.list_by_contractor_page(self.bob, 1, first.next_token)
+        self.assertEqual([d.id for d in first.items + second.items], [0, 1])
+        self.assertIsNone(second.next_token)
+        self.assertEqual(self.repository.list_by_contractor_page(Contractor(7, "Nobody"), 10).items, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice
+from journal import JournaledInvoiceRepository
+from task import Task, TaskRepository
+
+class TestJournaledInvoiceRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary directory, a contractor and a few tasks"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.contractor_repo = ContractorRepository()
+        self.contractor_repo.add(Contractor(None, "Alice"))
+        self.task_repo = TaskRepository()
+        self.task_repo.add_many(Task(None, "Office", "English", "Spanish", datetime(2025, 3, i + 1, 9, 0)) for i in range(5))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open(self, **kwargs) -> JournaledInvoiceRepository:
+        return JournaledInvoiceRepository(self.directory.name, self.task_repo, self.contractor_repo, **kwargs)
+
+    def save(self, repository: JournaledInvoiceRepository, task_id: int) -> Invoice:
+        contractor = self.contractor_repo.find_by_id(0)
+        task = self.task_repo.get(task_id)
+        assert contractor is not None and task is not None
+        return repository.save(Invoice(contractor, task, datetime(2025, 3, 10, 8, 0, 0, 250), datetime(2025, 3, 10, 9, 0), "sígnature"))
+
+    def test_recover_from_journal(self):
+        """Test that invoices saved before closing are loaded on reopening"""
+        repository = self.open()
+        for task_id in range(3):
+            self.save(repository, task_id)
+        repository.close()
+
+        recovered = self.open()
+        self.assertEqual(sorted(recovered.invoices), [0, 1, 2])
+        invoice = recovered.invoices[1]
+        self.assertEqual((invoice.task.id, invoice.signature), (1, "sígnature"))
+        self.assertEqual(invoice.start_time, datetime(2025, 3, 10, 8, 0, 0, 250))
+        task = self.task_repo.get(2)
+        assert task is not None
+        self.assertIs(recovered.get_by_task(task), recovered.invoices[2])
+        self.assertEqual(self.save(recovered, 3).id, 3)
+        recovered.close()
+
+    def test_recover_from_snapshot_and_journal(self):
+        """Test that recovery combines the snapshot with the journal written after it"""
+        repository = self.open(snapshot_every=2)
+        for task_id in range(5):
+            self.save(repository, task_id)
+        repository.close()
+        self.assertGreater(Path(repository.snapshot_path).stat().st_size, 0)
+
+        recovered = self.open()
+        self.assertEqual(sorted(recovered.invoices), [0, 1, 2, 3, 4])
+        recovered.close()
+
+    def test_snapshot_is_loaded_lazily(self):
+        """Test that recovery decodes snapshot invoices on first lookup and replays the journal after it"""
+        repository = self.open()
+        for task_id in range(3):
+            self.save(repository, task_id)
+        repository.snapshot()
+        self.save(repository, 3)
+        repository.close()
+        self.assertFalse(Path(repository.previous_journal_path).exists())
+
+        recovered = self.open()
+        self.assertEqual(len(recovered.invoices), 4)
+        self.assertEqual(len(recovered.invoices._objects), 1)  # pylint: disable=protected-access
+        task = self.task_repo.get(1)
+        assert task is not None
+        invoice = recovered.get_by_task(task)
+        assert invoice is not None
+        self.assertEqual((invoice.id, invoice.signature), (1, "sígnature"))
+        self.assertEqual(len(recovered.invoices._objects), 2)  # pylint: disable=protected-access
+        self.assertEqual(self.save(recovered, 4).id, 4)
+        self.assertEqual(sorted(recovered.invoices), [0, 1, 2, 3, 4])
+        recovered.close()
+
+    def test_previous_journal_is_folded_on_recovery(self):
+        """Test that a journal moved aside but not yet folded into the snapshot is recovered and folded"""
+        repository = self.open()
+        for task_id in range(3):
+            self.save(repository, task_id)
+        repository.snapshot()
+        self.save(repository, 3)
+        repository.close()
+        # a crash right after the journal was moved aside
+        Path(repository.journal_path).rename(repository.previous_journal_path)
+
+        recovered = self.open()
+        self.assertEqual(sorted(recovered.invoices), [0, 1, 2, 3])
+        recovered.wait_for_snapshot()
+        self.assertFalse(Path(recovered.previous_journal_path).exists())
+        self.save(recovered, 4)
+        recovered.close()
+        reopened = self.open()
+        self.assertEqual(len(reopened.invoices._objects), 1)  # pylint: disable=protected-access
+        self.assertEqual(sorted(reopened.invoices), [0, 1, 2, 3, 4])
+        reopened.close()
+
+    def test_synced_after_saves_stop(self):
+        """Test that the last saved invoice is written out by the sync thread without another save or flush"""
+        repository = self.open(sync_every=1000, sync_interval=0.01)
+        self.save(repository, 0)
+        deadline = time.monotonic() + 5
+        while Path(repository.journal_path).stat().st_size == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreater(Path(repository.journal_path).stat().st_size, 0)
+        repository.close()
+
+    def test_torn_record_is_dropped(self):
+        """Test that a partially written record at the end of the journal is ignored"""
+        repository = self.open()
+        for task_id in range(2):
+            self.save(repository, task_id)
+        repository.close()
+        with open(repository.journal_path, "ab") as journal:
+            journal.write(b"\x30\x00\x00\x00garbage")
+
+        recovered = self.open()
+        self.assertEqual(sorted(recovered.invoices), [0, 1])
+        self.save(recovered, 2)
+        recovered.close()
+        reopened = self.open()
+        self.assertEqual(sorted(reopened.invoices), [0, 1, 2])
+        reopened.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import random
+import unittest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from expiry import ExpiringDraftInvoiceRepository
+from overlap import BillingIntervals, IntervalTree
+from service import DraftInvoiceService, InvoiceManagementService
+from test_service import ServiceTestCase
+
+class TestIntervalTree(unittest.TestCase):
+    def test_matches_scan(self):
+        """Test that overlapping finds the same intervals as a scan, also after removals"""
+        rng = random.Random(7)
+        base = datetime(2025, 3, 1)
+        tree = IntervalTree()
+        intervals = []
+        for key in range(500):
+            start = base + timedelta(minutes=rng.randrange(10_000))
+            end = start + timedelta(minutes=rng.randrange(1, 600))
+            tree.insert(start, end, key)
+            intervals.append((start, end, key))
+        for start, _, key in intervals[::3]:
+            tree.remove(start, key)
+        intervals = [interval for interval in intervals if interval[2] % 3 != 0]
+        self.assertEqual(len(tree), len(intervals))
+
+        for _ in range(100):
+            start = base + timedelta(minutes=rng.randrange(10_000))
+            end = start + timedelta(minutes=rng.randrange(1, 600))
+            expected = sorted(key for s, e, key in intervals if s < end and e > start)
+            self.assertEqual(sorted(key for _, _, key in tree.overlapping(start, end)), expected)
+
+    def test_adjacent_intervals_do_not_overlap(self):
+        """Test that an interval ending when another starts is not reported"""
+        tree = IntervalTree()
+        tree.insert(datetime(2025, 3, 10, 8), datetime(2025, 3, 10, 9), "a")
+        self.assertEqual(list(tree.overlapping(datetime(2025, 3, 10, 9), datetime(2025, 3, 10, 10))), [])
+
+class TestBillingIntervals(ServiceTestCase):
+    def setUp(self):
+        """Set up the services sharing one billing interval index"""
+        super().setUp()
+        self.intervals = BillingIntervals()
+        self.draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo, self.intervals)
+        self.invoice_service = InvoiceManagementService(
+            self.task_repo, self.contractor_repo, self.draft_repo, self.invoice_repo, self.intervals)
+
+    def test_rejects_overlapping_draft(self):
+        """Test that a contractor cannot bill the same time twice, while another contractor can"""
+        first = self.save_draft(0, 0)
+        with self.assertRaisesRegex(ValueError, f"overlaps with draft {first}"):
+            self.draft_service.save_draft_invoice(0, 1, datetime(2025, 3, 10, 8, 30), datetime(2025, 3, 10, 10), "signature")
+        self.save_draft(1, 1)
+        self.save_draft(0, 1, hour=9)
+        self.assertEqual(len(self.draft_repo.draft_invoices), 3)
+
+    def test_update_and_submit(self):
+        """Test that a draft does not overlap itself and that submitted invoices keep their time"""
+        first, second = self.save_draft(0, 0), self.save_draft(0, 1, hour=10)
+        self.draft_service.update(first, None, None, None, datetime(2025, 3, 10, 9, 30), None)
+        with self.assertRaises(ValueError):
+            self.draft_service.update(second, None, None, datetime(2025, 3, 10, 9, 0), None, None)
+        self.assertEqual(self.draft_repo.get(second).start_time, datetime(2025, 3, 10, 10, 0))
+
+        invoice_id = self.invoice_service.submit_invoice(first)
+        billed = self.intervals.billed_between(0, datetime(2025, 3, 10), datetime(2025, 3, 11))
+        self.assertEqual([key for key, _, _ in billed], [("invoice", invoice_id), ("draft", second)])
+        self.draft_service.delete(second)
+        self.assertEqual(len(self.intervals.billed_between(0, datetime(2025, 3, 10), datetime(2025, 3, 11))), 1)
+
+    def test_batch_items_checked_against_each_other(self):
+        """Test that overlapping items of one batch are reported"""
+        result = self.draft_service.save_draft_invoices([
+            (0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+            (0, 1, datetime(2025, 3, 10, 8, 30), datetime(2025, 3, 10, 9, 30), "signature"),
+        ])
+        self.assertEqual(result.ids, [0, None])
+        self.assertIn(1, result.errors)
+
+    def test_flags_instead_of_rejecting(self):
+        """Test that overlaps are recorded in flagged when reject is off"""
+        self.intervals.reject = False
+        first = self.save_draft(0, 0)
+        second = self.draft_service.save_draft_invoice(
+            0, 1, datetime(2025, 3, 10, 8, 30), datetime(2025, 3, 10, 10), "signature")
+        self.assertEqual(self.intervals.flagged, {("draft", second): [("draft", first)]})
+        self.draft_service.delete(second)
+        self.assertEqual(self.intervals.flagged, {})
+
+    def test_batch_overlaps_flagged_by_draft_id(self):
+        """Test that overlaps within a batch are flagged under the IDs the drafts were saved with"""
+        self.intervals.reject = False
+        self.save_draft(1, 0)
+        result = self.draft_service.save_draft_invoices([
+            (0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+            (0, 1, datetime(2025, 3, 10, 8, 30), datetime(2025, 3, 10, 9, 30), "signature"),
+        ])
+        self.assertEqual(result.ids, [1, 2])
+        self.assertEqual(self.intervals.flagged, {("draft", 2): [("draft", 1)]})
+
+    def test_from_repositories(self):
+        """Test that an index built from stored drafts and invoices checks against them and flags their overlaps"""
+        self.intervals.reject = False
+        invoice = self.invoice_service.submit_invoice(self.save_draft(0, 0))
+        draft = self.save_draft(0, 1, hour=8)
+        later = self.save_draft(1, 1, hour=10)
+
+        intervals = BillingIntervals.from_repositories(self.draft_repo, self.invoice_repo)
+        self.assertEqual(intervals.flagged, {("draft", draft): [("invoice", invoice)]})
+        self.assertEqual([key for key, _, _ in intervals.billed_between(1, datetime(2025, 3, 10), datetime(2025, 3, 11))],
+                         [("draft", later)])
+        with self.assertRaises(ValueError):
+            intervals.check(1, datetime(2025, 3, 10, 10, 30), datetime(2025, 3, 10, 12))
+
+    def test_evicted_drafts_are_removed(self):
+        """Test that the IDs returned by evict_expired free the time of the evicted drafts"""
+        drafts = ExpiringDraftInvoiceRepository(timedelta(hours=1))
+        draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, drafts, self.intervals)
+        draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 10, 8), datetime(2025, 3, 10, 9), "signature")
+        for draft_id in drafts.evict_expired(datetime.now() + timedelta(hours=2)):
+            self.intervals.remove(("draft", draft_id))
+        draft_service.save_draft_invoice(0, 1, datetime(2025, 3, 10, 8), datetime(2025, 3, 10, 9), "signature")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+try:
+    import numpy  # pylint: disable=unused-import
+except ImportError:
+    numpy = None
+
+from columnar import ColumnarInvoiceRepository
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice, InvoiceRepository
+from sqlite_repository import ConnectionPool, SqliteContractorRepository, SqliteInvoiceRepository, SqliteTaskRepository
+from task import Task, TaskRepository
+
+@unittest.skipIf(numpy is None, "reporting requires numpy")
+class TestBillingReport(unittest.TestCase):
+    def setUp(self):
+        """Set up contractors and tasks in two locations and two language pairs"""
+        self.contractor_repo = ContractorRepository()
+        self.contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Bob")])
+        self.task_repo = TaskRepository()
+        self.task_repo.add_many([
+            Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)),
+            Task(None, "office", "english", "spanish", datetime(2025, 3, 2, 9, 0)),
+            Task(None, "Remote", "French", "English", datetime(2025, 4, 10, 9, 0)),
+        ])
+
+    def fill(self, repository):
+        """Alice bills 1h and 2h in March at the office, Bob bills 30min in April remotely"""
+        alice, bob = self.contractor_repo.contractors[0], self.contractor_repo.contractors[1]
+        tasks = self.task_repo.tasks
+        repository.save(Invoice(alice, tasks[0], datetime(2025, 3, 1, 9, 0), datetime(2025, 3, 1, 10, 0), "sig"))
+        repository.save(Invoice(alice, tasks[1], datetime(2025, 3, 2, 9, 0), datetime(2025, 3, 2, 11, 0), "sig"))
+        repository.save(Invoice(bob, tasks[2], datetime(2025, 4, 10, 9, 0), datetime(2025, 4, 10, 9, 30), "sig"))
+
+    def check(self, report):
+        self.assertEqual(report.hours_by_contractor(), {0: 3.0, 1: 0.5})
+        self.assertEqual(report.hours_by_location(), {"Office": 3.0, "Remote": 0.5})
+        self.assertEqual(report.hours_by_language_pair(), {("English", "Spanish"): 3.0, ("French", "English"): 0.5})
+        self.assertEqual(report.hours_by_month(), {"2025-03": 3.0, "2025-04": 0.5})
+        self.assertEqual(report.hours_by("contractor", "month"), {(0, "2025-03"): 3.0, (1, "2025-04"): 0.5})
+        self.assertEqual(report.total_hours(), 3.5)
+
+    def test_in_memory_repository(self):
+        """Test grouped hours over an in memory invoice repository"""
+        from reporting import BillingReport  # pylint: disable=import-outside-toplevel
+        repository = InvoiceRepository()
+        self.fill(repository)
+        self.check(BillingReport(repository))
+
+    def test_columnar_repository(self):
+        """Test grouped hours over a columnar invoice repository"""
+        from reporting import BillingReport  # pylint: disable=import-outside-toplevel
+        repository = ColumnarInvoiceRepository(self.task_repo, self.contractor_repo)
+        self.fill(repository)
+        self.check(BillingReport(repository))
+
+    def test_incremental_updates(self):
+        """Test that invoices saved after a query are included in the next one"""
+        from reporting import BillingReport  # pylint: disable=import-outside-toplevel
+        repository = InvoiceRepository()
+        report = BillingReport(repository)
+        self.assertEqual(report.hours_by_contractor(), {})
+        self.fill(repository)
+        self.assertEqual(len(report), 3)
+        self.check(report)
+        with self.assertRaises(ValueError):
+            report.hours_by("weekday")
+
+    def test_sqlite_repository(self):
+        """Test grouped hours over an SQLite invoice repository, including invoices saved after a query"""
+        from reporting import BillingReport  # pylint: disable=import-outside-toplevel
+        with tempfile.TemporaryDirectory() as directory:
+            pool = ConnectionPool(str(Path(directory) / "invoices.db"))
+            try:
+                task_repo = SqliteTaskRepository(pool)
+                contractor_repo = SqliteContractorRepository(pool)
+                task_repo.add_many(self.task_repo.tasks.values())
+                contractor_repo.add_many(self.contractor_repo.contractors.values())
+                repository = SqliteInvoiceRepository(pool, task_repo, contractor_repo)
+                report = BillingReport(repository)
+                self.assertEqual(len(report), 0)
+                self.fill(repository)
+                self.check(report)
+                repository.save(Invoice(self.contractor_repo.contractors[1], self.task_repo.tasks[0],
+                                        datetime(2025, 3, 3, 9, 0), datetime(2025, 3, 3, 10, 0), "sig"))
+                self.assertEqual(len(report), 4)
+                self.assertEqual(report.hours_by_contractor(), {0: 3.0, 1: 1.5})
+            finally:
+                pool.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoiceRepository, InvoiceRepository
+from service import DraftInvoiceService, InvoiceManagementService
+from task import Task, TaskRepository
+
+class ServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up repositories with two contractors and two tasks, and the services on top of them"""
+        self.contractor_repo = ContractorRepository()
+        self.contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Bob")])
+        self.task_repo = TaskRepository()
+        self.task_repo.add(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)))
+        self.task_repo.add(Task(None, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0)))
+        self.draft_repo = DraftInvoiceRepository()
+        self.invoice_repo = InvoiceRepository()
+        self.draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo)
+        self.invoice_service = InvoiceManagementService(self.task_repo, self.contractor_repo, self.draft_repo, self.invoice_repo)
+
+    def save_draft(self, contractor_id: int, task_id: int, hour: int = 8) -> int:
+        draft_id = self.draft_service.save_draft_invoice(
+            contractor_id, task_id, datetime(2025, 3, 10, hour, 0), datetime(2025, 3, 10, hour + 1, 0), "signature")
+        assert draft_id is not None
+        return draft_id
+
+class TestInvoiceManagementService(ServiceTestCase):
+    def test_submit_invoice(self):
+        """Test that submitting moves the draft to the invoice repository"""
+        draft_id = self.save_draft(0, 0)
+        invoice_id = self.invoice_service.submit_invoice(draft_id)
+        self.assertEqual(self.invoice_repo.invoices[invoice_id].task.id, 0)
+        self.assertIsNone(self.draft_repo.get(draft_id))
+
+    def test_submit_invoice_duplicate_task(self):
+        """Test that a second invoice for the same task is rejected"""
+        self.invoice_service.submit_invoice(self.save_draft(0, 0))
+        with self.assertRaises(ValueError):
+            self.invoice_service.submit_invoice(self.save_draft(1, 0))
+
+    def test_submit_invoices_partial(self):
+        """Test that a partial batch submits the valid drafts and reports the others"""
+        first, second = self.save_draft(0, 0), self.save_draft(1, 0, hour=10)
+        result = self.invoice_service.submit_invoices([first, 99, second])
+        self.assertEqual(result.ids, [0, None, None])
+        self.assertEqual(sorted(result.errors), [1, 2])
+        self.assertIsNotNone(self.draft_repo.get(second))
+
+    def test_submit_invoices_atomic(self):
+        """Test that an atomic batch with an invalid draft submits nothing"""
+        first = self.save_draft(0, 0)
+        result = self.invoice_service.submit_invoices([first, 99], atomic=True)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.ids, [None, None])
+        self.assertEqual(len(self.invoice_repo.invoices), 0)
+        self.assertIsNotNone(self.draft_repo.get(first))
+
+class TestDraftInvoiceService(ServiceTestCase):
+    def test_update_reassigns_contractor(self):
+        """Test that updating the contractor moves the draft between contractor lists"""
+        draft_id = self.save_draft(0, 0)
+        self.draft_service.update(draft_id, 1, None, None, None, None)
+        self.assertEqual(self.draft_service.list(0), [])
+        self.assertEqual([d.id for d in self.draft_service.list(1)], [draft_id])
+
+    def test_list_page(self):
+        """Test that drafts are listed page by page and that an unknown contractor is rejected"""
+        draft_ids = [self.save_draft(0, 0, hour) for hour in range(5)]
+        page = self.draft_service.list_page(0, 3)
+        self.assertEqual([d.id for d in page.items], draft_ids[:3])
+        page = self.draft_service.list_page(0, 3, page.next_token)
+        self.assertEqual(([d.id for d in page.items], page.next_token), (draft_ids[3:], None))
+        with self.assertRaises(ValueError):
+            self.draft_service.list_page(5, 3)
+
+    def test_save_draft_invoices(self):
+        """Test that a batch reports errors per item and saves the valid drafts"""
+        result = self.draft_service.save_draft_invoices([
+            (0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+            (5, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+            (0, 1, datetime(2025, 3, 10, 9, 0), datetime(2025, 3, 10, 8, 0), "signature"),
+            (1, 1, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+        ])
+        self.assertEqual(result.ids, [0, None, None, 1])
+        self.assertEqual(str(result.errors[1]), "Contractor does not exist")
+        self.assertEqual(str(result.errors[2]), "Start time must be before end time")
+
+    def test_save_draft_invoices_atomic(self):
+        """Test that an atomic batch with an invalid draft saves nothing"""
+        result = self.draft_service.save_draft_invoices([
+            (0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+            (0, 9, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "signature"),
+        ], atomic=True)
+        self.assertEqual(list(result.errors), [1])
+        self.assertEqual(len(self.draft_repo.draft_invoices), 0)
+
+if __name__ == '__main__':
+    unittest.main()
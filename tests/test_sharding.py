@@ -0,0 +1,67 @@
+import unittest
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor
+from invoice import DraftInvoice, Invoice
+from service import InvoiceManagementService
+from sharding import hours_by
+from sqlite_repository import (ConnectionPool, SqliteContractorRepository, SqliteDraftInvoiceRepository,
+                               SqliteInvoiceRepository, SqliteTaskRepository)
+from task import Task
+
+class TestSharding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        """Set up a temporary database file"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = str(Path(self.directory.name) / "invoices.db")
+        self.pool = ConnectionPool(self.database)
+
+    def tearDown(self):
+        self.pool.close()
+        self.directory.cleanup()
+
+    def build(self):
+        """Stores invoices of four contractors on six tasks in the database, submitted through the service"""
+        contractor_repo = SqliteContractorRepository(self.pool)
+        contractor_repo.add_many([Contractor(None, name) for name in ("Alice", "Bob", "Carol", "Dave")])
+        task_repo = SqliteTaskRepository(self.pool)
+        task_repo.add_many([Task(None, location, "English", "Spanish", datetime(2025, 3, 1 + i))
+                            for i, location in enumerate(("Remote", "Office", "Remote", "Office", "Remote", "office"))])
+        draft_repo = SqliteDraftInvoiceRepository(self.pool, task_repo, contractor_repo)
+        invoice_repo = SqliteInvoiceRepository(self.pool, task_repo, contractor_repo)
+        for contractor_id, task_id, day in ((0, 0, 1), (1, 0, 2), (2, 1, 3), (3, 2, 4), (1, 3, 5), (2, 3, 31), (0, 4, 6)):
+            start = datetime(2025, 3, day, 9)
+            draft_repo.save(DraftInvoice(contractor_repo.find_by_id(contractor_id), task_repo.get(task_id),
+                                         start, start + timedelta(hours=contractor_id + 1), "signature"))
+        invoice_repo.save(Invoice(contractor_repo.find_by_id(3), task_repo.get(5),
+                                  datetime(2025, 2, 28, 9), datetime(2025, 2, 28, 10), "signature"))
+        InvoiceManagementService(task_repo, contractor_repo, draft_repo, invoice_repo).submit_invoices(range(7))
+
+    def test_hours_by(self):
+        """Test that sharded sums match per contractor and per month totals, grouping labels as first seen"""
+        self.build()
+        self.assertEqual(hours_by(self.database, "contractor", executor=self.executor),
+                         {(0,): 2.0, (1,): 2.0, (2,): 3.0, (3,): 5.0})
+        self.assertEqual(hours_by(self.database, "location", "month", workers=2, executor=self.executor),
+                         {("Remote", "2025-03"): 6.0, ("office", "2025-03"): 5.0, ("office", "2025-02"): 1.0})
+        with self.assertRaises(ValueError):
+            hours_by(self.database, "week")
+
+if __name__ == '__main__':
+    unittest.main()
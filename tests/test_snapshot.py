@@ -0,0 +1,83 @@
+import unittest
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+import snapshot
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoice, DraftInvoiceRepository, Invoice, InvoiceRepository
+from service import InvoiceManagementService
+from snapshot import Snapshot
+from task import Task, TaskRepository
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Set up repositories with two contractors, five tasks, two invoices and two drafts, and write a snapshot"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.directory.name) / "repositories.snapshot")
+        contractor_repo = ContractorRepository()
+        contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Börje")])
+        task_repo = TaskRepository()
+        task_repo.add_many(Task(None, "Office", "English", "Spanish", datetime(2025, 3, i + 1, 9, 0)) for i in range(5))
+        draft_repo = DraftInvoiceRepository()
+        invoice_repo = InvoiceRepository()
+        for task_id in range(4):
+            draft_repo.save(DraftInvoice(contractor_repo.find_by_id(task_id % 2), task_repo.get(task_id),
+                                         datetime(2025, 3, 10, 8, 0, 0, 250), datetime(2025, 3, 10, 9, 0), "sígnature"))
+        draft_repo.get(3).last_saved = datetime(2025, 3, 11)
+        service = InvoiceManagementService(task_repo, contractor_repo, draft_repo, invoice_repo)
+        service.submit_invoices([0, 1])
+        snapshot.write(self.path, task_repo, contractor_repo, draft_repo, invoice_repo)
+        self.snapshot = Snapshot(self.path)
+
+    def tearDown(self):
+        self.snapshot.close()
+        self.directory.cleanup()
+
+    def test_loads_lazily_and_shares_references(self):
+        """Test that only looked up records are decoded and that invoices share their task object"""
+        tasks = self.snapshot.task_repository.tasks
+        invoice = self.snapshot.invoice_repository.get_by_task(self.snapshot.task_repository.get(1))
+        self.assertEqual(len(tasks._objects), 1)  # pylint: disable=protected-access
+        self.assertIs(invoice.task, self.snapshot.task_repository.get(1))
+        self.assertEqual((invoice.id, invoice.contractor.name, invoice.signature, invoice.start_time),
+                         (1, "Börje", "sígnature", datetime(2025, 3, 10, 8, 0, 0, 250)))
+        self.assertIsNone(self.snapshot.invoice_repository.get_by_task(self.snapshot.task_repository.get(2)))
+        self.assertEqual(self.snapshot.draft_repository.get(3).last_saved, datetime(2025, 3, 11))
+
+    def test_secondary_queries(self):
+        """Test that queries by attributes, name and contractor see every record"""
+        self.assertEqual(len(self.snapshot.task_repository.find_by_attributes("office", "english", "spanish")), 5)
+        self.assertEqual(self.snapshot.contractor_repository.find_by_name("BÖRJE").id, 1)
+        contractor = self.snapshot.contractor_repository.find_by_id(1)
+        self.assertEqual([d.id for d in self.snapshot.draft_repository.list_by_contractor(contractor)], [3])
+
+    def test_changes_after_loading(self):
+        """Test that replaced and deleted records are not loaded again and that new IDs continue the sequences"""
+        self.snapshot.task_repository.add(Task(4, "Remote", "French", "English", datetime(2025, 4, 1)))
+        self.assertEqual(self.snapshot.task_repository.find_by_attributes("Office", "English", "Spanish")[-1].id, 3)
+        self.snapshot.draft_repository.delete(2)
+        self.assertIsNone(self.snapshot.draft_repository.get(2))
+        self.assertEqual(len(self.snapshot.draft_repository.draft_invoices), 1)
+
+        contractor = self.snapshot.contractor_repository.find_by_id(0)
+        task = self.snapshot.task_repository.get(4)
+        invoice = self.snapshot.invoice_repository.save(
+            Invoice(contractor, task, datetime(2025, 4, 1, 9), datetime(2025, 4, 1, 10), "signature"))
+        self.assertEqual(invoice.id, 2)
+        self.assertEqual(self.snapshot.contractor_repository.ids.peek(), 2)
+
+        snapshot.write(self.path, self.snapshot.task_repository, self.snapshot.contractor_repository,
+                       self.snapshot.draft_repository, self.snapshot.invoice_repository)
+        reloaded = Snapshot(self.path)
+        self.assertEqual(reloaded.invoice_repository.get_by_task(reloaded.task_repository.get(4)).id, 2)
+        self.assertEqual(sorted(reloaded.draft_repository.draft_invoices), [3])
+        reloaded.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor
+from service import DraftInvoiceService, InvoiceManagementService
+from sqlite_repository import (ConnectionPool, SqliteContractorRepository, SqliteDraftInvoiceRepository,
+                               SqliteInvoiceRepository, SqliteTaskRepository)
+from task import Task, TaskRepository
+
+class TestSqliteRepositories(unittest.TestCase):
+    def setUp(self):
+        """Set up the SQLite repositories on a temporary database file"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(str(Path(self.directory.name) / "invoices.db"))
+        self.task_repo = SqliteTaskRepository(self.pool)
+        self.contractor_repo = SqliteContractorRepository(self.pool)
+        self.draft_repo = SqliteDraftInvoiceRepository(self.pool, self.task_repo, self.contractor_repo)
+        self.invoice_repo = SqliteInvoiceRepository(self.pool, self.task_repo, self.contractor_repo)
+
+        self.contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Bob")])
+        self.task_repo.add_many([
+            Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)),
+            Task(None, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0)),
+            Task(None, "office", "english", "spanish", datetime(2025, 2, 5, 9, 0)),
+        ])
+
+    def tearDown(self):
+        self.pool.close()
+        self.directory.cleanup()
+
+    def test_contractors(self):
+        """Test contractor lookups and the duplicate name check"""
+        contractor = self.contractor_repo.find_by_name("ALICE")
+        self.assertIsNotNone(contractor)
+        if contractor is not None:
+            self.assertEqual(contractor.id, 0)
+        with self.assertRaises(ValueError):
+            self.contractor_repo.add(Contractor(None, "bob"))
+        self.assertIsNone(self.contractor_repo.find_by_id(2))
+
+    def test_task_queries(self):
+        """Test task lookups by attributes and by location and time range"""
+        found = self.task_repo.find_by_attributes("OFFICE", "English", "Spanish")
+        self.assertEqual([t.id for t in found], [0, 2])
+        found = self.task_repo.find_by_location_time_range("office", datetime(2025, 2, 1), datetime(2025, 3, 1, 9, 0))
+        self.assertEqual([t.id for t in found], [2, 0])
+
+    def test_pages(self):
+        """Test that a listing started in memory continues in SQLite with the same token"""
+        memory = TaskRepository()
+        memory.add_many(self.task_repo.get(id) for id in range(3))
+        first = memory.find_by_location_time_range_page("office", datetime(2025, 1, 1), datetime(2025, 12, 31), 1)
+        second = self.task_repo.find_by_location_time_range_page(
+            "office", datetime(2025, 1, 1), datetime(2025, 12, 31), 1, first.next_token)
+        self.assertEqual([t.id for t in first.items + second.items], [2, 0])
+        self.assertIsNone(second.next_token)
+        page = self.task_repo.find_by_attributes_page("Office", "English", "Spanish", 1)
+        self.assertEqual([t.id for t in page.items], [0])
+        page = self.task_repo.find_by_attributes_page("Office", "English", "Spanish", 1, page.next_token)
+        self.assertEqual([t.id for t in page.items], [2])
+
+        draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo)
+        for _ in range(3):
+            draft_service.save_draft_invoice(1, 1, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+        page = draft_service.list_page(1, 2)
+        page = draft_service.list_page(1, 2, page.next_token)
+        self.assertEqual(([d.id for d in page.items], page.next_token), ([2], None))
+
+    def test_draft_and_submit_workflow(self):
+        """Test the draft to invoice workflow through the services"""
+        draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo)
+        invoice_service = InvoiceManagementService(self.task_repo, self.contractor_repo, self.draft_repo, self.invoice_repo)
+
+        draft_id = draft_service.save_draft_invoice(0, 1, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+        draft_service.update(draft_id, 1, None, None, None, "new-signature")
+        self.assertEqual(draft_service.list(0), [])
+        self.assertEqual([d.signature for d in draft_service.list(1)], ["new-signature"])
+
+        invoice_id = invoice_service.submit_invoice(draft_id)
+        task = self.task_repo.get(1)
+        assert task is not None
+        invoice = self.invoice_repo.get_by_task(task)
+        assert invoice is not None
+        self.assertEqual((invoice.id, invoice.contractor.name), (invoice_id, "Bob"))
+        self.assertIsNone(self.draft_repo.get(draft_id))
+        with self.assertRaises(ValueError):
+            self.draft_repo.delete(draft_id)
+
+    def test_iter_after(self):
+        """Test reading drafts in chunks after a given ID"""
+        draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo)
+        for _ in range(5):
+            draft_service.save_draft_invoice(0, 1, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+        self.assertEqual([d.id for d in self.draft_repo.iter_after(1, chunk_size=2)], [2, 3, 4])
+        self.assertEqual(list(self.invoice_repo.iter_after()), [])
+
+    def test_listing_reads_references_in_the_same_query(self):
+        """Test that listing drafts and invoices does not query each task and contractor separately"""
+        draft_service = DraftInvoiceService(self.task_repo, self.contractor_repo, self.draft_repo)
+        invoice_service = InvoiceManagementService(self.task_repo, self.contractor_repo, self.draft_repo, self.invoice_repo)
+        for task_id in range(3):
+            draft_service.save_draft_invoice(1, task_id, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+        invoice_service.submit_invoice(draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 1, 8, 0),
+                                                                        datetime(2025, 3, 1, 9, 0), "sig"))
+
+        statements = []
+        for _ in range(4):
+            with self.pool.connection() as connection:
+                connection.set_trace_callback(statements.append)
+        drafts = self.draft_repo.list_by_contractor(Contractor(1, "Bob"))
+        chunked = list(self.draft_repo.iter_after(chunk_size=2))
+        invoices = list(self.invoice_repo.iter_after())
+        selects = [statement for statement in statements if statement.startswith("SELECT")]
+        self.assertEqual(len(selects), 4)
+        self.assertEqual([(d.contractor.name, d.task.location) for d in drafts],
+                         [("Bob", "Office"), ("Bob", "Remote"), ("Bob", "office")])
+        self.assertEqual([d.id for d in chunked], [0, 1, 2])
+        self.assertEqual([(i.contractor.name, i.task.start_time) for i in invoices], [("Alice", datetime(2025, 3, 1, 9, 0))])
+
+    def test_missing_reference(self):
+        """Test that a draft referencing a missing task cannot be read back"""
+        with self.pool.connection() as connection:
+            connection.execute("INSERT INTO draft_invoices VALUES (7, 0, 9, '2025-03-01T08:00:00', "
+                               "'2025-03-01T09:00:00', 'sig', '2025-03-01T09:00:00')")
+        with self.assertRaises(ValueError):
+            self.draft_repo.get(7)
+
+    def test_memory_database_rejected(self):
+        """Test that a pool cannot be opened on ':memory:', each connection would see another database"""
+        with self.assertRaises(ValueError):
+            ConnectionPool(":memory:")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from task import Task, TaskRepository
+
+class TestTaskRepository(unittest.TestCase):
+    def setUp(self):
+        """Set up a repository with a few tasks"""
+        self.repository = TaskRepository()
+        self.tasks = [
+            Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)),
+            Task(None, "Remote", "French", "English", datetime(2025, 3, 10, 9, 0)),
+            Task(None, "office", "english", "spanish", datetime(2025, 3, 5, 9, 0)),
+        ]
+        for task in self.tasks:
+            self.repository.add(task)
+
+    def test_find_by_attributes_case_insensitive(self):
+        """Test that attribute lookup ignores case"""
+        found = self.repository.find_by_attributes("OFFICE", "English", "SPANISH")
+        self.assertEqual([t.id for t in found], [0, 2])
+
+    def test_find_by_attributes_no_match(self):
+        """Test that an unknown attribute combination returns an empty list"""
+        self.assertEqual(self.repository.find_by_attributes("Office", "French", "English"), [])
+
+    def test_find_by_attributes_after_replace(self):
+        """Test that re-adding a task under the same ID moves it in the index"""
+        self.repository.add(Task(0, "Remote", "French", "English", datetime(2025, 3, 2, 9, 0)))
+        office = self.repository.find_by_attributes("Office", "English", "Spanish")
+        remote = self.repository.find_by_attributes("Remote", "French", "English")
+        self.assertEqual([t.id for t in office], [2])
+        self.assertEqual(sorted(t.id for t in remote), [0, 1])
+
+    def test_find_by_location_time_range_inclusive_and_ordered(self):
+        """Test that range lookup includes both bounds and returns tasks by start time"""
+        found = self.repository.find_by_location_time_range("OFFICE", datetime(2025, 3, 1, 9, 0), datetime(2025, 3, 5, 9, 0))
+        self.assertEqual([t.id for t in found], [0, 2])
+
+    def test_find_by_location_time_range_outside(self):
+        """Test that tasks outside the range or at another location are excluded"""
+        found = self.repository.find_by_location_time_range("Office", datetime(2025, 3, 2), datetime(2025, 3, 4))
+        self.assertEqual(found, [])
+        found = self.repository.find_by_location_time_range("Court", datetime(2025, 1, 1), datetime(2026, 1, 1))
+        self.assertEqual(found, [])
+
+    def test_iter_by_location_time_range_after_replace(self):
+        """Test that re-adding a task under the same ID updates the time index"""
+        self.repository.add(Task(2, "Office", "English", "Spanish", datetime(2025, 2, 1, 9, 0)))
+        found = self.repository.iter_by_location_time_range("office", datetime(2025, 1, 1), datetime(2025, 12, 31))
+        self.assertEqual([t.id for t in found], [2, 0])
+
+    def test_re_add_mutated_task(self):
+        """Test that a stored task changed in place and re-added is moved out of its old index entries"""
+        task = self.repository.get(0)
+        task.location = "Remote"
+        task.source_language = "French"
+        task.target_language = "English"
+        task.start_time = datetime(2025, 3, 20, 9, 0)
+        self.repository.add(task)
+        office = self.repository.find_by_attributes("Office", "English", "Spanish")
+        remote = self.repository.find_by_attributes("Remote", "French", "English")
+        self.assertEqual([t.id for t in office], [2])
+        self.assertEqual(sorted(t.id for t in remote), [0, 1])
+        found = self.repository.find_by_location_time_range("office", datetime(2025, 1, 1), datetime(2025, 12, 31))
+        self.assertEqual([t.id for t in found], [2])
+        found = self.repository.find_by_location_time_range("remote", datetime(2025, 1, 1), datetime(2025, 12, 31))
+        self.assertEqual([t.id for t in found], [1, 0])
+
+    def test_find_by_attributes_page(self):
+        """Test that pages follow each other by ID and that a task added meanwhile does not shift them"""
+        first = self.repository.find_by_attributes_page("office", "english", "spanish", 1)
+        self.repository.add(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 2, 9, 0)))
+        second = self.repository.find_by_attributes_page("office", "english", "spanish", 1, first.next_token)
+        third = self.repository.find_by_attributes_page("office", "english", "spanish", 5, second.next_token)
+        self.assertEqual([[t.id for t in p.items] for p in (first, second, third)], [[0], [2], [3]])
+        self.assertIsNone(third.next_token)
+        with self.assertRaises(ValueError):
+            self.repository.find_by_attributes_page("office", "english", "spanish", 1, "not a token")
+
+    def test_find_by_location_time_range_page(self):
+        """Test that range pages follow each other by start time"""
+        self.repository.add(Task(None, "Office", "German", "English", datetime(2025, 3, 5, 9, 0)))
+        tasks, token = [], None
+        while True:
+            page = self.repository.find_by_location_time_range_page(
+                "office", datetime(2025, 1, 1), datetime(2025, 12, 31), 2, token)
+            tasks.append([t.id for t in page.items])
+            token = page.next_token
+            if token is None:
+                break
+        self.assertEqual(tasks, [[0, 2], [3]])
+
+if __name__ == '__main__':
+    unittest.main()
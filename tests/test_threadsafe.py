@@ -0,0 +1,210 @@
+import threading
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoice, DraftInvoiceRepository, Invoice
+from sequence import IdSequence
+from service import InvoiceManagementService
+from task import Task, TaskRepository
+from threadsafe import (StripedLock, ThreadSafeContractorRepository, ThreadSafeDraftInvoiceRepository,
+                        ThreadSafeInvoiceRepository, ThreadSafeTaskRepository)
+
+def run_threads(target, count: int = 8):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+class TestIdAllocation(unittest.TestCase):
+    def test_sequence_skips_observed_ids(self):
+        """Test that the sequence never hands out an ID observed before"""
+        ids = IdSequence()
+        ids.observe(4)
+        self.assertEqual(ids.next(), 5)
+        ids.observe(2)
+        self.assertEqual(ids.next(), 6)
+
+    def test_draft_ids_not_reused_after_delete(self):
+        """Test that a draft saved after a delete does not overwrite a live draft"""
+        repository = DraftInvoiceRepository()
+        contractor = Contractor(0, "Alice")
+        task = Task(0, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0))
+        drafts = [DraftInvoice(contractor, task, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig") for _ in range(3)]
+        repository.save_many(drafts[:2])
+        repository.delete(0)
+        repository.save(drafts[2])
+        self.assertEqual(drafts[2].id, 2)
+        self.assertIs(repository.get(1), drafts[1])
+
+    def test_explicit_and_assigned_ids_do_not_collide(self):
+        """Test that auto assigned IDs skip IDs chosen explicitly"""
+        tasks = TaskRepository()
+        tasks.add(Task(1, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)))
+        task = Task(None, "Remote", "French", "English", datetime(2025, 3, 1, 9, 0))
+        tasks.add(task)
+        self.assertEqual(task.id, 2)
+
+        contractors = ContractorRepository()
+        contractors.add(Contractor(0, "Alice"))
+        contractor = Contractor(None, "Bob")
+        contractors.add(contractor)
+        self.assertEqual(contractor.id, 1)
+
+class TestThreadSafeRepositories(unittest.TestCase):
+    def test_striped_lock_multiple_keys(self):
+        """Test that keys on the same or different stripes can be held together"""
+        locks = StripedLock(2)
+        with locks.holding(lambda: [0, 1, 2, 3]):
+            pass
+        with locks.holding(lambda: [0, 1]):
+            pass
+
+    def test_concurrent_task_adds(self):
+        """Test that concurrent adds get unique IDs and all land in the indexes"""
+        repository = ThreadSafeTaskRepository(stripes=4)
+
+        def add(worker: int):
+            for i in range(500):
+                repository.add(Task(None, f"Location {i % 3}", "English", "Spanish", datetime(2025, 1, 1 + worker, 0, i % 60)))
+
+        run_threads(add)
+        self.assertEqual(len(repository.tasks), 4000)
+        found = sum(len(repository.find_by_attributes(f"location {i}", "english", "spanish")) for i in range(3))
+        self.assertEqual(found, 4000)
+
+    def test_concurrent_contractor_duplicates(self):
+        """Test that only one of many concurrent adds of the same name succeeds"""
+        repository = ThreadSafeContractorRepository()
+        errors = []
+
+        def add(_):
+            try:
+                repository.add(Contractor(None, "Alice"))
+            except ValueError as e:
+                errors.append(e)
+
+        run_threads(add)
+        self.assertEqual(len(repository.contractors), 1)
+        self.assertEqual(len(errors), 7)
+
+    def test_concurrent_drafts_and_invoices(self):
+        """Test concurrent draft saves and invoice submissions for shared tasks"""
+        drafts = ThreadSafeDraftInvoiceRepository()
+        invoices = ThreadSafeInvoiceRepository()
+        contractor = Contractor(0, "Alice")
+        tasks = [Task(i, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)) for i in range(10)]
+        errors = []
+
+        def work(_):
+            for task in tasks:
+                draft = DraftInvoice(contractor, task, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+                drafts.save(draft)
+                try:
+                    invoices.save_if_absent(Invoice(contractor, task, draft.start_time, draft.end_time, "sig"))
+                except ValueError as e:
+                    errors.append(e)
+
+        run_threads(work)
+        self.assertEqual(len(drafts.list_by_contractor(contractor)), 80)
+        self.assertEqual(len(invoices.invoices), 10)
+        self.assertEqual(len(errors), 70)
+
+    def test_concurrent_submissions(self):
+        """Test that threads submitting drafts for the same tasks through the service bill each task once"""
+        contractors = ThreadSafeContractorRepository()
+        contractors.add(Contractor(0, "Alice"))
+        tasks = ThreadSafeTaskRepository()
+        tasks.add_many(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1 + i, 9, 0)) for i in range(10))
+        drafts = ThreadSafeDraftInvoiceRepository()
+        invoices = ThreadSafeInvoiceRepository()
+        service = InvoiceManagementService(tasks, contractors, drafts, invoices)
+        errors = []
+        ids = []
+
+        def work(worker: int):
+            batch = []
+            for task_id in range(10):
+                draft = DraftInvoice(contractors.find_by_id(0), tasks.get(task_id),
+                                     datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+                drafts.save(draft)
+                batch.append(draft.id)
+            if worker % 2:
+                result = service.submit_invoices(batch)
+                ids.extend(id for id in result.ids if id is not None)
+                errors.extend(result.errors.values())
+                return
+            for draft_id in batch:
+                try:
+                    ids.append(service.submit_invoice(draft_id))
+                except ValueError as e:
+                    errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            run_threads(work)
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(sorted(ids), list(range(10)))
+        self.assertEqual(sorted(invoice.task.id for invoice in invoices.invoices.values()), list(range(10)))
+        self.assertEqual(len(errors), 70)
+        self.assertEqual(len(drafts.list_by_contractor(Contractor(0, "Alice"))), 70)
+
+    def test_save_all_if_absent(self):
+        """Test that a batch with a task that already has an invoice saves nothing"""
+        invoices = ThreadSafeInvoiceRepository()
+        contractor = Contractor(0, "Alice")
+        tasks = [Task(i, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)) for i in range(3)]
+
+        def invoice(task):
+            return Invoice(contractor, task, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+
+        invoices.save(invoice(tasks[2]))
+        with self.assertRaises(ValueError):
+            invoices.save_all_if_absent([invoice(task) for task in tasks])
+        self.assertEqual(len(invoices.invoices), 1)
+        self.assertEqual([i.id for i in invoices.save_all_if_absent([invoice(task) for task in tasks[:2]])], [1, 2])
+
+    def test_concurrent_atomic_batches(self):
+        """Test that atomic batches competing for the same tasks are submitted entirely or not at all"""
+        contractors = ThreadSafeContractorRepository()
+        contractors.add(Contractor(0, "Alice"))
+        tasks = ThreadSafeTaskRepository()
+        tasks.add_many(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1 + i, 9, 0)) for i in range(10))
+        drafts = ThreadSafeDraftInvoiceRepository()
+        invoices = ThreadSafeInvoiceRepository()
+        service = InvoiceManagementService(tasks, contractors, drafts, invoices)
+        results = []
+
+        def work(worker: int):
+            batch = []
+            for task_id in range(worker, worker + 3):
+                draft = DraftInvoice(contractors.find_by_id(0), tasks.get(task_id),
+                                     datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "sig")
+                drafts.save(draft)
+                batch.append(draft.id)
+            results.append(service.submit_invoices(batch, atomic=True))
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            run_threads(work)
+        finally:
+            sys.setswitchinterval(interval)
+        submitted = [result for result in results if result.ok]
+        for result in results:
+            self.assertIn(sum(id is not None for id in result.ids), (0, 3))
+        self.assertTrue(submitted)
+        self.assertEqual(len(invoices.invoices), 3 * len(submitted))
+        self.assertEqual(len({invoice.task.id for invoice in invoices.invoices.values()}), 3 * len(submitted))
+
+if __name__ == '__main__':
+    unittest.main()
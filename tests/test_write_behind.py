@@ -0,0 +1,138 @@
+import unittest
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent
+sys.path.append(str(src_path))
+
+from contractor import Contractor, ContractorRepository
+from invoice import DraftInvoiceRepository, InvoiceRepository
+from service import DraftInvoiceService, InvoiceManagementService
+from task import Task, TaskRepository
+from write_behind import WriteBehindDraftInvoiceRepository
+
+class CountingDraftInvoiceRepository(DraftInvoiceRepository):
+    """
+    Backend that counts writes and keeps the signature each draft had when written
+    """
+    def __init__(self):
+        super().__init__()
+        self.saves = 0
+        self.written = {}
+
+    def save(self, draft_invoice):
+        super().save(draft_invoice)
+        self.saves += 1
+        self.written[draft_invoice.id] = draft_invoice.signature
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        """Set up services over a write-behind draft repository"""
+        contractor_repo = ContractorRepository()
+        contractor_repo.add_many([Contractor(None, "Alice"), Contractor(None, "Bob")])
+        task_repo = TaskRepository()
+        task_repo.add(Task(None, "Office", "English", "Spanish", datetime(2025, 3, 1, 9, 0)))
+        self.backend = CountingDraftInvoiceRepository()
+        self.drafts = WriteBehindDraftInvoiceRepository(self.backend, max_pending=10, max_delay=60)
+        self.invoice_repo = InvoiceRepository()
+        self.draft_service = DraftInvoiceService(task_repo, contractor_repo, self.drafts)
+        self.invoice_service = InvoiceManagementService(task_repo, contractor_repo, self.drafts, self.invoice_repo)
+        self.draft_id = self.draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "s")
+
+    def type_signature(self, text: str):
+        for i in range(1, len(text) + 1):
+            self.draft_service.update(self.draft_id, None, None, None, None, text[:i])
+
+    def test_updates_are_coalesced(self):
+        """Test that many updates of one draft become a single write on flush"""
+        self.type_signature("signature")
+        self.assertEqual(self.backend.saves, 1)
+        self.assertEqual(self.drafts.get(self.draft_id).signature, "signature")
+        self.drafts.flush()
+        self.assertEqual(self.backend.saves, 2)
+        self.assertEqual(self.backend.written[self.draft_id], "signature")
+
+    def test_submit_flushes_the_draft(self):
+        """Test that submitting writes the buffered draft first"""
+        self.type_signature("final")
+        self.invoice_service.submit_invoice(self.draft_id)
+        self.assertEqual(self.backend.written[self.draft_id], "final")
+        self.assertEqual(self.invoice_repo.invoices[0].signature, "final")
+        self.assertIsNone(self.drafts.get(self.draft_id))
+
+    def test_delete_discards_buffered_update(self):
+        """Test that deleting a draft drops its buffered update"""
+        self.type_signature("gone")
+        self.draft_service.delete(self.draft_id)
+        self.drafts.flush()
+        self.assertEqual(self.backend.saves, 1)
+        self.assertIsNone(self.drafts.get(self.draft_id))
+
+    def test_list_sees_buffered_reassignment(self):
+        """Test that listing reflects a buffered contractor change"""
+        self.draft_service.update(self.draft_id, 1, None, None, None, None)
+        self.assertEqual(self.draft_service.list(0), [])
+        self.assertEqual([d.id for d in self.draft_service.list(1)], [self.draft_id])
+
+    def test_page_writes_only_drafts_of_the_contractor(self):
+        """Test that paging a contractor's drafts writes the buffered drafts moved to or from it, and no others"""
+        moved_in = self.draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 11, 8, 0), datetime(2025, 3, 11, 9, 0), "s")
+        unrelated = self.draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 12, 8, 0), datetime(2025, 3, 12, 9, 0), "s")
+        self.draft_service.update(moved_in, 1, None, None, None, None)
+        self.draft_service.update(self.draft_id, None, None, None, None, "typed")
+        page = self.draft_service.list_page(1, 10)
+        self.assertEqual(([d.id for d in page.items], page.next_token), ([moved_in], None))
+        self.assertEqual(self.backend.written[self.draft_id], "s")
+        self.assertEqual([d.id for d in self.draft_service.list_page(0, 10).items], [self.draft_id, unrelated])
+        self.assertEqual(self.backend.written[self.draft_id], "typed")
+
+        self.draft_service.update(unrelated, 1, None, None, None, None)
+        self.draft_service.update(self.draft_id, None, None, None, None, "typed again")
+        self.assertEqual([d.id for d in self.draft_service.list_page(0, 1).items], [self.draft_id])
+        self.assertEqual(self.backend.written[self.draft_id], "typed again")
+        self.assertEqual([d.id for d in self.draft_service.list_page(0, 10).items], [self.draft_id])
+        self.assertEqual(self.drafts.get(unrelated).contractor.id, 1)
+
+    def test_page_skips_every_draft_moved_away(self):
+        """Test that a page is refilled until none of its drafts has been moved to another contractor"""
+        for day in range(11, 16):
+            self.draft_service.save_draft_invoice(0, 0, datetime(2025, 3, day, 8, 0), datetime(2025, 3, day, 9, 0), "s")
+        self.draft_service.update(0, 1, None, None, None, None)
+        self.draft_service.update(2, 1, None, None, None, None)
+        page = self.draft_service.list_page(0, 2)
+        self.assertEqual([(d.id, d.contractor.id) for d in page.items], [(1, 0), (3, 0)])
+
+    def test_size_threshold(self):
+        """Test that reaching max_pending drafts flushes them"""
+        ids = [self.draft_id] + [self.draft_service.save_draft_invoice(0, 0, datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 10, 9, 0), "s")
+                                 for _ in range(9)]
+        for draft_id in ids:
+            self.draft_service.update(draft_id, None, None, None, None, "x")
+        self.assertEqual(self.backend.saves, 20)
+        self.assertEqual(set(self.backend.written.values()), {"x"})
+
+    def test_flush_due_after_saves_stop(self):
+        """Test that the last buffered update is written once it is max_delay old, without another save"""
+        self.type_signature("last")
+        self.drafts.flush_due()
+        self.assertEqual(self.backend.saves, 1)
+        self.drafts.flush_due(time.monotonic() + 60)
+        self.assertEqual(self.backend.written[self.draft_id], "last")
+
+    def test_background_flusher(self):
+        """Test that with flush_interval set the buffer is written by a background thread"""
+        drafts = WriteBehindDraftInvoiceRepository(self.backend, max_delay=0.01, flush_interval=0.01)
+        draft = self.drafts.get(self.draft_id)
+        draft.signature = "background"
+        drafts.save(draft)
+        deadline = time.monotonic() + 5
+        while self.backend.written[self.draft_id] != "background" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.backend.written[self.draft_id], "background")
+        drafts.close()
+
+if __name__ == '__main__':
+    unittest.main()
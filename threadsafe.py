@@ -0,0 +1,185 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional
+from task import Task, TaskRepository
+from contractor import Contractor, ContractorRepository
+from invoice import Invoice, DraftInvoice, InvoiceRepository, DraftInvoiceRepository
+from paging import Page
+
+# Thread safe variants of the in memory repositories.
+# Instead of one lock per repository every operation locks only the stripes of the keys it touches
+# (a location, a contractor name, a contractor ID, ...), so threads working on different keys do not wait for each other.
+
+class StripedLock:
+    """
+    A fixed set of locks, a key is guarded by the lock its hash falls on.
+    Several keys are locked in stripe order so that two threads can never wait on each other.
+    """
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _stripes(self, keys: Iterable[Hashable]) -> List[int]:
+        return sorted({hash(key) % len(self._locks) for key in keys})
+
+    @contextmanager
+    def holding(self, keys: Callable[[], Iterable[Hashable]]) -> Iterator[None]:
+        """
+        Locks the stripes of the keys returned by the callable.
+        The keys can depend on the state being guarded (e.g. the record being replaced),
+        so they are computed again once locked and the locking is retried if they moved to other stripes.
+        """
+        while True:
+            stripes = self._stripes(keys())
+            for stripe in stripes:
+                self._locks[stripe].acquire()
+            if set(self._stripes(keys())) <= set(stripes):
+                break
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
+
+class ThreadSafeTaskRepository(TaskRepository):
+    """
+    Task repository guarded by one lock stripe per casefolded location, the key of both secondary indexes.
+    """
+    def __init__(self, stripes: int = 64):
+        super().__init__()
+        self._locks = StripedLock(stripes)
+
+    def add(self, task: Task):
+        def keys():
+            # the location the task was indexed under, the stored task may have been changed since
+            indexed = self._indexed.get(task.id) if task.id is not None else None
+            locations = {task.location.casefold()}
+            if indexed is not None:
+                locations.add(indexed[0][0])
+            return locations | {("id", task.id)}
+
+        with self._locks.holding(keys):
+            super().add(task)
+
+    def find_by_attributes(self, location: str, source_language: str, target_language: str) -> List[Task]:
+        with self._locks.holding(lambda: [location.casefold()]):
+            return super().find_by_attributes(location, source_language, target_language)
+
+    def find_by_attributes_page(self, location: str, source_language: str, target_language: str,
+                                limit: int, token: Optional[str] = None) -> Page[Task]:
+        with self._locks.holding(lambda: [location.casefold()]):
+            return super().find_by_attributes_page(location, source_language, target_language, limit, token)
+
+    def iter_by_location_time_range(self, location: str, start_time: datetime, end_time: datetime) -> Iterator[Task]:
+        # the matches are copied while locked, a lazy iterator could see concurrent inserts
+        with self._locks.holding(lambda: [location.casefold()]):
+            return iter(list(super().iter_by_location_time_range(location, start_time, end_time)))
+
+    def find_by_location_time_range_page(self, location: str, start_time: datetime, end_time: datetime,
+                                         limit: int, token: Optional[str] = None) -> Page[Task]:
+        with self._locks.holding(lambda: [location.casefold()]):
+            return super().find_by_location_time_range_page(location, start_time, end_time, limit, token)
+
+class ThreadSafeContractorRepository(ContractorRepository):
+    """
+    Contractor repository guarded by one lock stripe per casefolded name, so the duplicate check and the insert are atomic.
+    Adding a contractor with an explicit ID also locks that ID and the name it replaces.
+    """
+    def __init__(self, stripes: int = 64):
+        super().__init__()
+        self._locks = StripedLock(stripes)
+
+    def _keys(self, contractors: List[Contractor]):
+        def keys():
+            touched = set()
+            for contractor in contractors:
+                touched.add(contractor.name.casefold())
+                if contractor.id is not None:
+                    touched.add(("id", contractor.id))
+                    # the name the contractor is indexed under, it may have been renamed in place since
+                    previous_name = self._name_of.get(contractor.id)
+                    if previous_name is not None:
+                        touched.add(previous_name)
+            return touched
+        return keys
+
+    def add(self, contractor: Contractor):
+        with self._locks.holding(self._keys([contractor])):
+            super().add(contractor)
+
+    def add_many(self, contractors: Iterable[Contractor]):
+        contractors = list(contractors)
+        with self._locks.holding(self._keys(contractors)):
+            super().add_many(contractors)
+
+class ThreadSafeDraftInvoiceRepository(DraftInvoiceRepository):
+    """
+    Draft repository guarded by lock stripes per draft ID and per contractor ID.
+    """
+    def __init__(self, stripes: int = 64):
+        super().__init__()
+        self._locks = StripedLock(stripes)
+
+    def save(self, draft_invoice: DraftInvoice):
+        if draft_invoice.id is None:
+            # take the ID before locking so the draft stripe is known
+            draft_invoice.id = self.ids.next()
+
+        def keys():
+            return {("draft", draft_invoice.id),
+                    ("contractor", draft_invoice.contractor.id),
+                    ("contractor", self._contractor_of.get(draft_invoice.id))}
+
+        with self._locks.holding(keys):
+            super().save(draft_invoice)
+
+    def list_by_contractor(self, contractor: Contractor) -> List[DraftInvoice]:
+        with self._locks.holding(lambda: [("contractor", contractor.id)]):
+            return super().list_by_contractor(contractor)
+
+    def list_by_contractor_page(self, contractor: Contractor, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        with self._locks.holding(lambda: [("contractor", contractor.id)]):
+            return super().list_by_contractor_page(contractor, limit, token)
+
+    def delete(self, draft_invoice_id: int):
+        def keys():
+            return {("draft", draft_invoice_id), ("contractor", self._contractor_of.get(draft_invoice_id))}
+
+        with self._locks.holding(keys):
+            super().delete(draft_invoice_id)
+
+class ThreadSafeInvoiceRepository(InvoiceRepository):
+    """
+    Invoice repository guarded by one lock stripe per task, the key of the task index.
+    """
+    def __init__(self, stripes: int = 64):
+        super().__init__()
+        self._locks = StripedLock(stripes)
+
+    def save(self, invoice: Invoice) -> Invoice:
+        with self._locks.holding(lambda: [invoice.task.id]):
+            return super().save(invoice)
+
+    def save_if_absent(self, invoice: Invoice) -> Invoice:
+        """
+        Saves the invoice unless its task already has one, as a single atomic step.
+        """
+        with self._locks.holding(lambda: [invoice.task.id]):
+            if super().get_by_task(invoice.task) is not None:
+                raise ValueError("Invoice already exists for this task")
+            return super().save(invoice)
+
+    def save_all_if_absent(self, invoices: Iterable[Invoice]) -> List[Invoice]:
+        """
+        Saves all the invoices, or none of them if a task already has one, as a single atomic step.
+        """
+        invoices = list(invoices)
+        with self._locks.holding(lambda: [invoice.task.id for invoice in invoices]):
+            for invoice in invoices:
+                if super().get_by_task(invoice.task) is not None:
+                    raise ValueError("Invoice already exists for this task")
+            for invoice in invoices:
+                super().save(invoice)
+            return invoices
@@ -0,0 +1,151 @@
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+from contractor import Contractor
+from invoice import DraftInvoice, DraftInvoiceRepository
+from paging import Page
+
+class WriteBehindDraftInvoiceRepository(DraftInvoiceRepository):
+    """
+    Buffers draft updates in front of another draft repository (typically a persistent one).
+    Updates are visible immediately through this repository, but repeated updates of the same draft
+    are written to the backend once: when max_pending drafts are buffered, when the oldest buffered
+    update is max_delay seconds old, or when the draft is flushed (InvoiceManagementService flushes
+    a draft before submitting it). New drafts are written through so the backend assigns their ID.
+    The age of the buffer is checked on save and by flush_due; with flush_interval set a background
+    thread calls flush_due that often, so the last updates are written even when saves stop.
+    Call close to stop it and write what is left.
+    """
+    def __init__(self,  # pylint: disable=super-init-not-called
+                 backend: DraftInvoiceRepository,
+                 max_pending: int = 1000,
+                 max_delay: float = 1.0,
+                 flush_interval: Optional[float] = None):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._pending: Dict[int, DraftInvoice] = {}
+        self._oldest: Optional[float] = None
+        # guards the buffer against the background flusher
+        self._lock = threading.RLock()
+        self.updates = 0
+        self.writes = 0
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval is not None:
+            self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,),
+                                             name="draft-write-behind", daemon=True)
+            self._flusher.start()
+
+    def get(self, draft_invoice_id: int) -> Optional[DraftInvoice]:
+        with self._lock:
+            pending = self._pending.get(draft_invoice_id)
+            if pending is not None:
+                return pending
+            return self.backend.get(draft_invoice_id)
+
+    def save(self, draft_invoice: DraftInvoice):
+        with self._lock:
+            if draft_invoice.id is None:
+                self.backend.save(draft_invoice)
+                self.writes += 1
+                return
+
+            self.updates += 1
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending[draft_invoice.id] = draft_invoice
+            if len(self._pending) >= self.max_pending:
+                self.flush()
+            else:
+                self.flush_due()
+
+    def save_many(self, draft_invoices: Iterable[DraftInvoice]):
+        for draft_invoice in draft_invoices:
+            self.save(draft_invoice)
+
+    def flush(self, draft_invoice_id: Optional[int] = None):
+        with self._lock:
+            if draft_invoice_id is not None:
+                pending = self._pending.pop(draft_invoice_id, None)
+                if pending is not None:
+                    self.backend.save(pending)
+                    self.writes += 1
+                if not self._pending:
+                    self._oldest = None
+                return
+
+            if self._pending:
+                pending_drafts = list(self._pending.values())
+                self._pending.clear()
+                self._oldest = None
+                self.backend.save_many(pending_drafts)
+                self.writes += len(pending_drafts)
+
+    def _flush_ids(self, draft_invoice_ids: List[int]):
+        if draft_invoice_ids:
+            pending_drafts = [self._pending.pop(id) for id in draft_invoice_ids]
+            if not self._pending:
+                self._oldest = None
+            self.backend.save_many(pending_drafts)
+            self.writes += len(pending_drafts)
+
+    def flush_due(self, now: Optional[float] = None):
+        """
+        Writes the buffer if its oldest update is max_delay seconds old (by time.monotonic).
+        """
+        with self._lock:
+            if self._oldest is not None and (time.monotonic() if now is None else now) - self._oldest >= self.max_delay:
+                self.flush()
+
+    def close(self):
+        """
+        Stops the background flusher and writes every buffered update.
+        """
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _flush_periodically(self, interval: float):
+        while not self._closed.wait(interval):
+            self.flush_due()
+
+    def list_by_contractor(self, contractor: Contractor) -> List[DraftInvoice]:
+        with self._lock:
+            drafts = []
+            listed = set()
+            for draft in self.backend.list_by_contractor(contractor):
+                draft = self._pending.get(draft.id, draft)
+                listed.add(draft.id)
+                # a buffered update may have moved the draft to another contractor
+                if draft.contractor.id == contractor.id:
+                    drafts.append(draft)
+            drafts.extend(d for d in self._pending.values() if d.contractor.id == contractor.id and d.id not in listed)
+            return drafts
+
+    def list_by_contractor_page(self, contractor: Contractor, limit: int, token: Optional[str] = None) -> Page[DraftInvoice]:
+        with self._lock:
+            # buffered drafts of the contractor may have been moved to it, write them so the backend pages them
+            self._flush_ids([id for id, draft in self._pending.items() if draft.contractor.id == contractor.id])
+            while True:
+                page = self.backend.list_by_contractor_page(contractor, limit, token)
+                # buffered drafts still paged by the backend have been moved to another contractor,
+                # writing them lets drafts after them into the page, which may have been moved too
+                moved = [draft.id for draft in page.items if draft.id in self._pending]
+                if not moved:
+                    return page
+                self._flush_ids(moved)
+
+    def iter_after(self, after_id: Optional[int] = None) -> Iterator[DraftInvoice]:
+        for draft in self.backend.iter_after(after_id):
+            yield self._pending.get(draft.id, draft)
+
+    def delete(self, draft_invoice_id: int):
+        with self._lock:
+            # a buffered update of a deleted draft does not need to be written
+            self._pending.pop(draft_invoice_id, None)
+            if not self._pending:
+                self._oldest = None
+            self.backend.delete(draft_invoice_id)